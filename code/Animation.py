@@ -0,0 +1,51 @@
+# Animation.py
+
+
+class AnimationClock:
+    """Relógio global das animações: conta os passos de simulação desde o início da cena."""
+
+    def __init__(self):
+        self.tick = 0
+
+    def advance(self):
+        """Avança um passo (chamado uma vez por passo de simulação, antes de resolver os frames)."""
+        self.tick += 1
+
+
+class AnimationClip:
+    """
+    Sequência de frames com duração fixa (em passos) por frame, definida uma única vez e compartilhada
+    por todas as instâncias. A tabela `frame_table` (um índice de frame por passo do ciclo) é calculada
+    na criação; uma instância só guarda o passo em que começou e resolve o frame atual em O(1),
+    sem contadores próprios para atualizar.
+    """
+
+    def __init__(self, frame_count, frame_duration, frames=None):
+        self.frame_count = frame_count
+        self.frame_duration = frame_duration
+        self.frames = frames  # Superfícies (None no modo headless: apenas os índices são resolvidos)
+        self.cycle = frame_count * frame_duration
+        self.frame_table = [step // frame_duration for step in range(self.cycle)]
+
+    @classmethod
+    def from_frames(cls, frames, frame_duration):
+        """Cria o clip a partir de uma lista de superfícies."""
+        return cls(len(frames), frame_duration, frames)
+
+    def index_at(self, tick, start=0):
+        """Índice do frame no passo `tick` de uma instância iniciada no passo `start`."""
+        return self.frame_table[(tick - start) % self.cycle]
+
+    def frame_at(self, tick, start=0):
+        """Superfície do frame no passo `tick` de uma instância iniciada no passo `start`."""
+        return self.frames[self.frame_table[(tick - start) % self.cycle]]
+
+
+def build_clips(animations, frame_duration, frame_counts=None):
+    """
+    Cria um clip por animação ({nome: lista de superfícies}). Sem superfícies (modo headless),
+    `frame_counts` ({nome: número de frames}) define apenas a duração de cada clip.
+    """
+    if animations:
+        return {name: AnimationClip.from_frames(frames, frame_duration) for name, frames in animations.items()}
+    return {name: AnimationClip(count, frame_duration) for name, count in frame_counts.items()}
@@ -0,0 +1,217 @@
+# AssetManager.py
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+import pygame as pg
+
+from code.Const import ASSET_MEMORY_BUDGET
+
+# Cores candidatas a colorkey, testadas em ordem (a primeira que não aparece nos pixels opacos é usada)
+COLORKEY_CANDIDATES = ((255, 0, 255), (0, 255, 0), (0, 255, 255), (1, 2, 3))
+
+# Formatos escolhidos por optimize_surface
+FORMAT_OPAQUE = 'opaque'  # convert(): sem canal alfa
+FORMAT_COLORKEY = 'colorkey'  # convert() + colorkey com RLE: cada pixel é totalmente opaco ou transparente
+FORMAT_ALPHA = 'alpha'  # convert_alpha(): transparência por pixel
+
+
+def optimize_surface(image):
+    """
+    Escolhe o formato da superfície pelo conteúdo dos pixels de `image` (carregada com convert_alpha()).
+    Retorna (superfície, formato); a superfície retornada desenha exatamente os mesmos pixels.
+    """
+    alpha = pg.surfarray.pixels_alpha(image)
+    opaque = alpha == 255
+    binary = bool(np.all(opaque | (alpha == 0)))
+    del alpha  # Libera o lock da superfície
+    if opaque.all():
+        return image.convert(), FORMAT_OPAQUE
+    if not binary:
+        return image, FORMAT_ALPHA
+
+    # Alfa binário: colorkey com uma cor que não aparece em nenhum pixel opaco
+    rgb = pg.surfarray.pixels3d(image)
+    colors = rgb[opaque].astype(np.uint32)
+    del rgb
+    used = set(np.unique(colors[:, 0] << 16 | colors[:, 1] << 8 | colors[:, 2]).tolist())
+    key = next((color for color in COLORKEY_CANDIDATES if color[0] << 16 | color[1] << 8 | color[2] not in used),
+               None)
+    if key is None:
+        return image, FORMAT_ALPHA
+
+    surface = pg.Surface(image.get_size()).convert()
+    surface.fill(key)
+    surface.blit(image, (0, 0))
+    surface.set_colorkey(key, pg.RLEACCEL)
+    return surface, FORMAT_COLORKEY
+
+
+class AssetEntry:
+    """Uma superfície decodificada residente: bytes de pixels, formato escolhido e quantos donos a fixaram."""
+
+    __slots__ = ('surface', 'size_bytes', 'surface_format', 'pins')
+
+    def __init__(self, surface, surface_format):
+        self.surface = surface
+        self.size_bytes = surface.get_bytesize() * surface.get_width() * surface.get_height()
+        self.surface_format = surface_format
+        self.pins = 0
+
+
+class AssetManager:
+    """
+    Superfícies decodificadas com orçamento de memória (bytes de pixels) e descarte LRU.
+    get() devolve a superfície de uma chave, carregando-a com `load(*chave)` se não estiver residente;
+    ao passar do orçamento, as menos usadas recentemente são descartadas e, se pedidas de novo,
+    recarregadas (do cache em disco de code/utils.py, sem decodificar o PNG).
+    Quem guarda as superfícies além da chamada (ex.: os grupos do AssetCache, code/Loader.py) as obtém dentro
+    de pinning(): entradas fixadas continuam no orçamento, mas o LRU não as descarta (descartá-las não
+    liberaria memória e um novo get() carregaria uma segunda cópia) até unpin(). Se tudo estiver fixado,
+    resident_bytes passa do orçamento. Seguro para as threads de carregamento em segundo plano.
+    Superfícies derivadas que ficam vivas enquanto uma cena existir (ex.: as páginas do atlas) são cobradas
+    com charge() e liberadas com release(): entram no orçamento mas nunca são descartadas pelo LRU.
+    """
+
+    def __init__(self, load, budget=ASSET_MEMORY_BUDGET):
+        self.load = load  # load(*chave) -> superfície com convert_alpha()
+        self.budget = budget
+        self.entries = OrderedDict()  # chave -> AssetEntry, da usada há mais tempo para a mais recente
+        self.charges = {}  # chave -> AssetEntry das superfícies cobradas com charge() (fora do LRU)
+        self.resident_bytes = 0  # Entradas do LRU + cobranças
+        self._lock = threading.Lock()
+        self._pinning = threading.local()  # Chaves fixadas pelo bloco pinning() em andamento em cada thread
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, *key):
+        """Superfície da chave (ex.: caminho, tamanho, inversão), carregada e otimizada na primeira vez."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                self._pin_if_requested(key, entry)
+                return entry.surface
+            self.misses += 1
+
+        # Carregada fora do lock: as outras threads continuam carregando em paralelo
+        entry = AssetEntry(*optimize_surface(self.load(*key)))
+        with self._lock:
+            existing = self.entries.get(key)
+            if existing is not None:
+                entry = existing  # Outra thread carregou a mesma chave ao mesmo tempo
+            else:
+                self.entries[key] = entry
+                self.resident_bytes += entry.size_bytes
+            self._pin_if_requested(key, entry)  # Fixada antes do descarte: a nova entrada nunca sai
+            self._evict()
+        return entry.surface
+
+    def peek(self, *key):
+        """Superfície residente da chave (ou None), sem carregar, contar acerto nem mudar a ordem do LRU."""
+        with self._lock:
+            entry = self.entries.get(key)
+            return entry.surface if entry is not None else None
+
+    def _pin_if_requested(self, key, entry):
+        keys = getattr(self._pinning, 'keys', None)
+        if keys is not None:
+            entry.pins += 1
+            keys.append(key)
+
+    @contextmanager
+    def pinning(self):
+        """
+        Fixa as chaves obtidas com get() por este thread dentro do bloco e entrega a lista delas
+        (uma vez por chamada, para serem devolvidas com unpin()).
+        """
+        previous = getattr(self._pinning, 'keys', None)
+        keys = self._pinning.keys = []
+        try:
+            yield keys
+        finally:
+            self._pinning.keys = previous
+
+    def unpin(self, keys, discard=False):
+        """
+        Devolve chaves fixadas em pinning(); sem nenhum dono, voltam a poder ser descartadas pelo LRU. Com
+        discard=True, as que ficarem sem dono saem na hora (ex.: já copiadas para as páginas de um atlas).
+        """
+        with self._lock:
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry is None:
+                    continue  # A mesma chave repetida na lista e já descartada
+                entry.pins -= 1
+                if discard and not entry.pins:
+                    del self.entries[key]
+                    self.resident_bytes -= entry.size_bytes
+            self._evict()
+
+    def _evict(self):
+        """
+        Descarta as entradas não fixadas menos usadas até caber no orçamento (a mais recente sempre fica).
+        """
+        if self.resident_bytes <= self.budget:
+            return
+        newest = next(reversed(self.entries), None)
+        for key, entry in list(self.entries.items()):
+            if self.resident_bytes <= self.budget:
+                break
+            if entry.pins or key == newest:
+                continue
+            del self.entries[key]
+            self.resident_bytes -= entry.size_bytes
+            self.evictions += 1
+
+    def charge(self, key, surface, surface_format):
+        """
+        Conta uma superfície mantida por outro dono no orçamento, descartando do LRU (entradas não fixadas)
+        o que passar dele.
+        """
+        with self._lock:
+            entry = AssetEntry(surface, surface_format)
+            previous = self.charges.pop(key, None)
+            if previous is not None:
+                self.resident_bytes -= previous.size_bytes
+            self.charges[key] = entry
+            self.resident_bytes += entry.size_bytes
+            self._evict()
+
+    def release(self, key):
+        """Remove uma cobrança feita com charge() (o dono deixou de usar a superfície)."""
+        with self._lock:
+            entry = self.charges.pop(key, None)
+            if entry is not None:
+                self.resident_bytes -= entry.size_bytes
+
+    def set_budget(self, budget):
+        """Altera o orçamento (bytes), descartando imediatamente o que passar dele."""
+        with self._lock:
+            self.budget = budget
+            self._evict()
+
+    def memory_report(self):
+        """Bytes residentes, orçamento, contadores do cache e bytes por formato."""
+        with self._lock:
+            formats = {}
+            for entry in list(self.entries.values()) + list(self.charges.values()):
+                formats[entry.surface_format] = formats.get(entry.surface_format, 0) + entry.size_bytes
+            pinned = [entry.size_bytes for entry in self.entries.values() if entry.pins]
+            return {
+                'resident_bytes': self.resident_bytes,
+                'budget': self.budget,
+                'entries': len(self.entries),
+                'pinned_entries': len(pinned),
+                'pinned_bytes': sum(pinned),
+                'charged_bytes': sum(entry.size_bytes for entry in self.charges.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'formats': formats,
+            }
@@ -0,0 +1,211 @@
+# Atlas.py
+
+import hashlib
+import math
+import weakref
+
+import pygame as pg
+
+from code.AssetManager import FORMAT_ALPHA, FORMAT_COLORKEY, FORMAT_OPAQUE
+from code.Const import ATLAS_MAX_PAGE_SIZE
+
+
+def page_format(surface):
+    """
+    Formato de página de uma superfície, preservando o que optimize_surface escolheu: (FORMAT_ALPHA, None),
+    (FORMAT_COLORKEY, cor) ou (FORMAT_OPAQUE, None). Só superfícies do mesmo formato dividem uma página.
+    """
+    if surface.get_flags() & pg.SRCALPHA:
+        return FORMAT_ALPHA, None
+    colorkey = surface.get_colorkey()
+    if colorkey is not None:
+        return FORMAT_COLORKEY, tuple(colorkey[:3])
+    return FORMAT_OPAQUE, None
+
+
+class TextureAtlas:
+    """
+    Empacota muitos sprites pequenos em poucas superfícies grandes (páginas).
+    Cada sprite passa a ser uma subsurface da página: o desenho continua igual para quem usa a imagem,
+    mas todos os frames compartilham a mesma memória. Frames com pixels idênticos são armazenados uma vez.
+    Cada página guarda um único formato (opaco, colorkey ou alfa por pixel, ver page_format), para que os
+    sprites continuem sendo desenhados com o blit mais barato escolhido no carregamento.
+    Com um `manager` (AssetManager), as páginas são cobradas no orçamento de memória até release().
+    """
+
+    def __init__(self, max_page_size=ATLAS_MAX_PAGE_SIZE, manager=None):
+        self.max_page_size = max_page_size
+        self.manager = manager
+        self.pages = []
+
+        # Estatísticas para o relatório de memória
+        self.frame_count = 0
+        self.unique_frame_count = 0  # Uma subsurface por frame único
+        self.standalone_bytes = 0
+        self.sources = []  # (weakref, bytes) de cada superfície avulsa empacotada, para saber quais seguem vivas
+
+    def pack(self, assets):
+        """
+        Empacota todas as superfícies de uma estrutura de dicts/listas e retorna a mesma estrutura
+        com as superfícies trocadas pelas subsurfaces do atlas.
+        """
+        surfaces = []
+        self._collect(assets, surfaces)
+
+        # Frames repetidos (mesmo tamanho e mesmos pixels) ocupam uma única região
+        keys = {}
+        unique = {}
+        for surface in surfaces:
+            self.frame_count += 1
+            if id(surface) in keys:
+                continue  # A mesma superfície em mais de um lugar da estrutura
+            size_bytes = surface.get_width() * surface.get_height() * surface.get_bytesize()
+            self.standalone_bytes += size_bytes
+            self.sources.append((weakref.ref(surface), size_bytes))
+            key = (page_format(surface), surface.get_size(), hashlib.sha1(pg.image.tobytes(surface, 'RGBA')).digest())
+            keys[id(surface)] = key
+            unique.setdefault(key, surface)
+        self.unique_frame_count += len(unique)
+
+        groups = {}
+        for key, surface in unique.items():
+            groups.setdefault(key[0], []).append(surface)
+        regions = {}
+        for surface_format, group in groups.items():
+            regions.update(self._place(group, surface_format))
+        subsurfaces = {}
+        for key, surface in unique.items():
+            page, position = regions[id(surface)]
+            subsurface = subsurfaces[key] = page.subsurface(pg.Rect(position, surface.get_size()))
+            if key[0][0] == FORMAT_COLORKEY:
+                subsurface.set_colorkey(key[0][1], pg.RLEACCEL)  # Herdado da página; o RLE é por superfície
+
+        by_surface = {surface_id: subsurfaces[key] for surface_id, key in keys.items()}
+        return self._rebuild(assets, by_surface)
+
+    def _collect(self, assets, surfaces):
+        """Coleta recursivamente as superfícies de dicts/listas."""
+        if isinstance(assets, pg.Surface):
+            surfaces.append(assets)
+        elif isinstance(assets, dict):
+            for value in assets.values():
+                self._collect(value, surfaces)
+        elif isinstance(assets, (list, tuple)):
+            for value in assets:
+                self._collect(value, surfaces)
+
+    def _rebuild(self, assets, by_surface):
+        """Reconstrói a estrutura original trocando cada superfície pela sua subsurface."""
+        if isinstance(assets, pg.Surface):
+            return by_surface[id(assets)]
+        if isinstance(assets, dict):
+            return {key: self._rebuild(value, by_surface) for key, value in assets.items()}
+        if isinstance(assets, (list, tuple)):
+            return type(assets)(self._rebuild(value, by_surface) for value in assets)
+        return assets
+
+    def _layout(self, surfaces, page_width):
+        """
+        Empacotamento em prateleiras (shelf packing) com uma largura de página fixa: os sprites (já
+        ordenados por altura) são colocados lado a lado em linhas. Retorna [(posicionamentos, altura usada)].
+        """
+        max_height = self.max_page_size[1]
+        layouts = []
+        placements = []
+        x = y = shelf_height = 0
+        for surface in surfaces:
+            width, height = surface.get_size()
+            if x + width > page_width:  # Próxima prateleira
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+            if y + height > max_height and placements:  # Próxima página
+                layouts.append((placements, y + shelf_height))
+                placements = []
+                x = y = shelf_height = 0
+            placements.append((surface, (x, y)))
+            x += width
+            shelf_height = max(shelf_height, height)
+        layouts.append((placements, y + shelf_height))
+        return layouts
+
+    def _new_page(self, size, surface_format):
+        """Página vazia no formato do grupo: transparente, preenchida com a cor do colorkey ou opaca."""
+        kind, colorkey = surface_format
+        display = pg.display.get_surface() is not None
+        if kind == FORMAT_ALPHA:
+            page = pg.Surface(size, pg.SRCALPHA)
+            page = page.convert_alpha() if display else page
+            page.fill((0, 0, 0, 0))
+            return page
+        page = pg.Surface(size)
+        page = page.convert() if display else page
+        if kind == FORMAT_COLORKEY:
+            page.fill(colorkey)
+            page.set_colorkey(colorkey)
+        return page
+
+    def _place(self, surfaces, surface_format):
+        """
+        Escolhe, entre algumas larguras candidatas, a que desperdiça menos área, cria as páginas recortadas
+        à altura usada e copia os sprites (todos do mesmo formato). Retorna {id(superfície): (página, posição)}.
+        """
+        if not surfaces:
+            return {}
+        max_width = self.max_page_size[0]
+        surfaces = sorted(surfaces, key=lambda s: (s.get_height(), s.get_width()), reverse=True)
+
+        # Candidatas: raiz da área total e múltiplos das larguras existentes (colunas sem sobra)
+        widest = max(s.get_width() for s in surfaces)
+        total_area = sum(s.get_width() * s.get_height() for s in surfaces)
+        candidates = {min(max_width, max(widest, math.ceil(math.sqrt(total_area))))}
+        for width in {s.get_width() for s in surfaces}:
+            for columns in range(1, max_width // width + 1):
+                if widest <= width * columns <= max_width:
+                    candidates.add(width * columns)
+
+        best_width = min(candidates, key=lambda page_width: sum(
+            page_width * used_height for _, used_height in self._layout(surfaces, page_width)))
+
+        regions = {}
+        for placements, used_height in self._layout(surfaces, best_width):
+            page = self._new_page((best_width, used_height), surface_format)
+            for surface, position in placements:
+                # Páginas com alfa: BLEND_RGBA_MAX sobre a página transparente copia os pixels exatamente (sem
+                # mistura de alpha). Esse modo ignora o colorkey, então superfícies com colorkey usam o blit
+                # normal, que também copia exatamente os pixels opacos (os demais mantêm o fundo da página)
+                if surface_format[0] == FORMAT_ALPHA and surface.get_colorkey() is None:
+                    page.blit(surface, position, special_flags=pg.BLEND_RGBA_MAX)
+                else:
+                    page.blit(surface, position)
+                regions[id(surface)] = (page, position)
+            if self.manager is not None:
+                self.manager.charge(('atlas', id(self), len(self.pages)), page, surface_format[0])
+            self.pages.append(page)
+        return regions
+
+    def release(self):
+        """Retira as páginas do orçamento do AssetManager (chamado quando o dono do atlas é descartado)."""
+        if self.manager is not None:
+            for index in range(len(self.pages)):
+                self.manager.release(('atlas', id(self), index))
+
+    def memory_report(self):
+        """
+        Retorna a memória dos sprites avulsos, a das páginas do atlas e a economia real (em bytes): as
+        superfícies avulsas que ainda estão vivas (referenciadas por caches ou cenas) não foram economizadas.
+        """
+        atlas_bytes = sum(page.get_width() * page.get_height() * page.get_bytesize() for page in self.pages)
+        alive = [size_bytes for ref, size_bytes in self.sources if ref() is not None]
+        return {
+            'frames': self.frame_count,
+            'unique_frames': self.unique_frame_count,
+            'pages': len(self.pages),
+            'subsurfaces': self.unique_frame_count,
+            'surfaces': len(self.pages) + self.unique_frame_count,
+            'sources_alive': len(alive),
+            'sources_alive_bytes': sum(alive),
+            'standalone_bytes': self.standalone_bytes,
+            'atlas_bytes': atlas_bytes,
+            'saved_bytes': self.standalone_bytes - atlas_bytes - sum(alive),
+        }
@@ -0,0 +1,244 @@
+# Benchmark.py
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import time
+
+import numpy as np
+import pygame as pg
+
+from code import utils
+from code.AssetManager import AssetManager
+from code.Const import SCREEN_SIZE, PLAYER_COLLIDER_SIZE, TILE_SIZE
+from code.Entities import EntityStore
+from code.Game import Game
+from code.Player import Player
+from code.Simulation import random_policy
+from code.utils import load_background_assets, load_terrain_assets, load_player_assets, asset_manager
+
+# Aumento (fração) do tempo mediano em relação à linha de base a partir do qual um benchmark é uma regressão
+REGRESSION_THRESHOLD = 0.10
+
+
+class ScriptedPlayer:
+    """
+    Jogador avançado com entradas programadas (random_policy) em ciclo; a posição inicial é restaurada
+    a cada volta do roteiro para que todas as repetições meçam o mesmo trecho do mapa.
+    """
+
+    def __init__(self, player, seed=0, length=600):
+        self.player = player
+        self.start = list(player.pos)
+        self.inputs = list(itertools.islice(random_policy(seed), length))
+        self.index = 0
+
+    def _next_input(self):
+        if self.index == len(self.inputs):
+            self.index = 0
+            self.player.set_position(self.start)
+        keys_pressed, key_event_key = self.inputs[self.index]
+        self.index += 1
+        return keys_pressed, key_event_key
+
+    def move(self):
+        keys_pressed, _ = self._next_input()
+        self.player.move(keys_pressed)
+
+    def step(self):
+        """Um passo completo do jogador: entrada, pulo e update (física e animação)."""
+        keys_pressed, key_event_key = self._next_input()
+        self.player.move(keys_pressed)
+        if key_event_key == pg.K_SPACE:
+            self.player.jump()
+        self.player.update()
+
+
+def build_benchmarks(screen):
+    """
+    Retorna o jogo medido e a lista de benchmarks: (nome, iterações por repetição, função sem argumentos).
+    Quem chama encerra o jogo com game.exit() ao terminar (threads de desenho e assets fixados).
+    """
+    game = Game(screen)
+    game.draw()  # Preenche os caches (chunks do terreno, atlas) antes de medir
+
+    # Jogador independente (com o seu próprio EntityStore), usando as animações já empacotadas no atlas
+    player = Player(list(game.player.pos), game.tile_map, collision_map=game.collision_map,
+                    animations=game.player.animations)
+    scripted = ScriptedPlayer(player)
+
+    # Consultas de colisão com o collider encostado na parede da direita e apoiado no chão do mapa padrão
+    collision_map = game.collision_map
+    wall_rect = pg.Rect((17 * TILE_SIZE - 20, 8 * TILE_SIZE), PLAYER_COLLIDER_SIZE)
+    floor_rect = pg.Rect((5 * TILE_SIZE, 11 * TILE_SIZE - 40), PLAYER_COLLIDER_SIZE)
+
+    # Muitos corpos simulados em lote
+    store = EntityStore(collision_map)
+    rng = np.random.default_rng(0)
+    for x in rng.integers(0, collision_map.cols * TILE_SIZE, 256):
+        store.add((int(x), 0), (40, 8), PLAYER_COLLIDER_SIZE)
+    store_start = store.pos.copy()
+
+    def step_store():
+        store.step()
+        store.pos[:] = store_start  # Mantém os corpos no mesmo trecho do mapa a cada iteração
+        store.vel_y[:] = 0
+
+    def cold(load):
+        """
+        Carregamento com um asset_manager vazio no lugar do compartilhado (que mantém fixados os grupos do jogo):
+        mede o cache em disco e optimize_surface (as versões sem '.cold' só medem acertos no LRU).
+        """
+        def run():
+            shared = utils.asset_manager
+            utils.asset_manager = AssetManager(shared.load, shared.budget)
+            try:
+                load()
+            finally:
+                utils.asset_manager = shared
+        return run
+
+    return game, [
+        ('game.draw', 200, game.draw),
+        ('game.draw.background_and_clouds', 500, game._update_background_and_clouds),
+        ('game.draw.tiles', 500, game._draw_tiles),
+        ('game.draw.water_big', 2000, lambda: game._animate_water('big_water')),
+        ('game.draw.water_medium', 2000, lambda: game._animate_water('medium_water')),
+        ('game.draw.water_small', 2000, lambda: game._animate_water('small_water')),
+        ('game.draw.player', 2000, lambda: game._blit(game.player.image, game.camera.to_screen(game.player.pos))),
+        ('game.draw.present', 200, game._present),
+        ('player.move', 5000, scripted.move),
+        ('player.update', 2000, scripted.step),
+        ('collision.blocking_edge_x', 5000, lambda: collision_map.blocking_edge_x(wall_rect, 'right')),
+        ('collision.blocking_edge_y', 5000, lambda: collision_map.blocking_edge_y(floor_rect, 'down')),
+        ('entities.step_256', 500, step_store),
+        ('utils.load_background_assets', 5, load_background_assets),
+        ('utils.load_terrain_assets', 20, load_terrain_assets),
+        ('utils.load_player_assets', 10, load_player_assets),
+        ('utils.load_background_assets.cold', 2, cold(load_background_assets)),
+        ('utils.load_terrain_assets.cold', 5, cold(load_terrain_assets)),
+        ('utils.load_player_assets.cold', 3, cold(load_player_assets)),
+    ]
+
+
+def run_benchmark(function, iterations, repeats):
+    """Executa `function` iterations vezes por repetição e retorna os tempos por chamada (µs)."""
+    function()  # Aquecimento (caches, primeira alocação)
+    per_call = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        per_call.append((time.perf_counter() - start) / iterations * 1e6)
+    return {
+        'iterations': iterations,
+        'repeats': repeats,
+        'median_us': statistics.median(per_call),
+        'min_us': min(per_call),
+        'mean_us': statistics.fmean(per_call),
+    }
+
+
+def run_suite(screen, repeats=5, name_filter=None):
+    """Executa todos os benchmarks (ou os que contêm `name_filter` no nome) e retorna o relatório."""
+    results = {}
+    game, benchmarks = build_benchmarks(screen)
+    for name, iterations, function in benchmarks:
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = run_benchmark(function, iterations, repeats)
+        print(f"{name:<36}{results[name]['median_us']:>12.2f} µs")
+
+    # Atlas de cada grupo de assets do jogo (code/Loader.py): páginas e economia em relação aos sprites avulsos
+    atlas_memory = game.asset_cache.memory_report()
+    for name, atlas in atlas_memory.items():
+        print(f"atlas {name}: {atlas['frames']} frames ({atlas['unique_frames']} únicos) em {atlas['pages']} "
+              f"páginas, {atlas['atlas_bytes'] / 1024:.0f} KiB, {atlas['saved_bytes'] / 1024:+.0f} KiB economizados, "
+              f"{atlas['sources_alive']} avulsos vivos")
+
+    # Encerra o jogo antes do relatório do asset_manager: devolve as páginas do atlas e os assets fixados
+    game.exit()
+
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'pygame': pg.version.ver,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'video_driver': pg.display.get_driver(),
+        },
+        'results': results,
+        'asset_memory': asset_manager.memory_report(),  # Residentes após game.exit() (code/AssetManager.py)
+        'atlas_memory': atlas_memory,
+    }
+
+
+def compare(report, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Compara os tempos medianos com os de uma execução anterior.
+    Retorna a lista de (nome, tempo base, tempo atual, variação, situação).
+    """
+    rows = []
+    for name, result in report['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            rows.append((name, None, result['median_us'], None, 'novo'))
+            continue
+        change = result['median_us'] / base['median_us'] - 1.0
+        if change > threshold:
+            status = 'REGRESSÃO'
+        elif change < -threshold:
+            status = 'melhora'
+        else:
+            status = 'ok'
+        rows.append((name, base['median_us'], result['median_us'], change, status))
+    return rows
+
+
+def main():
+    """Ponto de entrada: python -m code.Benchmark [--output atual.json] [--baseline base.json]"""
+    parser = argparse.ArgumentParser(description="Benchmarks de desenho, física e carregamento (sem janela).")
+    parser.add_argument('--output', metavar='ARQUIVO', help="Grava os resultados em JSON")
+    parser.add_argument('--baseline', metavar='ARQUIVO', help="Resultados anteriores (JSON) para comparação")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Aumento máximo do tempo mediano antes de acusar regressão (0.10 = 10%%)")
+    parser.add_argument('--repeats', type=int, default=5, help="Repetições de cada benchmark")
+    parser.add_argument('--filter', metavar='TEXTO', help="Executa apenas os benchmarks que contêm TEXTO no nome")
+    args = parser.parse_args()
+
+    # Driver de vídeo "dummy": nenhuma janela é aberta, mas as superfícies e o display funcionam normalmente
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pg.init()
+    screen = pg.display.set_mode(SCREEN_SIZE)
+
+    report = run_suite(screen, args.repeats, args.filter)
+    pg.quit()
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    rows = compare(report, baseline, args.threshold)
+    print(f"\n{'benchmark':<36}{'base (µs)':>12}{'atual (µs)':>12}{'variação':>10}  situação")
+    for name, base, current, change, status in rows:
+        base_text = f'{base:.2f}' if base is not None else '-'
+        change_text = f'{change:+.1%}' if change is not None else '-'
+        print(f"{name:<36}{base_text:>12}{current:>12.2f}{change_text:>10}  {status}")
+
+    regressions = [row for row in rows if row[4] == 'REGRESSÃO']
+    if regressions:
+        print(f"{len(regressions)} regressão(ões) acima de {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
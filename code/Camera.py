@@ -0,0 +1,41 @@
+# Camera.py
+
+import pygame as pg
+
+from code.Const import SCREEN_SIZE
+
+
+class Camera:
+    """
+    Câmera que acompanha um alvo (o jogador) dentro dos limites do mundo.
+    `rect` é a área visível em coordenadas do mundo; to_screen() converte posições do mundo para a tela.
+    """
+
+    def __init__(self, world_size, view_size=SCREEN_SIZE):
+        self.world_rect = pg.Rect((0, 0), world_size)
+        self.rect = pg.Rect((0, 0), view_size)
+
+    def target_rect(self, focus_rect):
+        """Área visível centrada no retângulo informado, limitada às bordas do mundo."""
+        view = self.rect.copy()
+        view.center = focus_rect.center
+        if self.world_rect.width >= view.width:
+            view.left = max(self.world_rect.left, min(view.left, self.world_rect.right - view.width))
+        else:
+            view.left = self.world_rect.left
+        if self.world_rect.height >= view.height:
+            view.top = max(self.world_rect.top, min(view.top, self.world_rect.bottom - view.height))
+        else:
+            view.top = self.world_rect.top
+        return view
+
+    def follow(self, focus_rect):
+        """Move a câmera para o alvo. Retorna True se a área visível mudou."""
+        view = self.target_rect(focus_rect)
+        moved = view.topleft != self.rect.topleft
+        self.rect = view
+        return moved
+
+    def to_screen(self, pos):
+        """Converte uma posição do mundo para coordenadas da tela."""
+        return pos[0] - self.rect.left, pos[1] - self.rect.top
@@ -0,0 +1,199 @@
+# Capture.py
+
+import argparse
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import pygame as pg
+
+from code.Const import FPS, CAPTURE_RING_SIZE, CAPTURE_COMPRESS_LEVEL
+
+# Formato do arquivo de captura (little-endian):
+#   cabeçalho: magic 'CCNV', versão (u8), largura e altura dos frames (u16, u16), frames por segundo (f32),
+#              compressão (u8: 0 = pixels crus, 1 = cada frame comprimido com zlib), frames pulados entre dois
+#              gravados (u16)
+#   frames: número do frame na sessão (u32) e tamanho dos dados (u32), seguidos dos pixels em RGB (24 bits).
+#           Lacunas na numeração maiores que as do skip são frames descartados (gravador atrasado).
+CAPTURE_MAGIC = b'CCNV'
+CAPTURE_VERSION = 1
+CAPTURE_HEADER = struct.Struct('<4sBHHfBH')
+FRAME_HEADER = struct.Struct('<II')
+
+
+class FrameCapture:
+    """
+    Grava os frames apresentados sem travar o loop: capture() só copia os pixels da tela (um memcpy) para um
+    dos `ring_size` buffers pré-alocados; uma thread de fundo reduz, converte para RGB, comprime e grava.
+    Com o anel cheio (gravador atrasado) o frame é descartado e contado, em vez de esperar; com block=True
+    (ex.: replays convertidos em vídeo, sem jogador esperando) capture() espera um buffer livre.
+    skip=N grava um de cada N + 1 frames; scale reduz o tamanho dos frames gravados.
+    """
+
+    def __init__(self, path, screen, fps=FPS, skip=0, scale=1.0, compress_level=CAPTURE_COMPRESS_LEVEL,
+                 ring_size=CAPTURE_RING_SIZE, block=False):
+        self.path = path
+        self.skip = skip
+        self.block = block
+        self.compress_level = compress_level
+        source_size = screen.get_size()
+        self.size = (max(1, round(source_size[0] * scale)), max(1, round(source_size[1] * scale)))
+
+        # Buffers com o mesmo formato de pixels da tela: a cópia é byte a byte, sem conversão
+        self.ring = [pg.Surface(source_size, 0, screen) for _ in range(ring_size)]
+        self.scaled = pg.Surface(self.size, 0, screen) if self.size != source_size else None
+        self.free = queue.Queue()
+        for slot in range(ring_size):
+            self.free.put(slot)
+        self.filled = queue.Queue()
+
+        self.frames_seen = 0
+        self.frames_written = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.copy_time = 0.0  # Tempo gasto no loop principal (cópias e esperas)
+        self.error = None
+
+        self.file = open(path, 'wb')
+        self.file.write(CAPTURE_HEADER.pack(CAPTURE_MAGIC, CAPTURE_VERSION, self.size[0], self.size[1],
+                                            fps / (skip + 1), 1 if compress_level else 0, skip))
+        self.thread = threading.Thread(target=self._write_loop, name='frame-capture', daemon=True)
+        self.thread.start()
+
+    def capture(self, surface):
+        """Copia o frame apresentado para o anel. Retorna False se o frame foi pulado ou descartado."""
+        index = self.frames_seen
+        self.frames_seen += 1
+        if index % (self.skip + 1):
+            self.skipped += 1
+            return False
+
+        start = time.perf_counter()
+        try:
+            slot = self.free.get() if self.block and self.error is None else self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            self.copy_time += time.perf_counter() - start
+            return False
+
+        with memoryview(self.ring[slot].get_buffer()) as target, memoryview(surface.get_buffer()) as pixels:
+            target[:] = pixels
+        self.filled.put((slot, index))
+        self.copy_time += time.perf_counter() - start
+        return True
+
+    def _write_loop(self):
+        """Thread do gravador: converte e grava os frames na ordem em que foram copiados."""
+        while True:
+            item = self.filled.get()
+            if item is None:
+                return
+            slot, index = item
+            if self.error is not None:
+                self.free.put(slot)
+                continue
+
+            frame = self.ring[slot]
+            if self.scaled is not None:
+                pg.transform.smoothscale(frame, self.size, self.scaled)
+                frame = self.scaled
+            data = pg.image.tobytes(frame, 'RGB')
+            self.free.put(slot)  # Pixels já lidos: o buffer pode receber o próximo frame
+
+            if self.compress_level:
+                data = zlib.compress(data, self.compress_level)
+            try:
+                self.file.write(FRAME_HEADER.pack(index, len(data)))
+                self.file.write(data)
+            except OSError as e:
+                self.error = e
+                print(f"Erro ao gravar a captura em {self.path}: {e}")
+                continue
+            self.frames_written += 1
+            self.bytes_written += FRAME_HEADER.size + len(data)
+
+    def close(self):
+        """Espera o gravador terminar os frames pendentes, fecha o arquivo e retorna o relatório."""
+        if self.thread is not None:
+            self.filled.put(None)
+            self.thread.join()
+            self.thread = None
+            self.file.close()
+        return self.report()
+
+    def report(self):
+        captured = self.frames_seen - self.skipped
+        return {
+            'path': self.path,
+            'size': self.size,
+            'frames_seen': self.frames_seen,
+            'frames_written': self.frames_written,
+            'skipped': self.skipped,
+            'dropped': self.dropped,
+            'drop_rate': self.dropped / captured if captured else 0.0,
+            'bytes_written': self.bytes_written,
+            'copy_ms_per_frame': self.copy_time * 1000 / captured if captured else 0.0,
+        }
+
+
+class CaptureReader:
+    """Lê um arquivo gravado por FrameCapture."""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        magic, version, width, height, self.fps, self.compressed, self.skip = CAPTURE_HEADER.unpack(
+            self.file.read(CAPTURE_HEADER.size))
+        if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+            self.file.close()
+            raise ValueError(f"Arquivo de captura inválido ou de versão incompatível: {path}")
+        self.size = (width, height)
+
+    def frames(self):
+        """Gera (número do frame, pixels RGB em bytes) de cada frame gravado."""
+        while True:
+            header = self.file.read(FRAME_HEADER.size)
+            if len(header) < FRAME_HEADER.size:
+                return
+            index, length = FRAME_HEADER.unpack(header)
+            data = self.file.read(length)
+            if len(data) < length:
+                return  # Arquivo truncado (ex.: o jogo foi encerrado durante a gravação)
+            yield index, zlib.decompress(data) if self.compressed else data
+
+    def close(self):
+        self.file.close()
+
+
+def main():
+    """Ponto de entrada: python -m code.Capture captura.ccnv [--export pasta] [--every 10]"""
+    parser = argparse.ArgumentParser(description="Mostra o conteúdo de uma captura e exporta frames em PNG.")
+    parser.add_argument('path')
+    parser.add_argument('--export', metavar='PASTA', help="Grava os frames como PNG nesta pasta")
+    parser.add_argument('--every', type=int, default=1, help="Exporta um de cada N frames gravados")
+    args = parser.parse_args()
+
+    reader = CaptureReader(args.path)
+    count = 0
+    dropped = 0
+    last_index = None
+    if args.export:
+        os.makedirs(args.export, exist_ok=True)
+    for index, pixels in reader.frames():
+        if last_index is not None:
+            dropped += (index - last_index) // (reader.skip + 1) - 1
+        last_index = index
+        if args.export and count % args.every == 0:
+            image = pg.image.frombuffer(pixels, reader.size, 'RGB')
+            pg.image.save(image, os.path.join(args.export, f'frame_{index:06d}.png'))
+        count += 1
+    reader.close()
+    print(f"{count} frames de {reader.size[0]}x{reader.size[1]} a {reader.fps:.1f} FPS "
+          f"({'zlib' if reader.compressed else 'sem compressão'}), {dropped} frames descartados na gravação")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# Collision.py
+
+from code.Const import TILE_SIZE
+from code.TileMap import ChunkedTileMap
+
+
+class CollisionMap:
+    """
+    Índice de colisão sobre o mapa em chunks (code/TileMap.py).
+    Cada chunk residente tem um bitmap compacto (bytearray, 1 byte por tile: 1 = sólido). As consultas
+    leem apenas as células cobertas pelo collider, então o custo não depende do tamanho do mapa nem aloca
+    objetos.
+    """
+
+    def __init__(self, tile_map, tile_size=TILE_SIZE):
+        if not isinstance(tile_map, ChunkedTileMap):
+            tile_map = ChunkedTileMap.from_rows(tile_map)  # Lista de linhas, como GAME_MAP
+        self.tile_map = tile_map
+        self.tile_size = tile_size
+        self.rows = tile_map.rows
+        self.cols = tile_map.cols
+
+    def is_solid(self, x, y):
+        """Retorna True se o tile (coluna x, linha y) for sólido. Fora do mapa nada é sólido."""
+        if 0 <= x < self.cols and 0 <= y < self.rows:
+            size = self.tile_map.chunk_size
+            return self.tile_map.solid_chunk(x // size, y // size)[(y % size) * size + x % size] == 1
+        return False
+
+    def set_tile(self, x, y, tile_char):
+        """Atualiza o mapa e o índice após a alteração de um tile em tempo de execução."""
+        self.tile_map.set_tile(x, y, tile_char)
+
+    def _cell_range(self, rect):
+        """Intervalo de células [início, fim) cobertas pelo retângulo, limitado ao mapa."""
+        size = self.tile_size
+        start_col = max(0, rect.left // size)
+        end_col = min(self.cols, (rect.right + size - 1) // size)
+        start_row = max(0, rect.top // size)
+        end_row = min(self.rows, (rect.bottom + size - 1) // size)
+        return start_col, end_col, start_row, end_row
+
+    def _find_in_row(self, y, start_col, end_col, last=False):
+        """Coluna do primeiro (ou do último) tile sólido da linha y em [start_col, end_col), ou -1."""
+        if start_col >= end_col:
+            return -1
+        size = self.tile_map.chunk_size
+        chunk_y, local_y = divmod(y, size)
+        row_offset = local_y * size
+
+        chunk_xs = range(start_col // size, (end_col - 1) // size + 1)
+        for chunk_x in (reversed(chunk_xs) if last else chunk_xs):
+            solid = self.tile_map.solid_chunk(chunk_x, chunk_y)
+            chunk_left = chunk_x * size
+            first = max(start_col, chunk_left) - chunk_left + row_offset
+            stop = min(end_col, chunk_left + size) - chunk_left + row_offset
+            index = solid.rfind(1, first, stop) if last else solid.find(1, first, stop)
+            if index != -1:
+                return chunk_left + index - row_offset
+        return -1
+
+    def collides(self, rect):
+        """Retorna True se o retângulo sobrepõe algum tile sólido."""
+        start_col, end_col, start_row, end_row = self._cell_range(rect)
+        for y in range(start_row, end_row):
+            if self._find_in_row(y, start_col, end_col) != -1:
+                return True
+        return False
+
+    def blocking_edge_x(self, rect, move_dir):
+        """
+        Retorna a borda (em pixels) que bloqueia o movimento horizontal, ou None se não houver colisão.
+        'left' -> borda direita do tile sólido mais à direita; 'right' -> borda esquerda do mais à esquerda.
+        """
+        start_col, end_col, start_row, end_row = self._cell_range(rect)
+        edge = None
+        for y in range(start_row, end_row):
+            if move_dir == 'left':
+                col = self._find_in_row(y, start_col, end_col, last=True)
+                if col != -1:
+                    right = (col + 1) * self.tile_size
+                    edge = right if edge is None else max(edge, right)
+            else:
+                col = self._find_in_row(y, start_col, end_col)
+                if col != -1:
+                    left = col * self.tile_size
+                    edge = left if edge is None else min(edge, left)
+        return edge
+
+    def blocking_edge_y(self, rect, move_dir):
+        """
+        Retorna a borda (em pixels) que bloqueia o movimento vertical, ou None se não houver colisão.
+        'down' -> topo do tile sólido mais alto; 'up' -> base do tile sólido mais baixo.
+        """
+        start_col, end_col, start_row, end_row = self._cell_range(rect)
+        rows = range(start_row, end_row) if move_dir == 'down' else range(end_row - 1, start_row - 1, -1)
+        for y in rows:
+            if self._find_in_row(y, start_col, end_col) != -1:
+                return y * self.tile_size if move_dir == 'down' else (y + 1) * self.tile_size
+        return None
@@ -0,0 +1,88 @@
+# Compositor.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame as pg
+
+from code.Const import COMPOSITOR_WORKERS
+
+
+class Layer:
+    """
+    Camada desenhada fora da tela em buffer duplo: o desenho do frame seguinte vai para o buffer de trás
+    enquanto o da frente (o último terminado) continua válido; ao terminar, os dois são trocados.
+    `render(superfície, *args)` desenha a camada inteira e retorna um valor repassado a quem pediu o resultado
+    (ex.: as regiões que mudaram). `args` guarda os parâmetros com que o buffer da frente foi desenhado.
+    """
+
+    def __init__(self, size, render, opaque=True):
+        flags = 0 if opaque else pg.SRCALPHA
+        self.buffers = [pg.Surface(size, flags), pg.Surface(size, flags)]
+        if pg.display.get_surface() is not None:
+            self.buffers = [buffer.convert() if opaque else buffer.convert_alpha() for buffer in self.buffers]
+        self.render = render
+        self.pending = None  # Future do desenho em andamento no buffer de trás
+        self.pending_args = None
+        self.value = None  # Retorno do último render terminado
+        self.args = None
+
+    @property
+    def front(self):
+        return self.buffers[0]
+
+    def _render_back(self, args):
+        return self.render(self.buffers[1], *args)
+
+    def _swap(self, value, args):
+        self.buffers.reverse()
+        self.value = value
+        self.args = args
+
+
+class LayerCompositor:
+    """
+    Desenha camadas independentes em threads de fundo (o pygame libera o GIL durante os blits) para que o
+    thread principal só precise compor as camadas prontas. submit() inicia o desenho de uma camada com os
+    parâmetros do frame e retorna na hora; result() espera o término, troca os buffers e retorna a superfície
+    pronta. Com workers=0 as camadas são desenhadas no próprio submit(), no thread principal.
+    """
+
+    def __init__(self, workers=COMPOSITOR_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='compositor') if workers else None
+        self.layers = {}
+
+    def add_layer(self, name, size, render, opaque=True):
+        layer = self.layers[name] = Layer(size, render, opaque)
+        return layer
+
+    def submit(self, name, *args):
+        """Começa a desenhar a camada no buffer de trás (esperando antes um desenho anterior não consumido)."""
+        layer = self.layers[name]
+        self.result(name)
+        if self.executor is None:
+            layer._swap(layer._render_back(args), args)
+        else:
+            layer.pending = self.executor.submit(layer._render_back, args)
+            layer.pending_args = args
+
+    def is_pending(self, name):
+        return self.layers[name].pending is not None
+
+    def result(self, name):
+        """
+        Espera a camada (se estiver sendo desenhada) e retorna (superfície pronta, valor do render, parâmetros
+        com que ela foi desenhada).
+        """
+        layer = self.layers[name]
+        if layer.pending is not None:
+            future, layer.pending = layer.pending, None
+            layer._swap(future.result(), layer.pending_args)
+        return layer.front, layer.value, layer.args
+
+    def shutdown(self):
+        """Espera os desenhos em andamento e encerra as threads."""
+        for name in self.layers:
+            self.result(name)
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -5,7 +5,13 @@ SCREEN_WIDTH = 1280
 SCREEN_HEIGHT = 768
 SCREEN_SIZE = (SCREEN_WIDTH, SCREEN_HEIGHT)
 TITLE = "Captain Clown Nose Game"
-FPS = 60
+FPS = 60  # Taxa máxima de desenho (frames por segundo)
+SIMULATION_HZ = 60  # Passos de simulação (física) por segundo, independente do FPS
+MAX_FRAME_TIME = 0.25  # Tempo máximo (s) de um frame considerado pela simulação, evita a "espiral da morte"
+FRAME_RATES = {'MENU': 30, 'GAME': FPS}  # Taxa de frames de cada estado no loop principal (code/Scheduler.py)
+FRAME_RATE_UNFOCUSED = 15  # Taxa máxima com a janela sem foco
+FRAME_RATE_MINIMIZED = 5  # Taxa máxima com a janela minimizada ou oculta
+FRAME_SPIN_TIME = 0.002  # Fim da espera de cada frame feito em espera ativa (s), para menos variação
 
 # Cores
 WHITE = (255, 255, 255)
@@ -19,14 +25,66 @@ BLUE = (0, 0, 255)
 # Configurações do Jogo
 TILE_SIZE = 64  # Tamanho de cada tile no mapa
 GRAVITY = 1
+MAX_FALL_SPEED = 15  # Velocidade vertical máxima (queda)
+ENTITY_CAPACITY = 256  # Capacidade inicial do EntityStore (cresce automaticamente)
+ENTITY_BATCH_MIN = 16  # Corpos ativos a partir dos quais o EntityStore simula em lote (NumPy)
 FONT_NAME = "Courier New"
 FONT_SIZE = 50
+# Threads que desenham o céu do próximo frame em segundo plano; 0 = no thread principal. Só compensa com núcleos
+# livres (com um núcleo o desenho do frame fica mais lento): meça com o profiler (F3) antes de ligar
+COMPOSITOR_WORKERS = 0
+TEXT_CACHE_SIZE = 256  # Strings renderizadas mantidas no cache LRU de cada fonte (code/Text.py)
+HUD_FONT_SIZE = 18  # Fonte do HUD (F2 liga/desliga)
+DIRTY_RECT_RENDERING = False  # Atualiza só as regiões alteradas da tela (opcional)
+DIRTY_RECT_FULL_REFRESH_RATIO = 0.5  # Fração da tela suja a partir da qual a tela toda é atualizada
+ASSET_CACHE_DIR = './.asset_cache'  # Cache em disco das imagens já redimensionadas
+ASSET_MEMORY_BUDGET = 64 * 1024 * 1024  # Bytes de pixels decodificados mantidos pelo AssetManager (LRU)
+ATLAS_MAX_PAGE_SIZE = (2048, 2048)  # Tamanho máximo de cada página do atlas de sprites
+TERRAIN_CHUNK_SIZE = 16  # Tiles por lado de cada chunk do mapa (dados e terreno pré-renderizado)
+TILE_STREAM_MARGIN = 1  # Chunks mantidos carregados além da área visível, em cada direção
+TERRAIN_BAKE_BUDGET = 2  # Chunks fora da tela pré-renderizados por frame (evita travadas ao rolar)
+INPUT_LATENCY_HISTORY = 240  # Medições de latência entrada -> tela guardadas (code/Input.py)
+PROFILER_HISTORY = 600  # Frames guardados pelo profiler (F3 liga/desliga, F4 exporta CSV/JSON)
+PROFILER_OVERLAY_INTERVAL = 15  # O overlay do profiler é redesenhado a cada N frames
+PROFILER_EXPORT_PATH = './frame_profile'  # Prefixo dos arquivos exportados (.csv e .json)
+CAPTURE_RING_SIZE = 8  # Frames copiados esperando o gravador da captura (code/Capture.py) antes de descartar
+CAPTURE_COMPRESS_LEVEL = 1  # Nível zlib dos frames capturados (0 = pixels crus, sem compressão)
+NET_HOST = '127.0.0.1'  # Endereço do servidor multijogador local (code/Network.py)
+NET_SPAWN_POS = (300, 600)  # Posição inicial preferida dos jogadores conectados (apoiados no chão abaixo dela)
+NET_SNAPSHOT_HISTORY = 64  # Snapshots (ticks) guardados como base para a compressão delta
+NET_INPUT_REDUNDANCY = 8  # Entradas ainda não confirmadas reenviadas em cada pacote do cliente
+NET_CLIENT_TIMEOUT = 5.0  # Segundos sem pacotes até o servidor desconectar um cliente
+NAV_CACHE_DIR = './.nav_cache'  # Grafos de navegação já calculados, um arquivo por mapa (code/Navigation.py)
+NAV_MAX_AIR_STEPS = 240  # Passos simulados de cada salto/queda antes de desistir (ex.: caiu para fora do mapa)
+NAV_JUMP_HOLD_STEPS = (0, 4, 8, 12, 18, 240)  # Passos com a direção pressionada nos saltos simulados
+NAV_FALL_HOLD_STEPS = (12, 16, 24, 240)  # Passos com a direção pressionada ao sair andando da borda
+NAV_PATH_CACHE_SIZE = 512  # Caminhos (A*) mantidos no cache LRU de cada grafo
 
 # Configurações do Jogador
+PLAYER_SPAWN_POS = (300, 600)  # Posição inicial preferida; o jogador é apoiado no primeiro chão abaixo dela
 PLAYER_JUMP_FORCE = -22
+JUMP_BUFFER_TIME = 0.1  # Um pulo pedido até este tempo (s) antes de tocar o chão é executado ao aterrissar
+PLAYER_SIZE = (128, 80)  # [largura, altura] dos sprites do jogador
 PLAYER_COLLIDER_SIZE = (46, 54) # [largura, altura] do collider
 PLAYER_SPEED = 5 # Velocidade de movimento horizontal
 PLAYER_ANIMATION_SPEED = 7 # Número de frames por imagem da animação (ex: 7 frames por imagem = 60/7 ≈ 8.5 FPS)
+WATER_ANIMATION_SPEED = 12  # Passos por imagem dos reflexos da água
+# Posições (pixels do mundo) das reflexões da água de cada tipo, desenhadas acompanhando a câmera
+WATER_POSITIONS = {
+    'big_water': ((300, 550),),
+    'medium_water': ((250, 600), (500, 625)),
+    'small_water': ((1000, 600), (900, 625)),
+}
+
+# Camadas do fundo com rolagem (code/Parallax.py), desenhadas nesta ordem sobre a imagem 'background'.
+# image: chave em load_background_assets(); speed: pixels por passo de simulação (0 = parada);
+# period: distância após a qual a camada se repete; positions: (x, y) de cada ocorrência no primeiro período
+PARALLAX_LAYERS = (
+    {'image': 'big_clouds', 'speed': 0.05, 'period': 896, 'positions': ((0, 315),)},
+    {'image': 'small_cloud_1', 'speed': 0.3, 'period': 1500, 'positions': ((120, 100), (900, 50))},
+    {'image': 'small_cloud_2', 'speed': 0.2, 'period': 1500, 'positions': ((250, 200), (1000, 150))},
+    {'image': 'small_cloud_3', 'speed': 0.2, 'period': 1500, 'positions': ((650, 250),)},
+)
 
 # Mapa (Apenas um bloco de dados)
 GAME_MAP = [
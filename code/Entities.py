@@ -0,0 +1,267 @@
+# Entities.py
+
+import numpy as np
+import pygame as pg
+
+from code.Const import GRAVITY, MAX_FALL_SPEED, ENTITY_CAPACITY, ENTITY_BATCH_MIN
+
+
+class EntityStore:
+    """
+    Armazena todos os corpos móveis (jogador, inimigos, itens) como estrutura de arrays NumPy.
+    Gravidade e colisão com os tiles rodam em operações em lote por passo, com as
+    mesmas regras do jogador original (GRAVITY, MAX_FALL_SPEED e as bordas de CollisionMap).
+    Posições e velocidades são inteiras (pixels), como no restante do jogo.
+
+    O movimento horizontal é guardado em duas componentes (move_left e move_right) aplicadas nesta ordem,
+    reproduzindo Player.move quando as duas teclas estão pressionadas.
+    Corpos cuja área do mapa não está carregada (fora do streaming da câmera) ficam congelados.
+    Com poucos corpos ativos (menos de ENTITY_BATCH_MIN) o custo fixo de cada operação NumPy domina,
+    então o passo usa as consultas escalares de CollisionMap, com as mesmas regras.
+    """
+
+    def __init__(self, collision_map, capacity=ENTITY_CAPACITY):
+        self.collision_map = collision_map
+        self.tile_map = collision_map.tile_map
+        self.tile_size = collision_map.tile_size
+
+        self.capacity = 0
+        self.count = 0  # Maior índice em uso + 1
+        self.free = []  # Índices liberados por remove(), reaproveitados por add()
+        self._allocate(max(1, capacity))
+
+        # Janela densa (NumPy) do bitmap sólido dos chunks carregados, refeita quando o streaming muda
+        self._window = None
+        self._window_key = None
+
+    def _allocate(self, capacity):
+        """Cria (ou aumenta) os arrays, preservando o conteúdo atual."""
+        def grow(array, shape, dtype, fill=0):
+            new = np.full(shape, fill, dtype)
+            if array is not None:
+                new[:len(array)] = array
+            return new
+
+        get = self.__dict__.get
+        self.alive = grow(get('alive'), capacity, bool)
+        self.pos = grow(get('pos'), (capacity, 2), np.int64)
+        self.previous_pos = grow(get('previous_pos'), (capacity, 2), np.int64)
+        self.vel_y = grow(get('vel_y'), capacity, np.int64)
+        self.move_left = grow(get('move_left'), capacity, np.int64)
+        self.move_right = grow(get('move_right'), capacity, np.int64)
+        self.collider_offset = grow(get('collider_offset'), (capacity, 2), np.int64)
+        self.collider_size = grow(get('collider_size'), (capacity, 2), np.int64)
+        self.on_ground = grow(get('on_ground'), capacity, bool)
+        self.has_gravity = grow(get('has_gravity'), capacity, bool)
+        self.capacity = capacity
+
+    def add(self, pos, collider_offset, collider_size, has_gravity=True):
+        """Adiciona um corpo e retorna o seu índice (estável até remove())."""
+        if self.free:
+            index = self.free.pop()
+        else:
+            if self.count == self.capacity:
+                self._allocate(self.capacity * 2)
+            index = self.count
+            self.count += 1
+
+        self.alive[index] = True
+        self.pos[index] = pos
+        self.previous_pos[index] = pos
+        self.vel_y[index] = 0
+        self.move_left[index] = 0
+        self.move_right[index] = 0
+        self.collider_offset[index] = collider_offset
+        self.collider_size[index] = collider_size
+        self.on_ground[index] = False
+        self.has_gravity[index] = has_gravity
+        return index
+
+    def remove(self, index):
+        """Remove um corpo; o índice poderá ser reutilizado."""
+        self.alive[index] = False
+        self.free.append(index)
+
+    def _solid_window(self):
+        """
+        Retorna (grade, primeira coluna, primeira linha): o bitmap sólido dos chunks carregados pelo
+        streaming como um array 2D. Sem streaming (mapas pequenos), a janela cobre o mapa inteiro.
+        """
+        tile_map = self.tile_map
+        chunk_range = tile_map.streamed_range or (0, tile_map.chunk_cols, 0, tile_map.chunk_rows)
+        key = (chunk_range, tile_map.version)
+        if key != self._window_key:
+            first_x, last_x, first_y, last_y = chunk_range
+            size = tile_map.chunk_size
+            grid = np.zeros(((last_y - first_y) * size, (last_x - first_x) * size), np.bool_)
+            for chunk_y in range(first_y, last_y):
+                for chunk_x in range(first_x, last_x):
+                    solid = np.frombuffer(tile_map.solid_chunk(chunk_x, chunk_y), np.uint8).reshape(size, size)
+                    top = (chunk_y - first_y) * size
+                    left = (chunk_x - first_x) * size
+                    grid[top:top + size, left:left + size] = solid
+            self._window = (grid, first_x * size, first_y * size)
+            self._window_key = key
+        return self._window
+
+    def _solid_at(self, rows, cols):
+        """Consulta vetorizada: True onde a célula (linha, coluna) é sólida. Fora da janela nada é sólido."""
+        grid, first_col, first_row = self._window
+        local_rows = rows - first_row
+        local_cols = cols - first_col
+        inside = (local_rows >= 0) & (local_rows < grid.shape[0]) & (local_cols >= 0) & (local_cols < grid.shape[1])
+        solid = np.zeros(rows.shape, np.bool_)
+        solid[inside] = grid[local_rows[inside], local_cols[inside]]
+        return solid
+
+    def _blocking_edges(self, indices, move_dir):
+        """
+        Versão em lote de CollisionMap.blocking_edge_x/_y: para cada corpo, retorna (colidiu, borda em pixels)
+        considerando todas as células cobertas pelo collider.
+        """
+        size = self.tile_size
+        left = self.pos[indices, 0] + self.collider_offset[indices, 0]
+        top = self.pos[indices, 1] + self.collider_offset[indices, 1]
+        right = left + self.collider_size[indices, 0]
+        bottom = top + self.collider_size[indices, 1]
+
+        start_col = np.maximum(0, left // size)
+        end_col = np.minimum(self.tile_map.cols, -(-right // size))
+        start_row = np.maximum(0, top // size)
+        end_row = np.minimum(self.tile_map.rows, -(-bottom // size))
+
+        hit = np.zeros(len(indices), np.bool_)
+        if move_dir in ('left', 'up'):
+            edge = np.full(len(indices), np.iinfo(np.int64).min, np.int64)
+        else:
+            edge = np.full(len(indices), np.iinfo(np.int64).max, np.int64)
+
+        max_rows = int(np.max(end_row - start_row, initial=0))
+        max_cols = int(np.max(end_col - start_col, initial=0))
+        for row_step in range(max_rows):
+            rows = start_row + row_step
+            for col_step in range(max_cols):
+                cols = start_col + col_step
+                cell_hit = (rows < end_row) & (cols < end_col) & self._solid_at(rows, cols)
+                hit |= cell_hit
+                if move_dir == 'left':
+                    edge = np.where(cell_hit, np.maximum(edge, (cols + 1) * size), edge)
+                elif move_dir == 'right':
+                    edge = np.where(cell_hit, np.minimum(edge, cols * size), edge)
+                elif move_dir == 'down':
+                    edge = np.where(cell_hit, np.minimum(edge, rows * size), edge)
+                else:
+                    edge = np.where(cell_hit, np.maximum(edge, (rows + 1) * size), edge)
+        return hit, edge
+
+    def _frozen(self, indices):
+        """Corpos dentro do mapa cuja área não está carregada não são simulados neste passo."""
+        grid, first_col, first_row = self._window
+        size = self.tile_size
+        center = self.pos[indices] + self.collider_offset[indices] + self.collider_size[indices] // 2
+        cols = center[:, 0] // size
+        rows = center[:, 1] // size
+        in_map = (cols >= 0) & (cols < self.tile_map.cols) & (rows >= 0) & (rows < self.tile_map.rows)
+        in_window = ((cols >= first_col) & (cols < first_col + grid.shape[1]) &
+                     (rows >= first_row) & (rows < first_row + grid.shape[0]))
+        return in_map & ~in_window
+
+    def _step_scalar(self, indices):
+        """Passo de step() corpo a corpo (poucos corpos): mesmas regras, usando CollisionMap diretamente."""
+        collision_map = self.collision_map
+        grid, first_col, first_row = self._window
+        size = self.tile_size
+        for index in indices:
+            # item() devolve escalares Python, bem mais baratos que os escalares NumPy neste laço
+            offset_x, offset_y = self.collider_offset.item(index, 0), self.collider_offset.item(index, 1)
+            collider = pg.Rect(self.pos.item(index, 0) + offset_x, self.pos.item(index, 1) + offset_y,
+                               self.collider_size.item(index, 0), self.collider_size.item(index, 1))
+
+            # Congelado: centro dentro do mapa, mas fora da janela carregada
+            col, row = collider.centerx // size, collider.centery // size
+            if (0 <= col < self.tile_map.cols and 0 <= row < self.tile_map.rows and
+                    not (first_col <= col < first_col + grid.shape[1] and
+                         first_row <= row < first_row + grid.shape[0])):
+                continue
+
+            # 1. Movimento horizontal (esquerda e depois direita)
+            move_left, move_right = self.move_left.item(index), self.move_right.item(index)
+            if move_left > 0:
+                collider.x -= move_left
+                edge = collision_map.blocking_edge_x(collider, 'left')
+                if edge is not None:
+                    collider.left = edge
+            if move_right > 0:
+                collider.x += move_right
+                edge = collision_map.blocking_edge_x(collider, 'right')
+                if edge is not None:
+                    collider.right = edge
+
+            # 2. Gravidade e colisão vertical
+            vel_y = self.vel_y.item(index)
+            if self.has_gravity.item(index):
+                vel_y = min(vel_y + GRAVITY, MAX_FALL_SPEED)
+            collider.y += vel_y
+            if vel_y != 0:
+                edge = collision_map.blocking_edge_y(collider, 'down' if vel_y > 0 else 'up')
+                if edge is None:
+                    self.on_ground[index] = False
+                elif vel_y > 0:  # Caindo (colisão por baixo)
+                    collider.bottom = edge
+                    self.on_ground[index] = True
+                    vel_y = 0
+                else:  # Pulando (colisão por cima)
+                    collider.top = edge
+                    vel_y = 0
+
+            self.pos[index, 0] = collider.x - offset_x
+            self.pos[index, 1] = collider.y - offset_y
+            self.vel_y[index] = vel_y
+
+    def step(self):
+        """Avança um passo de simulação para todos os corpos: movimento horizontal e gravidade."""
+        count = self.count
+        self.previous_pos[:count] = self.pos[:count]
+        self._solid_window()
+
+        if count < ENTITY_BATCH_MIN:
+            self._step_scalar([index for index in range(count) if self.alive.item(index)])
+            return
+        active = np.flatnonzero(self.alive[:count])
+        if len(active) < ENTITY_BATCH_MIN:
+            self._step_scalar(active.tolist())
+            return
+
+        active = active[~self._frozen(active)]
+        if len(active) == 0:
+            return
+
+        # 1. Movimento horizontal (esquerda e depois direita, como em Player.move)
+        for amount, move_dir, sign in ((self.move_left, 'left', -1), (self.move_right, 'right', 1)):
+            moving = active[amount[active] > 0]
+            if len(moving):
+                self.pos[moving, 0] += sign * amount[moving]
+                hit, edge = self._blocking_edges(moving, move_dir)
+                blocked = moving[hit]
+                if move_dir == 'left':
+                    self.pos[blocked, 0] = edge[hit] - self.collider_offset[blocked, 0]
+                else:
+                    self.pos[blocked, 0] = edge[hit] - self.collider_offset[blocked, 0] - self.collider_size[blocked, 0]
+
+        # 2. Gravidade e colisão vertical
+        falling_bodies = active[self.has_gravity[active]]
+        self.vel_y[falling_bodies] = np.minimum(self.vel_y[falling_bodies] + GRAVITY, MAX_FALL_SPEED)
+        self.pos[active, 1] += self.vel_y[active]
+
+        for move_dir, moving in (('down', active[self.vel_y[active] > 0]), ('up', active[self.vel_y[active] < 0])):
+            if len(moving) == 0:
+                continue
+            hit, edge = self._blocking_edges(moving, move_dir)
+            blocked = moving[hit]
+            if move_dir == 'down':  # Caindo (colisão por baixo)
+                self.pos[blocked, 1] = edge[hit] - self.collider_offset[blocked, 1] - self.collider_size[blocked, 1]
+                self.on_ground[blocked] = True
+            else:  # Pulando (colisão por cima)
+                self.pos[blocked, 1] = edge[hit] - self.collider_offset[blocked, 1]
+            self.vel_y[blocked] = 0
+            self.on_ground[moving[~hit]] = False
@@ -2,110 +2,205 @@
 
 import pygame as pg
 
-from code.Const import TITLE, GAME_MAP, TILE_SIZE, FPS
+from code.Animation import AnimationClock, AnimationClip
+from code.Camera import Camera
+from code.Compositor import LayerCompositor
+from code.Collision import CollisionMap
+from code.Const import TITLE, GAME_MAP, TILE_SIZE, FPS, DIRTY_RECT_RENDERING, SIMULATION_HZ, PROFILER_EXPORT_PATH, \
+    WATER_ANIMATION_SPEED, WATER_POSITIONS, SCREEN_SIZE, COMPOSITOR_WORKERS, PLAYER_SPAWN_POS
+from code.Entities import EntityStore
+from code.Hud import Hud
+from code.Input import InputQueue
+from code.Loader import AssetCache, ASSET_GROUPS, WATER_ASSET_KEYS
+from code.Parallax import ParallaxBackground
 from code.Player import Player
-from code.utils import load_background_assets, load_terrain_assets
+from code.Profiler import FrameProfiler
+from code.Renderer import DirtyRectRenderer
+from code.Terrain import TerrainLayer
+from code.TileMap import ChunkedTileMap
+from code.Timestep import FixedTimestep
 
 
 class Game:
-    def __init__(self, screen):
+    def __init__(self, screen, dirty_rects=DIRTY_RECT_RENDERING, simulation_hz=SIMULATION_HZ, render_fps=FPS,
+                 headless=False, assets=None, map_path=None, scheduler=None, input_queue=None):
         self.screen = screen
-        pg.display.set_caption(TITLE)
+        self.headless = headless  # Sem tela: apenas simulação (sem assets nem desenho)
+        if not headless:
+            pg.display.set_caption(TITLE)
         self.clock = pg.time.Clock()
         self.is_running = True
 
-        # Carregamento de Assets
-        self.background_assets = load_background_assets()
-        self.terrain_images = load_terrain_assets()
+        # Simulação em passo fixo, separada da taxa de desenho
+        self.timestep = FixedTimestep(simulation_hz)
+        self.render_fps = render_fps
+        self.scheduler = scheduler  # Ritmo dos frames do loop principal (code/Scheduler.py); sem ele, usa o clock
+
+        # Fila de eventos de teclado (code/Input.py): todos os KEYDOWN são guardados e consumidos um por passo
+        self.input_queue = input_queue if input_queue is not None else InputQueue()
+
+        # Gravação da entrada de cada passo (ver code/Replay.py)
+        self.recorder = None
+
+        # Captura dos frames apresentados (ver code/Capture.py), criada por quem inicia o jogo
+        self.capture = None
+
+        # Tempo de cada fase do frame (F3 liga/desliga o overlay, F4 exporta para CSV/JSON)
+        self.profiler = FrameProfiler()
+
+        # HUD com FPS, posição e taxas de acerto dos caches de texto (F2 liga/desliga)
+        self.hud = Hud()
+
+        # Renderização por regiões alteradas (opcional)
+        self.renderer = DirtyRectRenderer(screen) if dirty_rects and not headless else None
+
+        # Mapa em chunks: arquivo binário mapeado em memória (map_path) ou o GAME_MAP de Const.py
+        self.tile_map = ChunkedTileMap.open(map_path) if map_path else ChunkedTileMap.from_rows(GAME_MAP)
+        self.camera = Camera((self.tile_map.cols * TILE_SIZE, self.tile_map.rows * TILE_SIZE))
+
+        # Carregamento de Assets (grupos já carregados em segundo plano podem ser passados em `assets`); os que
+        # faltarem vêm de um AssetCache próprio, devolvido em exit(). Jogador, terreno e água chegam como
+        # subsurfaces das páginas de atlas (ATLAS_PARTS em code/Loader.py)
+        assets = dict(assets or {})
+        self.asset_cache = None
+        self.cached_groups = ()
+        if headless:
+            self.background_assets = {}
+            self.terrain_images = {}
+            self.terrain = None
+            player_animations = None
+        else:
+            self.cached_groups = tuple(name for name in ASSET_GROUPS if not assets.get(name))
+            if self.cached_groups:
+                self.asset_cache = AssetCache()
+                assets.update(self.asset_cache.acquire(self.cached_groups))
+            self.background_assets = assets['background']
+            player_animations = assets['player']
+            self.terrain_images = assets['terrain']
+            self.terrain = TerrainLayer(self.tile_map, self.terrain_images)
+
+        # Relógio global das animações (jogador, água e futuros NPCs resolvem o frame a partir dele)
+        self.animation_clock = AnimationClock()
 
         # Componentes do Jogo
-        self.player = Player(start_pos=[300, 600], game_map=GAME_MAP)
-
-        # Variáveis de Animação do Fundo
-        self.cloud_pos = {
-            'big_clouds_pos': 0,
-            'small_cloud_1_pos': 0,
-            'small_cloud_2_pos': 0,
-            'small_cloud_3_pos': 0,
-        }
-        self.water_animation_frame = {
-            'big_water': 0,
-            'medium_water': 0,
-            'small_water': 0,
-        }
-
-    def _update_background_and_clouds(self):
-        """Atualiza a posição das nuvens e desenha o fundo."""
-
-        # Background
-        self.screen.blit(self.background_assets['background'], (0, 0))
-
-        # Big Clouds (velocidade 0.05, repete a cada 896)
-        pos = self.cloud_pos['big_clouds_pos']
-        pos -= 0.05
-        if pos < -896:
-            pos = 0
-        self.cloud_pos['big_clouds_pos'] = pos
-        self.screen.blit(self.background_assets['big_clouds'], (pos, 315))
-        self.screen.blit(self.background_assets['big_clouds'], (pos + 896, 315))
-        self.screen.blit(self.background_assets['big_clouds'], (pos + (896 * 2), 315))
-
-        # Small Clouds (velocidade 0.3 e 0.2, repete a cada 1500)
-        # Cloud 1
-        pos1 = self.cloud_pos['small_cloud_1_pos']
-        pos1 -= 0.3
-        if pos1 < -1500:
-            pos1 = 0
-        self.cloud_pos['small_cloud_1_pos'] = pos1
-        self.screen.blit(self.background_assets['small_cloud_1'], (120 + pos1, 100))
-        self.screen.blit(self.background_assets['small_cloud_1'], (120 + pos1 + 1500, 100))
-        self.screen.blit(self.background_assets['small_cloud_1'], (900 + pos1, 50))
-        self.screen.blit(self.background_assets['small_cloud_1'], (900 + pos1 + 1500, 50))
-
-        # Cloud 2 & 3 (usam a mesma velocidade de 0.2 no original)
-        pos2 = self.cloud_pos['small_cloud_2_pos']
-        pos2 -= 0.2
-        if pos2 < -1500:
-            pos2 = 0
-        self.cloud_pos['small_cloud_2_pos'] = pos2
-        self.screen.blit(self.background_assets['small_cloud_2'], (250 + pos2, 200))
-        self.screen.blit(self.background_assets['small_cloud_2'], (250 + pos2 + 1500, 200))
-        self.screen.blit(self.background_assets['small_cloud_2'], (1000 + pos2, 150))
-        self.screen.blit(self.background_assets['small_cloud_2'], (1000 + pos2 + 1500, 150))
-
-        pos3 = self.cloud_pos['small_cloud_3_pos']
-        pos3 -= 0.2
-        if pos3 < -1500:
-            pos3 = 0
-        self.cloud_pos['small_cloud_3_pos'] = pos3
-        self.screen.blit(self.background_assets['small_cloud_3'], (650 + pos3, 250))
-        self.screen.blit(self.background_assets['small_cloud_3'], (650 + pos3 + 1500, 250))
-
-    def _animate_water(self, water_type, pos_list):
-        """Gerencia a animação e o desenho das reflexões da água."""
-        assets = self.background_assets[water_type]
-        frame = self.water_animation_frame[water_type]
-
-        # Calcula qual imagem usar (4 imagens, 48 frames totais, 12 frames por imagem)
-        idx = frame // 12
-
-        # Desenha em todas as posições
-        for pos in pos_list:
-            self.screen.blit(assets[idx], pos)
-
-        # Atualiza a frame (Ciclo de 0 a 47)
-        frame = (frame + 1) % 48
-        self.water_animation_frame[water_type] = frame
+        self.collision_map = CollisionMap(self.tile_map)
+        self.entities = EntityStore(self.collision_map)  # Todos os corpos móveis, simulados em lote
+        self.player = Player(start_pos=list(PLAYER_SPAWN_POS), game_map=self.tile_map,
+                             collision_map=self.collision_map, headless=headless, animations=player_animations,
+                             entity_store=self.entities, clock=self.animation_clock, simulation_hz=simulation_hz)
+        self.player.set_position(self.player.spawn_position(PLAYER_SPAWN_POS))
+        self.tile_map.stream(self.camera.target_rect(self.player.rect))
+
+        # Fundo com rolagem em camadas (nuvens), pré-composto em faixas
+        self.parallax = ParallaxBackground(self.background_assets)
+
+        # O céu (fundo + nuvens) não depende da câmera: o do próximo frame é desenhado numa thread de fundo, fora
+        # da tela, enquanto o thread principal desenha o resto deste frame; o próximo só copia a camada pronta.
+        # Com COMPOSITOR_WORKERS = 0 o céu é desenhado direto na tela, como as demais camadas
+        self.compositor = None
+        if not headless and COMPOSITOR_WORKERS:
+            self.compositor = LayerCompositor(COMPOSITOR_WORKERS)
+            self.compositor.add_layer('sky', SCREEN_SIZE, self.parallax.draw)
+
+        # Reflexos da água: um clip por tipo, todos sincronizados com o relógio global
+        self.water_clips = {key: AnimationClip.from_frames(self.background_assets[key], WATER_ANIMATION_SPEED)
+                            for key in WATER_ASSET_KEYS if key in self.background_assets}
+
+    def _blit(self, image, pos):
+        """Desenha um elemento dinâmico, registrando-o no renderer de regiões alteradas."""
+        rect = self.screen.blit(image, pos)
+        if self.renderer:
+            self.renderer.track(image, rect)
+
+    def _present(self):
+        """Envia o frame para o display (tela inteira ou apenas as regiões alteradas)."""
+        if self.renderer:
+            self.renderer.present()
+        else:
+            pg.display.update()
+
+    def _submit_sky(self):
+        """
+        Começa a desenhar o céu do próximo frame numa thread de fundo, enquanto este frame desenha o resto e o
+        próximo simula os seus passos. A rolagem é prevista supondo que o próximo frame dure o mesmo que o
+        último (FixedTimestep.predict); se a previsão errar, o céu é desenhado direto na tela.
+        """
+        steps, alpha = self.timestep.predict()
+        self.compositor.submit('sky', 1.0, self.parallax.offsets(alpha, steps))
+
+    def _update_background_and_clouds(self, alpha=1.0):
+        """Desenha o fundo e as nuvens, interpolando a rolagem entre os dois últimos passos."""
+        offsets = self.parallax.offsets(alpha)
+        sky = None
+        if self.compositor and self.compositor.is_pending('sky'):
+            sky, changed_rects, args = self.compositor.result('sky')
+            if args[1] != offsets:
+                sky = None  # Previsão errada: a camada pronta mostra outra rolagem
+        if sky is not None:
+            self.screen.blit(sky, (0, 0))  # Apenas um blit opaco da camada desenhada em segundo plano
+        else:
+            changed_rects = self.parallax.draw(self.screen, alpha, offsets)
+        if self.compositor:
+            self._submit_sky()
+        if self.renderer:
+            for rect in changed_rects:
+                self.renderer.add_dirty(rect)
+
+    def _animate_water(self, water_type):
+        """Desenha as reflexões da água (posições do mundo, vistas pela câmera) com o frame atual da animação."""
+        image = self.water_clips[water_type].frame_at(self.animation_clock.tick)
+        for pos in WATER_POSITIONS[water_type]:
+            self._blit(image, self.camera.to_screen(pos))
 
     def _draw_tiles(self):
-        """Desenha o mapa do jogo na tela."""
-        for y, row in enumerate(GAME_MAP):
-            for x, tile_char in enumerate(row):
-                if tile_char != ' ':
-                    # Otimização: Usa o dicionário de imagens carregadas
-                    image = self.terrain_images.get(tile_char)
-                    if image:
-                        self.screen.blit(image, (x * TILE_SIZE, y * TILE_SIZE))
+        """Desenha o mapa do jogo na tela (apenas os chunks pré-renderizados visíveis pela câmera)."""
+        self.terrain.draw(self.screen, self.camera.rect)
+
+    def set_tile(self, x, y, tile_char):
+        """Altera um tile do mapa durante o jogo, redesenhando somente o chunk afetado."""
+        self.collision_map.set_tile(x, y, tile_char)
+        if self.terrain:
+            self.terrain.set_tile(x, y, tile_char)
+        if self.renderer:
+            screen_pos = self.camera.to_screen((x * TILE_SIZE, y * TILE_SIZE))
+            self.renderer.add_dirty((screen_pos, (TILE_SIZE, TILE_SIZE)))
+
+    def exit(self):
+        """
+        Chamado quando a cena sai da pilha (code/Scene.py): encerra as threads de desenho e devolve os assets
+        do AssetCache próprio.
+        """
+        if self.compositor:
+            self.compositor.shutdown()
+        if self.asset_cache:
+            self.asset_cache.release(self.cached_groups)
+            self.asset_cache = None
+
+    def suspend(self):
+        """Chamado quando outra cena fica por cima desta (code/Scene.py)."""
+        self.input_queue.clear()
+
+    def resume(self):
+        """Chamado ao voltar ao topo: descarta o tempo em que a cena ficou suspensa e redesenha tudo."""
+        self.timestep.reset()
+        if self.renderer:
+            self.renderer.request_full_refresh()
+
+    def _toggle_hud(self):
+        """F2 liga/desliga o HUD."""
+        self.hud.toggle()
+        if self.renderer:
+            self.renderer.request_full_refresh()
+
+    def _handle_profiler_key(self, key):
+        """F3 liga/desliga o profiler de frames; F4 exporta as medições para CSV e JSON."""
+        if key == pg.K_F3:
+            self.profiler.toggle()
+            if self.renderer:
+                self.renderer.request_full_refresh()  # Apaga o overlay ao desligar
+        elif self.profiler.frames:
+            paths = self.profiler.export(PROFILER_EXPORT_PATH)
+            print(f"Profiler exportado: {', '.join(paths)}")
 
     def _handle_input(self, keys_pressed, key_event_key=None):
         """Trata as entradas do teclado e mouse para o jogo (em vez do menu)."""
@@ -113,9 +208,9 @@ class Game:
         # Movimento Horizontal
         self.player.move(keys_pressed)
 
-        # Pulo
+        # Pulo (pedido no ar, fica guardado por alguns passos e é executado ao tocar o chão)
         if key_event_key == pg.K_SPACE:
-            self.player.jump()
+            self.player.request_jump()
 
         # Sair
         if key_event_key == pg.K_ESCAPE:
@@ -125,41 +220,117 @@ class Game:
         return 'GAME'
 
     def update(self):
-        """Atualiza a lógica do jogo (físicas, animações, etc.)."""
+        """Atualiza a lógica do jogo (físicas, animações, etc.) em um passo fixo de simulação."""
+        self.animation_clock.advance()
+        self.entities.step()
         self.player.update()
 
-    def draw(self):
-        """Desenha todos os elementos na tela."""
-        self._update_background_and_clouds()
+        # Mantém carregados apenas os chunks do mapa ao redor da área que a câmera vai mostrar
+        self.tile_map.stream(self.camera.target_rect(self.player.rect))
+
+        self.parallax.advance()
+
+    def step(self, keys_pressed, key_event_key=None):
+        """Executa um único passo de simulação (entrada + lógica). Retorna o estado do jogo (GAME ou QUIT)."""
+        if self.recorder:
+            self.recorder.record(keys_pressed, key_event_key)
+
+        game_state = self._handle_input(keys_pressed, key_event_key)
+        self.profiler.lap('input')
+        if game_state == 'QUIT':
+            return 'QUIT'
+
+        self.update()
+        self.profiler.lap('update')
+        return 'GAME'
+
+    def draw(self, alpha=1.0):
+        """Desenha todos os elementos na tela, interpolando o jogador entre os dois últimos passos."""
+        player_pos = self.player.interpolated_pos(alpha)
+
+        # A câmera acompanha a posição interpolada; se ela se mover, a tela inteira muda
+        if self.camera.follow(pg.Rect(player_pos, self.player.rect.size)) and self.renderer:
+            self.renderer.request_full_refresh()
+        profiler = self.profiler
+        profiler.lap('camera')
+
+        self._update_background_and_clouds(alpha)
+        profiler.lap('background')
 
         # Desenha os tiles (terreno)
         self._draw_tiles()
+        profiler.lap('tiles')
 
         # Animação da Água
-        self._animate_water('big_water', [(300, 550)])
-        self._animate_water('medium_water', [(250, 600), (500, 625)])
-        self._animate_water('small_water', [(1000, 600), (900, 625)])
+        self._animate_water('big_water')
+        profiler.lap('water_big')
+        self._animate_water('medium_water')
+        profiler.lap('water_medium')
+        self._animate_water('small_water')
+        profiler.lap('water_small')
 
         # Desenha o jogador
-        self.screen.blit(self.player.image, self.player.rect)
-
-        pg.display.update()
+        self._blit(self.player.image, self.camera.to_screen(player_pos))
+        profiler.lap('player')
+
+        # HUD e overlay do profiler (o conteúdo muda a cada frame: as regiões são sempre marcadas como alteradas)
+        hud_rect = self.hud.draw(self.screen, self.player.pos)
+        if hud_rect and self.renderer:
+            self.renderer.add_dirty(hud_rect)
+        overlay_rect = profiler.draw_overlay(self.screen)
+        if overlay_rect and self.renderer:
+            self.renderer.add_dirty(overlay_rect)
+        profiler.lap('overlay')
+
+        self._present()
+        self.input_queue.frame_presented()
+        profiler.lap('present')
+
+        if self.capture:
+            self.capture.capture(self.screen)
+            profiler.lap('capture')
 
     def run(self, keys_pressed, key_event_key=None):
-        """Executa um frame do jogo. Retorna o estado do jogo (GAME ou QUIT)."""
-
-        # Entrada
-        game_state = self._handle_input(keys_pressed, key_event_key)
-        if game_state == 'QUIT':
-            return 'QUIT'
-
-        # Lógica
-        self.update()
+        """
+        Executa um frame do jogo. Retorna o estado do jogo (GAME ou QUIT).
+        A simulação roda em passos fixos (SIMULATION_HZ), independentemente da taxa de desenho (render_fps).
+        """
+
+        self.profiler.begin_frame()
+        input_queue = self.input_queue
+        if key_event_key is not None:
+            input_queue.push_key(key_event_key)  # Chamada sem fila compartilhada (ex.: scripts)
+
+        # Teclas do HUD e do profiler são tratadas por frame e não chegam à simulação (nem às gravações)
+        for event in input_queue.take(('hud_toggle', 'profiler_toggle', 'profiler_export')):
+            if event.action == 'hud_toggle':
+                self._toggle_hud()
+            else:
+                self._handle_profiler_key(event.key)
+
+        # Teclas mantidas convertidas para as canônicas (setas equivalem a A/D)
+        held_keys = input_queue.held(keys_pressed)
+
+        # Entrada e Lógica (zero ou mais passos fixos). Cada passo consome um evento da fila; os que
+        # sobram esperam os próximos passos (pode haver frames sem nenhum passo)
+        steps = self.timestep.advance()
+        for _ in range(steps):
+            event = input_queue.pop()
+            game_state = self.step(held_keys, event.key if event else None)
+            if event:
+                input_queue.mark_applied(event)
+            if game_state == 'QUIT':
+                return 'QUIT'
 
         # Desenho
-        self.draw()
+        if not self.headless:
+            self.draw(self.timestep.alpha)
 
-        # Controla o FPS
-        self.clock.tick(FPS)
+        # Limita a taxa de desenho (0 = sem limite)
+        if self.scheduler:
+            self.scheduler.end_frame('GAME')
+        else:
+            self.clock.tick(self.render_fps)
+        self.profiler.lap('sleep')
 
-        return 'GAME'
\ No newline at end of file
+        return 'GAME'
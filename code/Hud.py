@@ -0,0 +1,82 @@
+# Hud.py
+
+import time
+
+import pygame as pg
+
+from code.Const import HUD_FONT_SIZE, SCREEN_WIDTH, WHITE
+from code.Text import get_text_renderer, text_cache_stats
+
+# Rótulos do HUD, na ordem das linhas
+HUD_LABELS = ('FPS', 'x, y', 'texto', 'glifos')
+HUD_BACKGROUND = (0, 0, 0, 140)
+
+
+class Hud:
+    """
+    Informações do jogo por cima da tela (F2 liga/desliga): FPS, posição do jogador e as taxas de acerto
+    dos caches de texto (code/Text.py). O HUD é composto numa superfície própria, refeita só quando algum
+    valor exibido muda: os rótulos vêm do cache de strings e os valores, que mudam com frequência, são
+    montados com o cache de glifos. Nos demais frames o custo é um único blit.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.text = None  # Criado no primeiro desenho (pg.font precisa estar iniciado)
+        self.surface = None
+        self.shown_values = None
+
+        # FPS medido pelo intervalo entre os desenhos (média móvel exponencial)
+        self.last_draw = None
+        self.frame_time = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.last_draw = None
+        self.shown_values = None
+        return self.enabled
+
+    def _measure_fps(self):
+        now = time.perf_counter()
+        if self.last_draw is not None:
+            elapsed = now - self.last_draw
+            self.frame_time = elapsed if self.frame_time is None else self.frame_time * 0.9 + elapsed * 0.1
+        self.last_draw = now
+        return 1.0 / self.frame_time if self.frame_time else 0.0
+
+    def _create_surface(self):
+        """Fundo de tamanho fixo, criado uma única vez."""
+        self.text = get_text_renderer(HUD_FONT_SIZE)
+        self.line_height = self.text.get_linesize()
+        self.label_width = max(self.text.render(label, WHITE).get_width() for label in HUD_LABELS) + 10
+        self.background = pg.Surface((self.label_width + HUD_FONT_SIZE * 6,
+                                      self.line_height * len(HUD_LABELS) + 8), pg.SRCALPHA)
+        self.background.fill(HUD_BACKGROUND)
+
+    def _compose(self, values):
+        """Redesenha o fundo, os rótulos e os valores na superfície do HUD."""
+        # Copiar o fundo pronto é bem mais barato que preenchê-lo de novo (fill numa superfície com alfa)
+        surface = self.surface = self.background.copy()
+        for index, (label, value) in enumerate(zip(HUD_LABELS, values)):
+            line_y = 4 + index * self.line_height
+            surface.blit(self.text.render(label, WHITE), (6, line_y))
+            self.text.draw_glyphs(surface, value, (self.label_width, line_y), WHITE)
+
+    def draw(self, screen, player_pos, top_right=(SCREEN_WIDTH - 8, 8)):
+        """Desenha o HUD (se ligado) no canto superior direito e retorna o retângulo ocupado, ou None."""
+        if not self.enabled:
+            return None
+        if self.text is None:
+            self._create_surface()
+
+        stats = text_cache_stats()
+        values = (
+            f'{self._measure_fps():.0f}',
+            f'{player_pos[0]}, {player_pos[1]}',
+            f"{stats['string_hit_rate'] or 0:.1%}",
+            f"{stats['glyph_hit_rate'] or 0:.1%}",
+        )
+        if values != self.shown_values:
+            self.shown_values = values
+            self._compose(values)
+        return screen.blit(self.surface, (top_right[0] - self.surface.get_width(), top_right[1]))
@@ -0,0 +1,109 @@
+# Input.py
+
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+import pygame as pg
+
+from code.Const import INPUT_LATENCY_HISTORY
+
+# Ações do jogo e as teclas ligadas a cada uma. A primeira tecla é a canônica: é a que o jogo
+# (Player.move, Game._handle_input) e as gravações de replay enxergam.
+INPUT_BINDINGS = {
+    'left': (pg.K_a, pg.K_LEFT),
+    'right': (pg.K_d, pg.K_RIGHT),
+    'jump': (pg.K_SPACE, pg.K_w, pg.K_UP),
+    'quit': (pg.K_ESCAPE,),
+    'hud_toggle': (pg.K_F2,),
+    'profiler_toggle': (pg.K_F3,),
+    'profiler_export': (pg.K_F4,),
+}
+
+# Ações mantidas pressionadas (lidas a cada passo por held(), não entram na fila); as demais são eventos (KEYDOWN)
+HELD_ACTIONS = ('left', 'right')
+
+
+class ScriptedKeys(dict):
+    """Substituto de pg.key.get_pressed() para entradas programadas: teclas ausentes valem False."""
+
+    def __missing__(self, key):
+        return False
+
+
+# Um KEYDOWN na fila: ação, tecla canônica, tecla física e o instante em que foi recebido (perf_counter)
+InputEvent = namedtuple('InputEvent', 'action key raw_key timestamp')
+
+
+class InputQueue:
+    """
+    Fila de eventos de teclado com horário de chegada e mapeamento de teclas para ações.
+    Todos os KEYDOWN de ações discretas de um frame entram na fila (nenhum é descartado); as cenas
+    consomem os eventos em ordem. As ações mantidas (HELD_ACTIONS) não entram: o efeito delas vem do
+    estado do teclado (held()), e um evento delas ocuparia o lugar de um pulo num passo.
+    Também mede a latência entre a chegada de um evento e a apresentação do frame que mostra o seu efeito
+    (mark_applied() + frame_presented()).
+    """
+
+    def __init__(self, bindings=INPUT_BINDINGS, latency_history=INPUT_LATENCY_HISTORY):
+        self.bindings = bindings
+        self.key_actions = {key: action for action, keys in bindings.items() for key in keys}
+        self.events = deque()
+
+        self.applied = []  # Horários dos eventos já aplicados, esperando o próximo frame apresentado
+        self.latencies = deque(maxlen=latency_history)  # Latências medidas (s)
+
+    def push(self, event, timestamp=None):
+        """Enfileira um evento do pygame (apenas KEYDOWN de teclas ligadas a alguma ação)."""
+        if event.type == pg.KEYDOWN:
+            self.push_key(event.key, timestamp)
+
+    def push_key(self, raw_key, timestamp=None):
+        """Enfileira uma tecla pressionada. O horário padrão é o momento da chamada."""
+        action = self.key_actions.get(raw_key)
+        if action is None or action in HELD_ACTIONS:
+            return
+        key = self.bindings[action][0]
+        self.events.append(InputEvent(action, key, raw_key, time.perf_counter() if timestamp is None else timestamp))
+
+    def pop(self):
+        """Remove e retorna o evento mais antigo (ou None se a fila estiver vazia)."""
+        return self.events.popleft() if self.events else None
+
+    def take(self, actions):
+        """Remove da fila e retorna, em ordem, os eventos das ações informadas (os demais permanecem)."""
+        taken = [event for event in self.events if event.action in actions]
+        if taken:
+            self.events = deque(event for event in self.events if event.action not in actions)
+        return taken
+
+    def clear(self):
+        self.events.clear()
+        self.applied.clear()
+
+    def held(self, keys_pressed):
+        """Converte o estado do teclado nas teclas canônicas das ações mantidas (ex.: seta esquerda -> A)."""
+        held = ScriptedKeys()
+        for action in HELD_ACTIONS:
+            if any(keys_pressed[key] for key in self.bindings[action]):
+                held[self.bindings[action][0]] = True
+        return held
+
+    def mark_applied(self, event):
+        """Registra que o efeito do evento entrou na simulação; a latência fecha no próximo frame apresentado."""
+        self.applied.append(event.timestamp)
+
+    def frame_presented(self, now=None):
+        """Chamado logo após apresentar um frame: fecha a latência dos eventos aplicados desde o anterior."""
+        if self.applied:
+            now = time.perf_counter() if now is None else now
+            self.latencies.extend(now - timestamp for timestamp in self.applied)
+            self.applied.clear()
+
+    def latency_report(self):
+        """Latência entrada -> tela dos últimos eventos: p50, p99 e máximo em ms (None sem medições)."""
+        if not self.latencies:
+            return None
+        values = np.fromiter(self.latencies, np.float64) * 1000.0
+        p50, p99 = np.percentile(values, (50, 99))
+        return {'count': len(values), 'p50': float(p50), 'p99': float(p99), 'max': float(values.max())}
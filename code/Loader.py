@@ -0,0 +1,182 @@
+# Loader.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from code.Atlas import TextureAtlas
+from code.utils import load_background_assets, load_terrain_assets, load_player_assets, ASSET_IMAGE_COUNT, \
+    asset_manager
+
+# Grupos de assets carregados em segundo plano e a função responsável por cada um
+ASSET_GROUPS = {
+    'background': load_background_assets,
+    'terrain': load_terrain_assets,
+    'player': load_player_assets,
+}
+
+# Reflexos da água (grupo 'background'), desenhados por Game._animate_water
+WATER_ASSET_KEYS = ('big_water', 'medium_water', 'small_water')
+
+# Partes de cada grupo empacotadas em atlas ao carregar (None = o grupo inteiro). O fundo e as nuvens são
+# imagens grandes e únicas: ficam avulsos (no atlas só desperdiçariam área das páginas)
+ATLAS_PARTS = {
+    'background': WATER_ASSET_KEYS,
+    'terrain': None,
+    'player': None,
+}
+
+
+class LoadingProgress:
+    """Contador de imagens carregadas, seguro para ser atualizado por várias threads."""
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self._lock = threading.Lock()
+
+    def advance(self):
+        with self._lock:
+            self.done += 1
+
+    @property
+    def fraction(self):
+        """Progresso entre 0 e 1."""
+        return min(1.0, self.done / self.total) if self.total else 1.0
+
+
+class AssetLoader:
+    """
+    Carrega os assets do jogo em threads de fundo enquanto o Menu é exibido.
+    Cada grupo (fundo, terreno, jogador) tem o seu future; result() espera apenas pelos grupos que
+    ainda não terminaram. A tela (pg.display.set_mode) precisa existir antes de start(), pois as
+    imagens são convertidas com convert_alpha().
+    """
+
+    def __init__(self, groups=ASSET_GROUPS):
+        self.groups = groups
+        self.progress = LoadingProgress(sum(ASSET_IMAGE_COUNT[name] for name in groups))
+        self.futures = {}
+        self._executor = None
+
+    def start(self):
+        """Inicia o carregamento de todos os grupos em segundo plano."""
+        self._executor = ThreadPoolExecutor(max_workers=len(self.groups), thread_name_prefix='asset-loader')
+        for name, load in self.groups.items():
+            self.futures[name] = self._executor.submit(load, self.progress)
+        self._executor.shutdown(wait=False)
+        return self
+
+    def is_done(self, name=None):
+        """True se o grupo informado (ou todos, se nenhum for informado) já terminou de carregar."""
+        if name is not None:
+            return self.futures[name].done()
+        return all(future.done() for future in self.futures.values())
+
+    def result(self, names=None):
+        """Retorna {grupo: assets}, bloqueando apenas enquanto os grupos pedidos ainda estiverem carregando."""
+        names = self.groups if names is None else names
+        return {name: self.futures[name].result() for name in names}
+
+    def take(self, name):
+        """Como result([name])[name], mas o loader deixa de guardar os assets (o future é descartado)."""
+        assets = self.futures[name].result()
+        del self.futures[name]
+        return assets
+
+
+def _surfaces(assets):
+    """Superfícies de uma estrutura de assets (dicts/listas)."""
+    if isinstance(assets, dict):
+        for value in assets.values():
+            yield from _surfaces(value)
+    elif isinstance(assets, (list, tuple)):
+        for value in assets:
+            yield from _surfaces(value)
+    else:
+        yield assets
+
+
+class AssetCache:
+    """
+    Grupos de assets compartilhados entre as cenas, com contagem de referências.
+    acquire() entrega os grupos pedidos (aproveitando um carregamento em segundo plano iniciado por
+    preload()) e release() devolve; quando nenhuma cena usa mais um grupo, ele deixa o cache.
+    As partes de cada grupo listadas em ATLAS_PARTS são empacotadas num atlas (code/Atlas.py) ao carregar:
+    as superfícies avulsas ficam fixadas no asset_manager (code/utils.py) só até serem copiadas para as
+    páginas e então saem dele, restando uma única cópia dos pixels. As páginas e as superfícies que ficaram
+    avulsas contam no orçamento de memória (fixadas) enquanto o grupo estiver no cache.
+    """
+
+    def __init__(self, groups=ASSET_GROUPS, atlas_parts=ATLAS_PARTS):
+        self.groups = groups
+        self.atlas_parts = atlas_parts
+        self.loaded = {}  # grupo -> assets residentes
+        self.atlases = {}  # grupo -> TextureAtlas com as páginas do grupo
+        self.pinned = {}  # grupo -> chaves do asset_manager das superfícies que ficaram avulsas
+        self.ref_counts = {}  # grupo -> número de cenas usando o grupo
+        self.loaders = {}  # grupo -> AssetLoader que o está carregando em segundo plano
+
+    def _load(self, name, progress=None):
+        """
+        Carrega um grupo e empacota as suas partes de atlas_parts, liberando as superfícies copiadas para as
+        páginas. Retorna (assets, atlas, chaves que seguem fixadas).
+        """
+        with asset_manager.pinning() as keys:
+            assets = self.groups[name](progress)
+
+        parts = self.atlas_parts.get(name, ())
+        sources = assets if parts is None else {part: assets[part] for part in parts}
+        atlas = TextureAtlas(manager=asset_manager)
+        packed = atlas.pack(sources)
+        assets = packed if parts is None else {**assets, **packed}
+
+        copied = {id(surface) for surface in _surfaces(sources)}
+        is_copied = [id(asset_manager.peek(*key)) in copied for key in keys]
+        asset_manager.unpin([key for key, flag in zip(keys, is_copied) if flag], discard=True)
+        return assets, atlas, [key for key, flag in zip(keys, is_copied) if not flag]
+
+    def preload(self, names):
+        """
+        Começa a carregar em segundo plano os grupos ainda não residentes.
+        Retorna o AssetLoader iniciado (para acompanhar o progresso), ou None se nada precisou ser carregado.
+        """
+        missing = {name: partial(self._load, name) for name in names
+                   if name not in self.loaded and name not in self.loaders}
+        if not missing:
+            return None
+        loader = AssetLoader(missing).start()
+        for name in missing:
+            self.loaders[name] = loader
+        return loader
+
+    def is_ready(self, names):
+        """True se todos os grupos já estão residentes ou terminaram de carregar em segundo plano."""
+        return all(name in self.loaded or (name in self.loaders and self.loaders[name].is_done(name))
+                   for name in names)
+
+    def acquire(self, names):
+        """Retorna {grupo: assets}, carregando (ou esperando o carregamento de) os que faltarem."""
+        result = {}
+        for name in names:
+            if name not in self.loaded:
+                loader = self.loaders.pop(name, None)
+                self.loaded[name], self.atlases[name], self.pinned[name] = \
+                    loader.take(name) if loader else self._load(name)
+            self.ref_counts[name] = self.ref_counts.get(name, 0) + 1
+            result[name] = self.loaded[name]
+        return result
+
+    def release(self, names):
+        """Devolve grupos obtidos com acquire(); grupos sem nenhuma referência deixam o cache."""
+        for name in names:
+            self.ref_counts[name] -= 1
+            if self.ref_counts[name] == 0:
+                del self.ref_counts[name]
+                del self.loaded[name]
+                self.atlases.pop(name).release()
+                asset_manager.unpin(self.pinned.pop(name))
+
+    def memory_report(self):
+        """Relatório de memória do atlas de cada grupo residente (TextureAtlas.memory_report)."""
+        return {name: atlas.memory_report() for name, atlas in self.atlases.items()}
@@ -1,20 +1,46 @@
 # Menu.py
 
 import pygame as pg
-from code.Const import SCREEN_SIZE, TITLE, WHITE, BLACK, FONT_NAME, FONT_SIZE
+from code.Const import SCREEN_SIZE, TITLE, WHITE, BLACK, PURPLE_DARK, PURPLE_LIGHT, FONT_SIZE, \
+    DIRTY_RECT_RENDERING
+from code.Input import InputQueue
+from code.Text import get_text_renderer
 
 
 class Menu:
-    def __init__(self, screen):
+    def __init__(self, screen, dirty_rects=DIRTY_RECT_RENDERING, loader=None, scheduler=None, input_queue=None):
         self.screen = screen
-        self.font = pg.font.SysFont(FONT_NAME, FONT_SIZE, bold=True)
-        self.title_text = self.font.render(TITLE, True, WHITE)
-        self.start_text = self.font.render("Pressione ESPAÇO para Começar", True, BLACK)
-        self.quit_text = self.font.render("Pressione ESC para Sair", True, BLACK)
+        self.text = get_text_renderer(FONT_SIZE)  # Textos em cache (code/Text.py), compartilhados entre cenas
+        self.title_text = self.text.render(TITLE, WHITE)
+        self.start_text = self.text.render("Pressione ESPAÇO para Começar", BLACK)
+        self.quit_text = self.text.render("Pressione ESC para Sair", BLACK)
         self.clock = pg.time.Clock()
 
+        # No modo de regiões alteradas o menu (estático) só é redesenhado quando invalidado
+        self.dirty_rects = dirty_rects
+        self.needs_redraw = True
+
+        # Progresso do carregamento dos assets do jogo em segundo plano (code/Loader.py)
+        self.loader = loader
+        self.small_text = get_text_renderer(FONT_SIZE // 2)
+        self.shown_progress = None
+
+        # Ritmo dos frames (code/Scheduler.py), compartilhado com o loop principal
+        self.scheduler = scheduler
+
+        # Fila de eventos de teclado (code/Input.py), compartilhada com o loop principal
+        self.input_queue = input_queue if input_queue is not None else InputQueue()
+
+    def invalidate(self):
+        """Força o redesenho completo do menu no próximo frame (ex.: ao voltar para este estado)."""
+        self.needs_redraw = True
+
     def draw(self):
         """Desenha os elementos do menu."""
+        if self.dirty_rects and not self.needs_redraw:
+            return  # Nada mudou desde o último frame apresentado
+        self.needs_redraw = False
+
         self.screen.fill(WHITE)  # Fundo branco para o menu
 
         # Centraliza o título
@@ -28,17 +54,60 @@ class Menu:
         quit_rect = self.quit_text.get_rect(center=(SCREEN_SIZE[0] // 2, SCREEN_SIZE[1] // 2 + 70))
         self.screen.blit(self.quit_text, quit_rect)
 
+        if self.loader:
+            self._draw_loading_progress()
+
         pg.display.update()
 
-    def run(self, key_event_key=None):
+    def _draw_loading_progress(self):
+        """Desenha a barra de progresso do carregamento dos assets."""
+        fraction = self.loader.progress.fraction
+        bar_rect = pg.Rect(0, 0, SCREEN_SIZE[0] // 2, 16)
+        bar_rect.center = (SCREEN_SIZE[0] // 2, SCREEN_SIZE[1] // 2 + 180)
+        pg.draw.rect(self.screen, PURPLE_LIGHT, bar_rect)
+        pg.draw.rect(self.screen, PURPLE_DARK, (bar_rect.left, bar_rect.top, int(bar_rect.width * fraction),
+                                                bar_rect.height))
+
+        label = "Pronto!" if self.loader.is_done() else f"Carregando... {int(fraction * 100)}%"
+        label_text = self.small_text.render(label, BLACK)
+        self.screen.blit(label_text, label_text.get_rect(midbottom=(bar_rect.centerx, bar_rect.top - 8)))
+
+    def resume(self):
+        """Chamado ao voltar ao topo da pilha de cenas (code/Scene.py)."""
+        self.invalidate()
+
+    def is_idle(self):
+        """True se nada no menu muda sem uma entrada do usuário (o loop pode bloquear esperando eventos)."""
+        self._check_loading_progress()
+        return not self.needs_redraw and (self.loader is None or self.loader.is_done())
+
+    def _check_loading_progress(self):
+        """Marca o menu para redesenho quando o progresso do carregamento muda."""
+        if self.loader:
+            progress = (self.loader.progress.done, self.loader.is_done())
+            if progress != self.shown_progress:
+                self.shown_progress = progress
+                self.invalidate()
+
+    def run(self, keys_pressed=None, key_event_key=None):
         """Executa o loop do menu. Retorna o estado ('MENU', 'GAME' ou 'QUIT')."""
 
+        self._check_loading_progress()
         self.draw()
 
-        if key_event_key == pg.K_SPACE:
-            return 'GAME'  # Inicia o jogo
+        if self.scheduler:
+            self.scheduler.end_frame('MENU')
+
+        if key_event_key is not None:
+            self.input_queue.push_key(key_event_key)
+
+        # Todos os eventos do frame são vistos (a fila é esvaziada); a primeira opção escolhida vale
+        while (event := self.input_queue.pop()) is not None:
+            if event.raw_key == pg.K_SPACE:
+                self.input_queue.clear()  # O espaço que inicia o jogo não vira um pulo
+                return 'GAME'  # Inicia o jogo
 
-        if key_event_key == pg.K_ESCAPE:
-            return 'QUIT'  # Sai do jogo
+            if event.raw_key == pg.K_ESCAPE:
+                return 'QUIT'  # Sai do jogo
 
-        return 'MENU'
\ No newline at end of file
+        return 'MENU'
@@ -0,0 +1,399 @@
+# Navigation.py
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import random
+import struct
+import time
+from collections import OrderedDict, deque, namedtuple
+
+import numpy as np
+
+from code.Collision import CollisionMap
+from code.Const import (GAME_MAP, GRAVITY, MAX_FALL_SPEED, PLAYER_JUMP_FORCE, PLAYER_SPEED, PLAYER_COLLIDER_SIZE,
+                        TILE_SIZE, NAV_CACHE_DIR, NAV_MAX_AIR_STEPS, NAV_JUMP_HOLD_STEPS, NAV_FALL_HOLD_STEPS,
+                        NAV_PATH_CACHE_SIZE, NET_SPAWN_POS)
+from code.Entities import EntityStore
+from code.TileMap import ChunkedTileMap, EMPTY_TILE
+
+NAV_FORMAT_VERSION = 1  # Muda quando o formato do arquivo ou as regras de construção do grafo mudam
+MAP_KEY_HEADER = struct.Struct('<III')  # largura, altura e lado do chunk, somados aos bytes do mapa na chave
+
+# Faixa contínua de tiles em que se pode ficar de pé: tiles sólidos da linha `row` (colunas first..last,
+# inclusive) com espaço livre logo acima
+NavSpan = namedtuple('NavSpan', 'row first last')
+
+# Salto ou queda de uma faixa para outra, simulado com a física real: partindo parado sobre `from_col`,
+# pressionar `direction` (-1 esquerda, 0 nenhuma, 1 direita) por `hold_steps` passos (pulando no primeiro
+# passo se `jump`) leva a aterrissar sobre `to_col` da faixa `target` após `steps` passos
+NavEdge = namedtuple('NavEdge', 'source target from_col to_col direction jump hold_steps steps')
+
+# Custo (em passos) de andar uma coluna dentro de uma faixa
+WALK_COST = TILE_SIZE / PLAYER_SPEED
+
+
+def _physics_key():
+    """Tudo o que muda os arcos simulados: constantes da física e os parâmetros das tentativas."""
+    return repr((NAV_FORMAT_VERSION, GRAVITY, MAX_FALL_SPEED, PLAYER_JUMP_FORCE, PLAYER_SPEED, PLAYER_COLLIDER_SIZE,
+                 TILE_SIZE, NAV_MAX_AIR_STEPS, NAV_JUMP_HOLD_STEPS, NAV_FALL_HOLD_STEPS))
+
+
+def map_key(tile_map, data=None):
+    """Identificador do grafo de um mapa: hash dos tiles (com as alterações em tempo de execução) e da física."""
+    data = tile_map.snapshot() if data is None else data
+    digest = hashlib.sha1(MAP_KEY_HEADER.pack(tile_map.cols, tile_map.rows, tile_map.chunk_size))
+    digest.update(data)
+    digest.update(_physics_key().encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _solid_grid(tile_map, data):
+    """Bitmap sólido do mapa inteiro (linhas x colunas) a partir dos bytes dos chunks."""
+    size = tile_map.chunk_size
+    tiles = np.frombuffer(data, np.uint8).reshape(tile_map.chunk_rows, tile_map.chunk_cols, size, size)
+    tiles = tiles.transpose(0, 2, 1, 3).reshape(tile_map.chunk_rows * size, tile_map.chunk_cols * size)
+    return tiles[:tile_map.rows, :tile_map.cols] != EMPTY_TILE
+
+
+def find_spans(solid):
+    """Faixas em que se pode ficar de pé: sequências de tiles sólidos com o tile de cima vazio."""
+    surface = solid.copy()
+    surface[1:] &= ~solid[:-1]  # A primeira linha não tem nada acima
+    spans = []
+    for row in range(surface.shape[0]):
+        columns = np.flatnonzero(surface[row]).tolist()
+        first = previous = None
+        for column in columns:
+            if previous is None or column != previous + 1:
+                if previous is not None:
+                    spans.append(NavSpan(row, first, previous))
+                first = column
+            previous = column
+        if previous is not None:
+            spans.append(NavSpan(row, first, previous))
+    return spans
+
+
+def _trials(spans):
+    """
+    Tentativas simuladas, como (faixa, coluna, direção, pulo, passos pressionando): de cada coluna, pulos
+    parado e para cada lado com diferentes durações; das pontas, sair andando da borda.
+    """
+    trials = []
+    for index, span in enumerate(spans):
+        for column in range(span.first, span.last + 1):
+            trials.append((index, column, 0, True, 0))
+            for direction in (-1, 1):
+                for hold in NAV_JUMP_HOLD_STEPS:
+                    if hold:
+                        trials.append((index, column, direction, True, hold))
+        for hold in NAV_FALL_HOLD_STEPS:
+            trials.append((index, span.first, -1, False, hold))
+            trials.append((index, span.last, 1, False, hold))
+    return trials
+
+
+def _simulate(tile_map, trials, spans):
+    """
+    Simula todas as tentativas de uma vez, cada uma como um corpo do EntityStore (em lote, com as mesmas
+    regras de movimento e colisão do jogo). Retorna, por tentativa, (passos, x, y) do collider ao aterrissar,
+    ou None se não aterrissou (parou na própria faixa, caiu para fora do mapa ou passou de NAV_MAX_AIR_STEPS).
+    """
+    count = len(trials)
+    results = [None] * count
+    if count == 0:
+        return results
+
+    width, height = PLAYER_COLLIDER_SIZE
+    store = EntityStore(CollisionMap(tile_map), capacity=count)
+    for span_index, column, _, _, _ in trials:
+        # Collider (deslocamento 0, 0) centrado na coluna, apoiado no topo do tile
+        store.add((column * TILE_SIZE + (TILE_SIZE - width) // 2, spans[span_index].row * TILE_SIZE - height),
+                  (0, 0), PLAYER_COLLIDER_SIZE)
+
+    direction = np.array([trial[2] for trial in trials], np.int64)
+    jump = np.array([trial[3] for trial in trials], np.bool_)
+    hold = np.array([trial[4] for trial in trials], np.int64)
+    store.on_ground[:count] = ~jump
+    store.vel_y[:count] = np.where(jump, PLAYER_JUMP_FORCE, 0)  # Como Player.jump(), antes do primeiro passo
+    airborne = jump.copy()
+    bottom_limit = tile_map.rows * TILE_SIZE
+
+    for step in range(NAV_MAX_AIR_STEPS):
+        alive = store.alive[:count]
+        if not alive.any():
+            break
+        holding = alive & (step < hold)
+        store.move_left[:count] = np.where(holding & (direction < 0), PLAYER_SPEED, 0)
+        store.move_right[:count] = np.where(holding & (direction > 0), PLAYER_SPEED, 0)
+        store.step()
+
+        on_ground = store.on_ground[:count]
+        airborne |= alive & ~on_ground
+        landed = alive & airborne & on_ground
+        stopped = alive & ~airborne & (step + 1 >= hold)  # Soltou a direção sem sair do chão
+        fell = alive & (store.pos[:count, 1] >= bottom_limit)
+        for index in np.flatnonzero(landed).tolist():
+            results[index] = (step + 1, store.pos.item(index, 0), store.pos.item(index, 1))
+        for index in np.flatnonzero(landed | stopped | fell).tolist():
+            store.remove(index)
+    return results
+
+
+def _landing_column(span_at, x, y):
+    """(faixa, coluna) em que o collider apoiado em (x, y) está: a coluna do centro ou a coberta mais próxima."""
+    width, height = PLAYER_COLLIDER_SIZE
+    bottom = y + height
+    if bottom % TILE_SIZE:
+        return None
+    row = bottom // TILE_SIZE
+    center = (x + width // 2) // TILE_SIZE
+    covered = range(x // TILE_SIZE, (x + width - 1) // TILE_SIZE + 1)
+    for column in sorted(covered, key=lambda column: abs(column - center)):
+        span = span_at.get((row, column))
+        if span is not None:
+            return span, column
+    return None
+
+
+def build_nav_graph(tile_map, data=None):
+    """Calcula o grafo de navegação de um mapa simulando os saltos e quedas a partir de todas as faixas."""
+    start_time = time.perf_counter()
+    data = tile_map.snapshot() if data is None else data
+    # Cópia própria do mapa (sem streaming): a simulação enxerga o mapa inteiro e não mexe no do jogo
+    private_map = ChunkedTileMap(data, tile_map.cols, tile_map.rows, tile_map.chunk_size)
+    spans = find_spans(_solid_grid(tile_map, data))
+    span_at = {(span.row, column): index for index, span in enumerate(spans)
+               for column in range(span.first, span.last + 1)}
+
+    trials = _trials(spans)
+    best = {}
+    for trial, result in zip(trials, _simulate(private_map, trials, spans)):
+        if result is None:
+            continue
+        landing = _landing_column(span_at, result[1], result[2])
+        if landing is None or landing[0] == trial[0]:
+            continue  # Dentro da mesma faixa basta andar
+        source, from_col, direction, jump, hold = trial
+        # O custo nunca é menor que andar a mesma distância: mantém a heurística do A* consistente
+        steps = max(result[0], abs(landing[1] - from_col) * WALK_COST)
+        key = (source, from_col, landing[0], landing[1])
+        if key not in best or steps < best[key].steps:
+            best[key] = NavEdge(source, landing[0], from_col, landing[1], direction, jump, min(hold, result[0]),
+                                steps)
+
+    graph = NavGraph(spans, list(best.values()), map_key(tile_map, data))
+    graph.build_time = time.perf_counter() - start_time
+    graph.trial_count = len(trials)
+    return graph
+
+
+class NavGraph:
+    """
+    Grafo de navegação do jogador: as faixas em que se pode ficar de pé são os nós e os saltos e quedas
+    simulados com a física real são as arestas (andar dentro de uma faixa é implícito). find_path() faz a
+    busca A* com custo em passos de simulação e guarda os caminhos num cache LRU.
+    """
+
+    def __init__(self, spans, edges, key, map_version=0):
+        self.spans = spans
+        self.edges = edges
+        self.key = key
+        self.map_version = map_version  # tile_map.version quando o grafo foi obtido (ver outdated())
+        self.build_time = None  # Segundos da construção; None quando carregado do disco
+        self.trial_count = 0
+
+        self.span_at = {(span.row, column): index for index, span in enumerate(spans)
+                        for column in range(span.first, span.last + 1)}
+        self.last_row = max((span.row for span in spans), default=-1)
+        self.outgoing = [[] for _ in spans]
+        for edge in edges:
+            self.outgoing[edge.source].append(edge)
+
+        self.paths = OrderedDict()  # ((faixa, coluna) de partida, (faixa, coluna) de destino) -> arestas ou None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def outdated(self, tile_map):
+        """True se o mapa foi alterado (set_tile) depois que o grafo foi obtido."""
+        return tile_map.version != self.map_version
+
+    def locate(self, pos):
+        """(faixa, coluna) do chão logo abaixo do ponto `pos` (pixels do mundo), ou None se não houver."""
+        column = int(pos[0]) // TILE_SIZE
+        for row in range(max(0, int(pos[1]) // TILE_SIZE), self.last_row + 1):
+            span = self.span_at.get((row, column))
+            if span is not None:
+                return span, column
+        return None
+
+    def find_path(self, start, goal):
+        """
+        Sequência de saltos e quedas (NavEdge) para ir do chão abaixo de `start` ao chão abaixo de `goal`
+        (pontos em pixels); entre uma aresta e a seguinte, anda-se até `from_col`. Retorna [] se os dois
+        estão na mesma faixa e None se o destino é inalcançável.
+        """
+        origin = self.locate(start)
+        target = self.locate(goal)
+        if origin is None or target is None:
+            return None
+
+        key = (origin, target)
+        path = self.paths.get(key, False)
+        if path is not False:
+            self.paths.move_to_end(key)
+            self.cache_hits += 1
+            return None if path is None else list(path)
+
+        self.cache_misses += 1
+        path = self._search(origin, target)
+        self.paths[key] = path
+        if len(self.paths) > NAV_PATH_CACHE_SIZE:
+            self.paths.popitem(last=False)
+        return None if path is None else list(path)
+
+    def _search(self, origin, target):
+        """A* sobre os estados (faixa, coluna de chegada); a heurística é andar em linha reta até o destino."""
+        goal_span, goal_column = target
+        if origin[0] == goal_span:
+            return ()
+
+        def heuristic(column):
+            return abs(goal_column - column) * WALK_COST
+
+        best_cost = {origin: 0.0}
+        came_from = {}
+        queue = [(heuristic(origin[1]), 0.0, origin)]
+        while queue:
+            _, cost, state = heapq.heappop(queue)
+            if cost > best_cost[state]:
+                continue  # Entrada antiga na fila
+            span, column = state
+            if span == goal_span:
+                path = []
+                while state != origin:
+                    state, edge = came_from[state]
+                    path.append(edge)
+                return tuple(reversed(path))
+            for edge in self.outgoing[span]:
+                next_state = (edge.target, edge.to_col)
+                next_cost = cost + abs(edge.from_col - column) * WALK_COST + edge.steps
+                if next_cost < best_cost.get(next_state, float('inf')):
+                    best_cost[next_state] = next_cost
+                    came_from[next_state] = (state, edge)
+                    heapq.heappush(queue, (next_cost + heuristic(edge.to_col), next_cost, next_state))
+        return None
+
+    def reachable(self, span):
+        """Índices das faixas alcançáveis a partir da faixa `span` (ela inclusa)."""
+        seen = {span}
+        queue = deque([span])
+        while queue:
+            for edge in self.outgoing[queue.popleft()]:
+                if edge.target not in seen:
+                    seen.add(edge.target)
+                    queue.append(edge.target)
+        return seen
+
+    def cache_stats(self):
+        total = self.cache_hits + self.cache_misses
+        return {'paths': len(self.paths), 'hits': self.cache_hits, 'misses': self.cache_misses,
+                'hit_rate': self.cache_hits / total if total else None}
+
+    def to_json(self):
+        return {'version': NAV_FORMAT_VERSION, 'key': self.key,
+                'spans': [list(span) for span in self.spans], 'edges': [list(edge) for edge in self.edges]}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls([NavSpan(*span) for span in data['spans']], [NavEdge(*edge) for edge in data['edges']],
+                   data['key'])
+
+
+def _nav_cache_path(key):
+    return os.path.join(NAV_CACHE_DIR, key + '.json')
+
+
+def load_nav_graph(tile_map, use_cache=True):
+    """
+    Grafo de navegação do mapa: lido do cache em disco se já foi calculado para estes tiles e esta física
+    (a chave muda quando qualquer um dos dois muda), ou construído e gravado.
+    """
+    data = tile_map.snapshot()
+    key = map_key(tile_map, data)
+    cache_path = _nav_cache_path(key)
+    graph = None
+    if use_cache:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as file:
+                stored = json.load(file)
+            if stored.get('version') == NAV_FORMAT_VERSION and stored.get('key') == key:
+                graph = NavGraph.from_json(stored)
+        except (OSError, ValueError, KeyError, TypeError):
+            graph = None
+
+    if graph is None:
+        graph = build_nav_graph(tile_map, data)
+        try:
+            os.makedirs(NAV_CACHE_DIR, exist_ok=True)
+            temp_path = f'{cache_path}.{os.getpid()}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(graph.to_json(), file)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(f"Aviso: não foi possível gravar o grafo de navegação em {cache_path}. Erro: {e}")
+    graph.map_version = tile_map.version
+    return graph
+
+
+def main():
+    """Ponto de entrada: python -m code.Navigation [--map mapa.ccnm] [--rebuild] [--queries 1000]"""
+    parser = argparse.ArgumentParser(description="Calcula o grafo de navegação e valida o alcance das plataformas.")
+    parser.add_argument('--map', default=None, help="Arquivo de mapa (padrão: GAME_MAP)")
+    parser.add_argument('--rebuild', action='store_true', help="Ignora o grafo em cache e recalcula")
+    parser.add_argument('--queries', type=int, default=1000, help="Consultas A* aleatórias de teste")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.map:
+        tile_map = ChunkedTileMap.open(args.map)
+    else:
+        tile_map = ChunkedTileMap.from_rows(GAME_MAP)
+
+    start_time = time.perf_counter()
+    graph = load_nav_graph(tile_map, use_cache=not args.rebuild)
+    elapsed = time.perf_counter() - start_time
+    if graph.build_time is None:
+        print(f"Grafo lido do cache em {elapsed * 1000:.1f} ms: {len(graph.spans)} faixas, {len(graph.edges)} arestas")
+    else:
+        print(f"Grafo construído em {graph.build_time:.2f}s ({graph.trial_count} saltos/quedas simulados): "
+              f"{len(graph.spans)} faixas, {len(graph.edges)} arestas")
+
+    spawn = graph.locate(NET_SPAWN_POS)
+    if spawn is not None:
+        reachable = graph.reachable(spawn[0])
+        unreachable = [span for index, span in enumerate(graph.spans) if index not in reachable]
+        print(f"{len(reachable)} de {len(graph.spans)} faixas alcançáveis a partir de {tuple(NET_SPAWN_POS)}")
+        for span in unreachable[:20]:
+            print(f"  inalcançável: linha {span.row}, colunas {span.first}-{span.last}")
+
+    if args.queries and graph.spans:
+        rng = random.Random(args.seed)
+        # Poucos pares distintos repetidos, como várias IAs indo aos mesmos lugares
+        points = [((rng.randint(span.first, span.last) + 0.5) * TILE_SIZE, span.row * TILE_SIZE)
+                  for span in (rng.choice(graph.spans) for _ in range(32))]
+        found = 0
+        start_time = time.perf_counter()
+        for _ in range(args.queries):
+            found += graph.find_path(rng.choice(points), rng.choice(points)) is not None
+        elapsed = time.perf_counter() - start_time
+        stats = graph.cache_stats()
+        print(f"{args.queries} consultas em {elapsed * 1000:.1f} ms ({found} com caminho), "
+              f"cache: {stats['hit_rate']:.1%} de acertos, {stats['paths']} caminhos guardados")
+
+
+if __name__ == '__main__':
+    main()
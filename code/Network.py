@@ -0,0 +1,521 @@
+# Network.py
+
+import argparse
+import heapq
+import itertools
+import random
+import socket
+import struct
+import time
+
+import pygame as pg
+
+from code.Animation import AnimationClock
+from code.Collision import CollisionMap
+from code.Const import GAME_MAP, SIMULATION_HZ, NET_HOST, NET_SPAWN_POS, NET_SNAPSHOT_HISTORY, NET_INPUT_REDUNDANCY, \
+    NET_CLIENT_TIMEOUT
+from code.Entities import EntityStore
+from code.Player import Player
+from code.Replay import encode_input, decode_input, _write_varint, _read_varint
+from code.Simulation import random_policy
+from code.TileMap import ChunkedTileMap
+
+# Tipos de pacote (primeiro byte de cada datagrama)
+PACKET_HELLO = 1  # cliente -> servidor: pedido de conexão
+PACKET_WELCOME = 2  # servidor -> cliente: id do jogador, tick atual e posição inicial
+PACKET_INPUT = 3  # cliente -> servidor: entradas ainda não confirmadas + último snapshot recebido
+PACKET_SNAPSHOT = 4  # servidor -> cliente: estado de todos os jogadores, em delta contra uma base
+PACKET_BYE = 5  # cliente -> servidor: desconexão
+
+# Formatos (little-endian)
+#   WELCOME:  tipo, id do jogador (u8), tick (u32), posição inicial do jogador (i32, i32)
+#   INPUT:    tipo, tick do último snapshot recebido (u32), sequência da primeira entrada (u32), nº de entradas (u8),
+#             seguido de uma máscara de teclas (code/Replay.py) por entrada
+#   SNAPSHOT: tipo, tick (u32), tick da base (u32, NO_TICK = snapshot completo), última entrada aplicada (u32),
+#             seguido do corpo: nº de jogadores alterados (varint) e, para cada um, id (varint), máscara dos campos
+#             alterados (u8) e a diferença de cada campo alterado (varint zigzag); depois nº de removidos e os ids
+WELCOME_FORMAT = '<BBIii'
+INPUT_FORMAT = '<BIIB'
+SNAPSHOT_FORMAT = '<BIII'
+NO_TICK = 0xFFFFFFFF
+RECV_SIZE = 65536
+
+# Número de campos do estado de um jogador (Player.get_state)
+STATE_FIELDS = 6
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def encode_snapshot(state, base):
+    """
+    Codifica o corpo de um snapshot ({id: estado}) em delta contra `base` (outro snapshot, {} = completo).
+    Jogadores sem nenhuma mudança são omitidos; os que sumiram da base são listados como removidos.
+    """
+    body = bytearray()
+    changed = []
+    for player_id, values in state.items():
+        base_values = base.get(player_id)
+        if base_values is None:
+            changed.append((player_id, values, (0,) * STATE_FIELDS))
+        elif values != base_values:
+            changed.append((player_id, values, base_values))
+
+    _write_varint(body, len(changed))
+    for player_id, values, base_values in changed:
+        _write_varint(body, player_id)
+        mask_offset = len(body)
+        body.append(0)
+        mask = 0
+        for field, (value, base_value) in enumerate(zip(values, base_values)):
+            if value != base_value:
+                mask |= 1 << field
+                _write_varint(body, _zigzag(value - base_value))
+        body[mask_offset] = mask
+
+    removed = [player_id for player_id in base if player_id not in state]
+    _write_varint(body, len(removed))
+    for player_id in removed:
+        _write_varint(body, player_id)
+    return bytes(body)
+
+
+def decode_snapshot(data, offset, base):
+    """Reconstrói o snapshot completo a partir do corpo em `data[offset:]` e da mesma base usada na codificação."""
+    state = dict(base)
+    count, offset = _read_varint(data, offset)
+    for _ in range(count):
+        player_id, offset = _read_varint(data, offset)
+        mask = data[offset]
+        offset += 1
+        values = list(base.get(player_id, (0,) * STATE_FIELDS))
+        for field in range(STATE_FIELDS):
+            if mask & (1 << field):
+                delta, offset = _read_varint(data, offset)
+                values[field] += _unzigzag(delta)
+        state[player_id] = tuple(values)
+
+    removed, offset = _read_varint(data, offset)
+    for _ in range(removed):
+        player_id, offset = _read_varint(data, offset)
+        state.pop(player_id, None)
+    return state
+
+
+class LossyLink:
+    """
+    Envio de datagramas UDP com latência, variação (jitter) e perda simuladas, para testes em loopback.
+    Os pacotes atrasados ficam numa fila e são enviados por flush() quando chega o seu horário
+    (segundo `clock`, que pode ser um relógio virtual). Sem latência nem perda, envia direto.
+    """
+
+    def __init__(self, sock, latency=0.0, jitter=0.0, loss=0.0, seed=0, clock=time.perf_counter):
+        self.sock = sock
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.queue = []  # heap de (horário de entrega, ordem, dados, endereço)
+        self.order = itertools.count()
+
+        self.bytes_sent = 0
+        self.packets_sent = 0
+        self.packets_lost = 0
+
+    def send(self, data, address):
+        self.bytes_sent += len(data)
+        self.packets_sent += 1
+        if self.loss and self.rng.random() < self.loss:
+            self.packets_lost += 1
+            return
+        delay = self.latency + (self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if delay <= 0:
+            self.sock.sendto(data, address)
+            return
+        heapq.heappush(self.queue, (self.clock() + delay, next(self.order), data, address))
+
+    def flush(self):
+        """Envia os pacotes atrasados cujo horário de entrega já chegou."""
+        now = self.clock()
+        while self.queue and self.queue[0][0] <= now:
+            _, _, data, address = heapq.heappop(self.queue)
+            self.sock.sendto(data, address)
+
+
+def _open_socket(host, port=0):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port))
+    sock.setblocking(False)
+    return sock
+
+
+def _receive_all(sock):
+    """Lê todos os datagramas pendentes sem bloquear."""
+    packets = []
+    while True:
+        try:
+            packets.append(sock.recvfrom(RECV_SIZE))
+        except (BlockingIOError, ConnectionResetError):
+            return packets
+
+
+class RemoteClient:
+    """Estado de um cliente no servidor: jogador, entradas recebidas e último snapshot confirmado."""
+
+    def __init__(self, player_id, address, player, spawn_pos, tick):
+        self.player_id = player_id
+        self.address = address
+        self.player = player
+        self.spawn_pos = spawn_pos  # Posição inicial, enviada no WELCOME
+        self.inputs = {}  # sequência -> máscara de teclas, ainda não aplicadas
+        self.next_sequence = 1
+        self.last_applied = 0  # Última sequência aplicada (enviada nos snapshots para a reconciliação)
+        self.last_mask = 0
+        self.acked_tick = NO_TICK
+        self.last_heard = tick
+
+
+class GameServer:
+    """
+    Servidor autoritativo: simula todos os jogadores no mesmo mapa (map_path ou GAME_MAP) em ticks fixos, com um
+    EntityStore e um relógio de animação compartilhados, como o Game. Os jogadores nascem no chão abaixo de
+    NET_SPAWN_POS (Player.spawn_position), e a posição vai para o cliente no WELCOME. Cada tick aplica uma entrada por
+    cliente (Player.move/request_jump), avança a física em lote e envia a cada cliente um snapshot em delta
+    contra o último snapshot que ele confirmou (ou completo, se a base já saiu do histórico).
+    """
+
+    def __init__(self, host=NET_HOST, port=0, simulation_hz=SIMULATION_HZ, link_options=None, map_path=None):
+        self.sock = _open_socket(host, port)
+        self.address = self.sock.getsockname()
+        self.link = LossyLink(self.sock, **(link_options or {}))
+        self.simulation_hz = simulation_hz
+
+        # Mundo (sem streaming: o servidor mantém o mapa inteiro carregado)
+        self.tile_map = ChunkedTileMap.open(map_path) if map_path else ChunkedTileMap.from_rows(GAME_MAP)
+        self.collision_map = CollisionMap(self.tile_map)
+        self.entities = EntityStore(self.collision_map)
+        self.animation_clock = AnimationClock()
+
+        self.tick_count = 0
+        self.clients = {}  # endereço -> RemoteClient
+        self.player_ids = itertools.count(1)
+        self.history = {}  # tick -> snapshot ({id do jogador: estado}), até NET_SNAPSHOT_HISTORY ticks
+        self.timeout_ticks = round(NET_CLIENT_TIMEOUT * simulation_hz)
+
+        self.full_snapshots = 0
+        self.delta_snapshots = 0
+
+    def _connect(self, address):
+        client = self.clients.get(address)
+        if client is None:
+            player = Player(list(NET_SPAWN_POS), self.tile_map, collision_map=self.collision_map, headless=True,
+                            entity_store=self.entities, clock=self.animation_clock, simulation_hz=self.simulation_hz)
+            spawn_pos = player.spawn_position(NET_SPAWN_POS)
+            player.set_position(spawn_pos)
+            client = RemoteClient(next(self.player_ids), address, player, spawn_pos, self.tick_count)
+            self.clients[address] = client
+        # Repetido a cada HELLO: a resposta anterior pode ter sido perdida
+        spawn_x, spawn_y = client.spawn_pos
+        self.link.send(struct.pack(WELCOME_FORMAT, PACKET_WELCOME, client.player_id, self.tick_count, spawn_x, spawn_y),
+                       address)
+
+    def _disconnect(self, client):
+        self.entities.remove(client.player.entity)
+        del self.clients[client.address]
+
+    def _receive_input(self, client, data):
+        _, ack_tick, first_sequence, count = struct.unpack_from(INPUT_FORMAT, data)
+        offset = struct.calcsize(INPUT_FORMAT)
+        for sequence, mask in enumerate(data[offset:offset + count], first_sequence):
+            if sequence >= client.next_sequence:
+                client.inputs[sequence] = mask
+        if ack_tick != NO_TICK and (client.acked_tick == NO_TICK or ack_tick > client.acked_tick):
+            client.acked_tick = ack_tick
+
+    def poll(self):
+        """Processa os pacotes recebidos (conexões, entradas e desconexões)."""
+        self.link.flush()
+        for data, address in _receive_all(self.sock):
+            if not data:
+                continue
+            packet_type = data[0]
+            if packet_type == PACKET_HELLO:
+                self._connect(address)
+                continue
+            client = self.clients.get(address)
+            if client is None:
+                continue
+            client.last_heard = self.tick_count
+            if packet_type == PACKET_INPUT:
+                self._receive_input(client, data)
+            elif packet_type == PACKET_BYE:
+                self._disconnect(client)
+
+    def _next_input(self, client):
+        """
+        Máscara de teclas deste tick: a próxima entrada em sequência. Se ela ainda não chegou, repete as teclas
+        mantidas da anterior (sem o pulo); se ela se perdeu de vez, avança para a mais antiga recebida.
+        """
+        if client.next_sequence not in client.inputs and client.inputs:
+            client.next_sequence = min(client.inputs)
+        mask = client.inputs.pop(client.next_sequence, None)
+        if mask is None:
+            keys_pressed, _ = decode_input(client.last_mask)
+            return encode_input(keys_pressed, None)
+        client.last_applied = client.next_sequence
+        client.next_sequence += 1
+        client.last_mask = mask
+        return mask
+
+    def tick(self):
+        """Executa um tick da simulação e envia os snapshots."""
+        for client in list(self.clients.values()):
+            if self.tick_count - client.last_heard > self.timeout_ticks:
+                self._disconnect(client)
+                continue
+            apply_input(client.player, self._next_input(client))
+
+        self.animation_clock.advance()
+        self.entities.step()
+        for client in self.clients.values():
+            client.player.update()
+        self.tick_count += 1
+
+        state = {client.player_id: client.player.get_state() for client in self.clients.values()}
+        self.history[self.tick_count] = state
+        self.history.pop(self.tick_count - NET_SNAPSHOT_HISTORY, None)
+        self._send_snapshots(state)
+
+    def _send_snapshots(self, state):
+        bodies = {}  # O corpo depende só da base: clientes com a mesma base compartilham a codificação
+        for client in self.clients.values():
+            base_tick = client.acked_tick if client.acked_tick in self.history else NO_TICK
+            body = bodies.get(base_tick)
+            if body is None:
+                body = bodies[base_tick] = encode_snapshot(state, self.history.get(base_tick, {}))
+            if base_tick == NO_TICK:
+                self.full_snapshots += 1
+            else:
+                self.delta_snapshots += 1
+            header = struct.pack(SNAPSHOT_FORMAT, PACKET_SNAPSHOT, self.tick_count, base_tick, client.last_applied)
+            self.link.send(header + body, client.address)
+
+    def close(self):
+        self.sock.close()
+
+
+def apply_input(player, mask):
+    """Aplica uma máscara de teclas ao jogador (movimento e pedido de pulo), como Game._handle_input."""
+    keys_pressed, key_event_key = decode_input(mask)
+    player.move(keys_pressed)
+    if key_event_key == pg.K_SPACE:
+        player.request_jump()
+
+
+class GameClient:
+    """
+    Cliente: envia apenas entradas e recebe snapshots. O jogador local é previsto (simulado localmente logo ao
+    apertar a tecla); a cada snapshot o estado autoritativo é aplicado e as entradas que o servidor ainda não
+    processou são simuladas de novo (reconciliação). Os demais jogadores vêm direto dos snapshots.
+    """
+
+    def __init__(self, server_address, host=NET_HOST, simulation_hz=SIMULATION_HZ, link_options=None, map_path=None):
+        self.server_address = server_address
+        self.sock = _open_socket(host)
+        self.link = LossyLink(self.sock, **(link_options or {}))
+        self.simulation_hz = simulation_hz
+
+        # O mesmo mapa do servidor (a previsão local depende dele)
+        self.tile_map = ChunkedTileMap.open(map_path) if map_path else ChunkedTileMap.from_rows(GAME_MAP)
+        self.collision_map = CollisionMap(self.tile_map)
+
+        self.player_id = None
+        self.player = None  # Jogador local (previsto), criado ao conectar
+        self.sequence = 0
+        self.pending = []  # [(sequência, máscara)] ainda não confirmadas pelo servidor
+        self.predicted = {}  # sequência -> estado previsto após a entrada (para medir os erros de previsão)
+
+        self.snapshots = {}  # tick -> snapshot recebido, bases para os próximos deltas
+        self.latest_tick = NO_TICK
+        self.players = {}  # id -> estado de cada jogador no último snapshot
+
+        self.mispredictions = 0
+
+    @property
+    def connected(self):
+        return self.player_id is not None
+
+    def _receive_welcome(self, data):
+        _, player_id, _, spawn_x, spawn_y = struct.unpack_from(WELCOME_FORMAT, data)
+        if self.player_id is None:
+            self.player_id = player_id
+            self.player = Player([spawn_x, spawn_y], self.tile_map, collision_map=self.collision_map,
+                                 headless=True, simulation_hz=self.simulation_hz)
+
+    def _receive_snapshot(self, data):
+        _, tick, base_tick, last_applied = struct.unpack_from(SNAPSHOT_FORMAT, data)
+        if self.latest_tick != NO_TICK and tick <= self.latest_tick:
+            return  # Fora de ordem: já há um snapshot mais novo
+        if base_tick == NO_TICK:
+            base = {}
+        elif base_tick in self.snapshots:
+            base = self.snapshots[base_tick]
+        else:
+            return  # Base já descartada: o servidor enviará um completo ao ver a confirmação antiga
+        state = decode_snapshot(data, struct.calcsize(SNAPSHOT_FORMAT), base)
+
+        self.snapshots[tick] = state
+        for old_tick in [old_tick for old_tick in self.snapshots if old_tick <= tick - NET_SNAPSHOT_HISTORY]:
+            del self.snapshots[old_tick]
+        self.latest_tick = tick
+        self.players = state
+
+        authoritative = state.get(self.player_id)
+        if authoritative is not None:
+            self._reconcile(authoritative, last_applied)
+
+    def _reconcile(self, authoritative, last_applied):
+        """Parte do estado autoritativo e simula de novo as entradas que o servidor ainda não aplicou."""
+        predicted = self.predicted.pop(last_applied, None)
+        for sequence in [sequence for sequence in self.predicted if sequence < last_applied]:
+            del self.predicted[sequence]
+        if predicted is not None and predicted != authoritative:
+            self.mispredictions += 1
+
+        self.pending = [(sequence, mask) for sequence, mask in self.pending if sequence > last_applied]
+        self.player.set_state(authoritative)
+        for sequence, mask in self.pending:
+            apply_input(self.player, mask)
+            self.player.update()
+            self.predicted[sequence] = self.player.get_state()
+
+    def poll(self):
+        """Processa os pacotes recebidos do servidor."""
+        self.link.flush()
+        for data, address in _receive_all(self.sock):
+            if not data or address != self.server_address:
+                continue
+            if data[0] == PACKET_WELCOME:
+                self._receive_welcome(data)
+            elif data[0] == PACKET_SNAPSHOT:
+                self._receive_snapshot(data)
+
+    def step(self, keys_pressed, key_event_key=None):
+        """Um passo do cliente: prevê a entrada no jogador local e a envia (com as anteriores não confirmadas)."""
+        if not self.connected:
+            self.link.send(bytes((PACKET_HELLO,)), self.server_address)
+            return
+
+        self.sequence += 1
+        mask = encode_input(keys_pressed, key_event_key)
+        apply_input(self.player, mask)
+        self.player.update()
+        self.pending.append((self.sequence, mask))
+        self.predicted[self.sequence] = self.player.get_state()
+
+        # Redundância: as últimas entradas não confirmadas vão juntas, cobrindo pacotes perdidos
+        resend = self.pending[-NET_INPUT_REDUNDANCY:]
+        header = struct.pack(INPUT_FORMAT, PACKET_INPUT, self.latest_tick, resend[0][0], len(resend))
+        self.link.send(header + bytes(mask for _, mask in resend), self.server_address)
+
+    def close(self):
+        if self.connected:
+            self.sock.sendto(bytes((PACKET_BYE,)), self.server_address)
+        self.sock.close()
+
+
+def run_loopback(clients=4, ticks=600, latency=0.0, jitter=0.0, loss=0.0, simulation_hz=SIMULATION_HZ, seed=0,
+                 map_path=None):
+    """
+    Executa um servidor e `clients` clientes em loopback UDP, com latência e perda simuladas (em cada sentido),
+    o mais rápido possível. O tempo das latências é virtual (1/simulation_hz por tick), então o resultado
+    não depende da velocidade da máquina. Cada cliente joga com random_policy.
+    Retorna um relatório com bytes por tick, ticks por segundo e erros de previsão.
+    """
+    now = [0.0]
+
+    def clock():
+        return now[0]
+
+    options = {'latency': latency, 'jitter': jitter, 'loss': loss, 'clock': clock}
+
+    server = GameServer(simulation_hz=simulation_hz, link_options=dict(options, seed=seed), map_path=map_path)
+    players = [GameClient(server.address, simulation_hz=simulation_hz, map_path=map_path,
+                          link_options=dict(options, seed=seed + index + 1))
+               for index in range(clients)]
+    policies = [random_policy(seed + index) for index in range(clients)]
+
+    server_time = 0.0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for client, policy in zip(players, policies):
+            client.poll()
+            client.step(*next(policy))
+        server_start = time.perf_counter()
+        server.poll()
+        server.tick()
+        server_time += time.perf_counter() - server_start
+        now[0] += 1.0 / simulation_hz
+    elapsed = time.perf_counter() - start
+
+    # Divergência final: posição prevista pelo cliente após a última entrada aplicada pelo servidor,
+    # comparada com a do servidor
+    final_errors = []
+    for remote in server.clients.values():
+        client = next((client for client in players if client.player_id == remote.player_id), None)
+        predicted = client.predicted.get(remote.last_applied) if client else None
+        if predicted is not None:
+            final_errors.append(abs(predicted[0] - remote.player.pos[0]) + abs(predicted[1] - remote.player.pos[1]))
+
+    report = {
+        'clients': clients,
+        'ticks': ticks,
+        'elapsed': elapsed,
+        'ticks_per_second': ticks / elapsed if elapsed > 0 else 0.0,
+        'server_ticks_per_second': ticks / server_time if server_time > 0 else 0.0,
+        'server_bytes_per_tick': server.link.bytes_sent / ticks,
+        'client_bytes_per_tick': sum(client.link.bytes_sent for client in players) / ticks / clients,
+        'full_snapshots': server.full_snapshots,
+        'delta_snapshots': server.delta_snapshots,
+        'packets_lost': server.link.packets_lost + sum(client.link.packets_lost for client in players),
+        'mispredictions': sum(client.mispredictions for client in players),
+        'max_final_error': max(final_errors, default=0),
+    }
+    for client in players:
+        client.close()
+    server.close()
+    return report
+
+
+def main():
+    """Ponto de entrada: python -m code.Network --clients 8 --ticks 600 --latency 0.05 --loss 0.05"""
+    parser = argparse.ArgumentParser(description="Teste do multijogador local em loopback UDP (sem janela).")
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--ticks', type=int, default=600)
+    parser.add_argument('--latency', type=float, default=0.0, help="Latência simulada em cada sentido (s)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Variação máxima da latência (s)")
+    parser.add_argument('--loss', type=float, default=0.0, help="Fração de pacotes perdidos (0.05 = 5%%)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--map', metavar='ARQUIVO', help="Mapa no formato binário em chunks (ver code/TileMap.py)")
+    args = parser.parse_args()
+
+    report = run_loopback(args.clients, args.ticks, args.latency, args.jitter, args.loss, seed=args.seed,
+                          map_path=args.map)
+    print(f"{report['clients']} clientes, {report['ticks']} ticks em {report['elapsed']:.2f}s "
+          f"({report['ticks_per_second']:.0f} ticks/s com os clientes, "
+          f"{report['server_ticks_per_second']:.0f} ticks/s só o servidor)")
+    print(f"servidor: {report['server_bytes_per_tick']:.1f} bytes/tick "
+          f"({report['full_snapshots']} snapshots completos, {report['delta_snapshots']} em delta); "
+          f"cliente: {report['client_bytes_per_tick']:.1f} bytes/tick")
+    print(f"{report['packets_lost']} pacotes perdidos, {report['mispredictions']} erros de previsão corrigidos, "
+          f"divergência final máxima {report['max_final_error']} px")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+# Parallax.py
+
+import math
+
+import pygame as pg
+
+from code.Const import SCREEN_WIDTH, PARALLAX_LAYERS
+
+
+class ParallaxGroup:
+    """
+    Camadas consecutivas com a mesma velocidade e o mesmo período, pré-compostas numa única faixa.
+    A faixa repete o período horizontalmente até cobrir a largura da tela mais um período; assim,
+    qualquer deslocamento é desenhado com um único blit de uma área da faixa.
+    """
+
+    def __init__(self, speed, period):
+        self.speed = speed
+        self.period = period
+        self.layers = []
+
+        # Distância percorrida (em pixels, contínua) no passo atual e no anterior, para interpolação
+        self.distance = 0.0
+        self.previous_distance = 0.0
+
+        self.strip = None
+        self.top = 0
+        self.shown_offset = None  # Deslocamento (em pixels inteiros) do último desenho
+
+    def advance(self):
+        """Avança a rolagem em um passo de simulação (a distância é mantida dentro de um período)."""
+        self.previous_distance = self.distance
+        self.distance += self.speed
+        if self.distance >= self.period:
+            self.distance -= self.period
+            self.previous_distance -= self.period
+
+    def build(self, images):
+        """Desenha todas as ocorrências das camadas do grupo na faixa (uma vez, ao criar o fundo)."""
+        items = []
+        for layer in self.layers:
+            image = images[layer['image']]
+            for x, y in layer['positions']:
+                items.append((image, x, y))
+        if not items:
+            return
+
+        self.top = min(y for _, _, y in items)
+        bottom = max(y + image.get_height() for image, _, y in items)
+        width = self.period * (math.ceil(SCREEN_WIDTH / self.period) + 1)
+
+        self.strip = pg.Surface((width, bottom - self.top), pg.SRCALPHA)
+        for image, x, y in items:
+            # Cópias deslocadas de um período cobrem as bordas da faixa (inclusive o que "dá a volta")
+            for repeat in range(-1, width // self.period + 2):
+                self.strip.blit(image, (x + repeat * self.period, y - self.top))
+
+    def offset(self, alpha=1.0, steps=0):
+        """
+        Deslocamento em pixels da faixa, interpolado entre os dois últimos passos, depois de mais `steps`
+        chamadas a advance() (calculado sem alterar o estado, com as mesmas operações de advance()).
+        """
+        previous_distance, distance = self.previous_distance, self.distance
+        for _ in range(steps):
+            previous_distance = distance
+            distance += self.speed
+            if distance >= self.period:
+                distance -= self.period
+                previous_distance -= self.period
+        distance = previous_distance + (distance - previous_distance) * alpha
+        # Arredondado como o blit com posição x - distância (piso), igual às posições em float de antes
+        return math.ceil(distance) % self.period
+
+    def draw(self, surface, alpha=1.0, offset=None):
+        """
+        Desenha a faixa deslocada pela distância interpolada entre os dois últimos passos (ou por `offset`).
+        Retorna (retângulo desenhado, True se o deslocamento em pixels mudou desde o último desenho).
+        """
+        if self.strip is None:
+            return None, False
+        if offset is None:
+            offset = self.offset(alpha)
+        rect = surface.blit(self.strip, (0, self.top), (offset, 0, SCREEN_WIDTH, self.strip.get_height()))
+        changed = offset != self.shown_offset
+        self.shown_offset = offset
+        return rect, changed
+
+
+class ParallaxBackground:
+    """
+    Fundo com rolagem em camadas definido por dados (PARALLAX_LAYERS em Const.py): cada camada tem
+    uma imagem, uma velocidade (pixels por passo), um período de repetição e as posições das ocorrências.
+
+    O fundo opaco é convertido sem canal alfa e recebe, já pré-compostas, as camadas paradas (speed 0);
+    camadas em movimento são agrupadas (mesma velocidade e período, em sequência) em faixas pré-compostas.
+    Por frame o custo é um blit opaco do fundo mais um blit por grupo.
+    """
+
+    def __init__(self, images=None, layers=PARALLAX_LAYERS, background_key='background'):
+        self.groups = []
+        static_layers = []
+        for layer in layers:
+            if layer['speed'] == 0:
+                static_layers.append(layer)
+                continue
+            group = self.groups[-1] if self.groups else None
+            if group is None or (group.speed, group.period) != (layer['speed'], layer['period']):
+                group = ParallaxGroup(layer['speed'], layer['period'])
+                self.groups.append(group)
+            group.layers.append(layer)
+
+        # Sem imagens (modo headless) apenas as posições são simuladas
+        self.background = None
+        if images:
+            background = images[background_key]
+            if background.get_colorkey() is None:
+                self.background = background.convert()
+            else:
+                # Colorkey (alfa binário, code/AssetManager.py): as áreas transparentes ficam pretas, como ao
+                # converter uma imagem com alfa por pixel
+                self.background = pg.Surface(background.get_size()).convert()
+                self.background.blit(background, (0, 0))
+            for layer in static_layers:
+                for x, y in layer['positions']:
+                    self.background.blit(images[layer['image']], (x, y))
+            for group in self.groups:
+                group.build(images)
+
+    def advance(self):
+        """Avança todas as camadas em um passo de simulação."""
+        for group in self.groups:
+            group.advance()
+
+    def offsets(self, alpha=1.0, steps=0):
+        """Deslocamento de cada grupo depois de mais `steps` passos (para desenhar antes de simulá-los)."""
+        return [group.offset(alpha, steps) for group in self.groups]
+
+    def draw(self, surface, alpha=1.0, offsets=None):
+        """
+        Desenha o fundo e as camadas (nos deslocamentos `offsets`, se informados).
+        Retorna as regiões cujo conteúdo mudou desde o último desenho.
+        """
+        if offsets is None:
+            offsets = self.offsets(alpha)
+        changed_rects = []
+        if self.background is not None:
+            surface.blit(self.background, (0, 0))
+        for group, offset in zip(self.groups, offsets):
+            rect, changed = group.draw(surface, offset=offset)
+            if changed:
+                changed_rects.append(rect)
+        return changed_rects
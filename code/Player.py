@@ -2,32 +2,65 @@
 
 import pygame as pg
 
-from code.Const import PLAYER_COLLIDER_SIZE, GRAVITY, TILE_SIZE, PLAYER_JUMP_FORCE, PLAYER_SPEED, PLAYER_ANIMATION_SPEED
-from code.utils import load_player_assets
+from code.Animation import AnimationClock, build_clips
+from code.Collision import CollisionMap
+from code.Const import PLAYER_COLLIDER_SIZE, PLAYER_SIZE, PLAYER_JUMP_FORCE, PLAYER_SPEED, PLAYER_ANIMATION_SPEED, \
+    JUMP_BUFFER_TIME, SIMULATION_HZ
+from code.Entities import EntityStore
+from code.utils import load_player_assets, PLAYER_IDLE_FRAMES, PLAYER_RUN_FRAMES
+
+# Número de frames de cada animação (usado para resolver os frames mesmo sem imagens, no modo headless)
+PLAYER_FRAME_COUNTS = {
+    'idle_right': PLAYER_IDLE_FRAMES,
+    'idle_left': PLAYER_IDLE_FRAMES,
+    'run_right': PLAYER_RUN_FRAMES,
+    'run_left': PLAYER_RUN_FRAMES,
+}
+
+# Estados de animação na ordem usada para transmiti-los como número (code/Network.py)
+PLAYER_STATES = tuple(PLAYER_FRAME_COUNTS)
+
 
 class Player(pg.sprite.Sprite):
-    def __init__(self, start_pos, game_map):
+    def __init__(self, start_pos, game_map, collision_map=None, headless=False, animations=None, entity_store=None,
+                 clock=None, simulation_hz=SIMULATION_HZ):
         super().__init__()
 
-        # Mapa para Colisão
+        # Mapa para Colisão (o índice pode ser compartilhado entre vários corpos)
         self.game_map = game_map
+        self.collision_map = collision_map or CollisionMap(game_map)
 
-        # Assets
-        self.animations = load_player_assets()
+        # Assets (no modo headless nenhuma imagem é carregada e a animação não é calculada)
+        self.headless = headless
+        if headless:
+            self.animations = None
+        else:
+            self.animations = animations or load_player_assets()
 
         # Estado de Movimento e Animação
         self.state = 'idle_right'  # Posições possíveis: 'idle_right', 'idle_left', 'run_right', 'run_left'
         self.current_frame = 0
-        self.animation_timer = 0
 
-        # Posição e Físicas
+        # Clips compartilhados (code/Animation.py): o frame atual vem do relógio global e do passo em que o
+        # estado atual começou. Sem um relógio compartilhado, o jogador usa um próprio e o avança em update().
+        self.clips = build_clips(self.animations, PLAYER_ANIMATION_SPEED, PLAYER_FRAME_COUNTS)
+        self.owns_clock = clock is None
+        self.clock = clock or AnimationClock()
+        self.animation_start = self.clock.tick
+
+        # Posição e Físicas (cópias dos dados do EntityStore, atualizadas após cada passo)
         self.pos = list(start_pos)  # [x, y]
+        self.previous_pos = list(start_pos)  # Posição no passo anterior (para interpolação do desenho)
         self.vertical_speed = 0
         self.on_ground = False
 
+        # Buffer de pulo: passos restantes em que um pulo pedido no ar ainda será executado ao aterrissar
+        self.jump_buffer_steps = round(JUMP_BUFFER_TIME * simulation_hz)
+        self.buffered_jump = 0
+
         # Imagem e Retângulo (Para desenho e colisão visual)
-        self.image = self.animations['idle_right'][0]
-        self.rect = self.image.get_rect(topleft=self.pos)
+        self.image = None if headless else self.animations['idle_right'][0]
+        self.rect = pg.Rect(self.pos, PLAYER_SIZE)
 
         # Collider (Retângulo menor e centralizado para colisão precisa)
         self.collider_offset_x = 40
@@ -35,79 +68,48 @@ class Player(pg.sprite.Sprite):
         self.collider = pg.Rect(self.pos[0] + self.collider_offset_x, self.pos[1] + self.collider_offset_y,
                                 PLAYER_COLLIDER_SIZE[0], PLAYER_COLLIDER_SIZE[1])
 
-    def _apply_gravity(self):
-        """Aplica a gravidade e a velocidade vertical."""
-        self.vertical_speed += GRAVITY
-        self.vertical_speed = min(self.vertical_speed, 15)
-        self.pos[1] += self.vertical_speed
-        self.collider.top = self.pos[1] + self.collider_offset_y
-
-    def _check_collision_y(self):
-        """Verifica e resolve colisões verticais com o mapa."""
-        collided = False
-
-        # Calcula a área de tiles para verificar
-        start_col = max(0, self.collider.left // TILE_SIZE)
-        end_col = min(len(self.game_map[0]), (self.collider.right + TILE_SIZE - 1) // TILE_SIZE)
-        start_row = max(0, self.collider.top // TILE_SIZE)
-        end_row = min(len(self.game_map), (self.collider.bottom + TILE_SIZE - 1) // TILE_SIZE)
-
-        for y in range(start_row, end_row):
-            for x in range(start_col, end_col):
-                if self.game_map[y][x] != ' ':
-                    tile_rect = pg.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-
-                    if self.collider.colliderect(tile_rect):
-                        collided = True
-                        if self.vertical_speed > 0:  # Caindo (colisão por baixo)
-                            self.pos[1] = tile_rect.top - self.collider_offset_y - PLAYER_COLLIDER_SIZE[1]
-                            self.vertical_speed = 0
-                            self.on_ground = True
-                        elif self.vertical_speed < 0:  # Pulando (colisão por cima)
-                            self.pos[1] = tile_rect.bottom - self.collider_offset_y
-                            self.vertical_speed = 0
-
-                        self.collider.top = self.pos[1] + self.collider_offset_y
-                        return collided
-
-        self.on_ground = False
-        return collided
-
-    def _check_collision_x(self, move_dir):
-        """Verifica e resolve colisões horizontais com o mapa."""
-
-        # Calcula a área de tiles para verificar
-        start_col = max(0, self.collider.left // TILE_SIZE)
-        end_col = min(len(self.game_map[0]), (self.collider.right + TILE_SIZE - 1) // TILE_SIZE)
-        start_row = max(0, self.collider.top // TILE_SIZE)
-        end_row = min(len(self.game_map), (self.collider.bottom + TILE_SIZE - 1) // TILE_SIZE)
-
-        for y in range(start_row, end_row):
-            for x in range(start_col, end_col):
-                if self.game_map[y][x] != ' ':
-                    tile_rect = pg.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-
-                    if self.collider.colliderect(tile_rect):
-                        if move_dir == 'left':
-                            self.pos[0] = tile_rect.right - self.collider_offset_x
-                        elif move_dir == 'right':
-                            self.pos[0] = tile_rect.left - self.collider_offset_x - PLAYER_COLLIDER_SIZE[0]
-
-                        self.collider.left = self.pos[0] + self.collider_offset_x
-                        return True
-        return False
+        # A física roda no EntityStore (em lote com os demais corpos). Sem um store compartilhado,
+        # o jogador usa um próprio e o avança em update().
+        self.owns_entity_store = entity_store is None
+        self.entity_store = entity_store or EntityStore(self.collision_map, capacity=1)
+        self.entity = self.entity_store.add(self.pos, (self.collider_offset_x, self.collider_offset_y),
+                                            PLAYER_COLLIDER_SIZE)
+
+    def _sync_from_store(self):
+        """Copia o estado físico do EntityStore para os atributos do jogador."""
+        store = self.entity_store
+        index = self.entity
+        self.pos[0], self.pos[1] = store.pos.item(index, 0), store.pos.item(index, 1)
+        self.previous_pos[0] = store.previous_pos.item(index, 0)
+        self.previous_pos[1] = store.previous_pos.item(index, 1)
+        self.vertical_speed = store.vel_y.item(index)
+        self.on_ground = store.on_ground.item(index)
+
+        self.collider.topleft = (self.pos[0] + self.collider_offset_x, self.pos[1] + self.collider_offset_y)
+        self.rect.topleft = self.pos
 
     def jump(self):
         """Faz o jogador pular, se estiver no chão."""
         if self.on_ground:
             self.vertical_speed = PLAYER_JUMP_FORCE
             self.on_ground = False
+            self.entity_store.vel_y[self.entity] = PLAYER_JUMP_FORCE
+            self.entity_store.on_ground[self.entity] = False
+
+    def request_jump(self):
+        """Pulo pedido pelo jogador: imediato no chão; no ar, fica guardado por JUMP_BUFFER_TIME."""
+        if self.on_ground:
+            self.jump()
+        else:
+            self.buffered_jump = self.jump_buffer_steps
 
     def move(self, keys_pressed):
         """
-        Atualiza a posição horizontal e o estado de animação baseado nas teclas pressionadas.
+        Define o movimento horizontal do próximo passo e o estado de animação baseado nas teclas pressionadas.
+        O deslocamento e a colisão são aplicados em lote pelo EntityStore.
         CORRIGIDO: Lógica para manter a direção IDLE.
         """
+        store = self.entity_store
 
         # 1. Movimento Horizontal
         moved = False
@@ -117,18 +119,16 @@ class Player(pg.sprite.Sprite):
         current_direction = 'right' if 'right' in self.state else 'left'
 
         # Left (A)
+        store.move_left[self.entity] = 0
         if keys_pressed[pg.K_a]:
-            self.pos[0] -= PLAYER_SPEED
-            self.collider.left = self.pos[0] + self.collider_offset_x
-            self._check_collision_x('left')
+            store.move_left[self.entity] = PLAYER_SPEED
             move_dir = 'left'
             moved = True
 
         # Right (D)
+        store.move_right[self.entity] = 0
         if keys_pressed[pg.K_d]:
-            self.pos[0] += PLAYER_SPEED
-            self.collider.left = self.pos[0] + self.collider_offset_x
-            self._check_collision_x('right')
+            store.move_right[self.entity] = PLAYER_SPEED
             move_dir = 'right'
             moved = True
 
@@ -155,44 +155,84 @@ class Player(pg.sprite.Sprite):
         # 3. Transição de Estado e Reset de Frame
         if new_state != self.state:
             self.current_frame = 0  # Reinicia a animação ao trocar de estado
-            self.animation_timer = 0
+            self.animation_start = self.clock.tick
 
         self.state = new_state
 
-    def _animate(self):
+    def spawn_position(self, preferred):
         """
-        Atualiza o frame da animação do jogador.
-        CORRIGIDO: Garante que o índice não saia do limite da lista.
+        Posição inicial derivada do mapa: o collider apoiado no primeiro chão (tile sólido com espaço livre acima)
+        abaixo de `preferred`. Se a coluna não tiver chão, usa a coluna mais próxima à direita; sem nenhum chão,
+        retorna `preferred`.
         """
-
-        current_animation = self.animations[self.state]
-        num_frames = len(current_animation)
-
-        # Garante que o índice atual é válido para a animação atual
-        if self.current_frame >= num_frames:
-            self.current_frame = 0
-            self.animation_timer = 0
-
-        # Incrementa o timer
-        self.animation_timer += 1
-
-        if self.animation_timer >= PLAYER_ANIMATION_SPEED:
-            # Cicla o frame
-            self.current_frame = (self.current_frame + 1) % num_frames
-            self.animation_timer = 0
-
-        # Define a imagem
-        self.image = current_animation[self.current_frame]
+        collision_map = self.collision_map
+        tile_size = collision_map.tile_size
+        width, height = self.collider.size
+        first_column = (preferred[0] + self.collider_offset_x + width // 2) // tile_size
+        first_row = max(1, (preferred[1] + self.collider_offset_y) // tile_size)
+        for column in range(max(0, first_column), collision_map.cols):
+            for row in range(first_row, collision_map.rows):
+                if collision_map.is_solid(column, row) and not collision_map.is_solid(column, row - 1):
+                    x = preferred[0] if column == first_column else \
+                        column * tile_size + (tile_size - width) // 2 - self.collider_offset_x
+                    return [x, row * tile_size - height - self.collider_offset_y]
+        return list(preferred)
+
+    def set_position(self, pos):
+        """Move o jogador diretamente para uma posição (sem interpolação nem colisão)."""
+        self.entity_store.pos[self.entity] = pos
+        self.entity_store.previous_pos[self.entity] = pos
+        self._sync_from_store()
+
+    def get_state(self):
+        """Estado do jogador como uma tupla de inteiros (posição, velocidade, chão, animação e pulo guardado)."""
+        return (self.pos[0], self.pos[1], self.vertical_speed, int(self.on_ground), PLAYER_STATES.index(self.state),
+                self.buffered_jump)
+
+    def set_state(self, state):
+        """Restaura um estado de get_state() (ex.: o estado autoritativo recebido do servidor)."""
+        x, y, vertical_speed, on_ground, state_index, buffered_jump = state
+        store = self.entity_store
+        store.pos[self.entity] = (x, y)
+        store.previous_pos[self.entity] = (x, y)
+        store.vel_y[self.entity] = vertical_speed
+        store.on_ground[self.entity] = bool(on_ground)
+        if PLAYER_STATES[state_index] != self.state:
+            self.state = PLAYER_STATES[state_index]
+            self.animation_start = self.clock.tick
+        self.buffered_jump = buffered_jump
+        self._sync_from_store()
+
+    def interpolated_pos(self, alpha):
+        """Posição de desenho interpolada entre o passo anterior (alpha=0) e o atual (alpha=1)."""
+        x = self.previous_pos[0] + (self.pos[0] - self.previous_pos[0]) * alpha
+        y = self.previous_pos[1] + (self.pos[1] - self.previous_pos[1]) * alpha
+        return round(x), round(y)
 
     def update(self):
-        """Lógica de atualização do jogador: gravidade, colisão e animação."""
-
-        # 1. Gravidade e Colisão Vertical
-        self._apply_gravity()
-        self._check_collision_y()
+        """
+        Lógica de atualização do jogador: gravidade, colisão e animação.
+        Com um EntityStore e um relógio compartilhados, o Game executa o passo em lote e avança o relógio
+        antes desta chamada.
+        """
 
-        # 2. Animação
-        self._animate()
+        # 1. Física (em lote, no EntityStore)
+        if self.owns_clock:
+            self.clock.advance()
+        if self.owns_entity_store:
+            self.entity_store.step()
+        self._sync_from_store()
+
+        # Pulo guardado: executado no passo em que o jogador toca o chão (aplicado no próximo passo da física)
+        if self.buffered_jump:
+            if self.on_ground:
+                self.buffered_jump = 0
+                self.jump()
+            else:
+                self.buffered_jump -= 1
 
-        # 3. Atualiza o rect principal para o desenho
-        self.rect.topleft = self.pos
\ No newline at end of file
+        # 2. Frame atual, resolvido pelo relógio global a partir do início do estado
+        clip = self.clips[self.state]
+        self.current_frame = clip.index_at(self.clock.tick, self.animation_start)
+        if not self.headless:
+            self.image = clip.frames[self.current_frame]
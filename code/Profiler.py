@@ -0,0 +1,192 @@
+# Profiler.py
+
+import csv
+import json
+import time
+
+import numpy as np
+import pygame as pg
+
+from code.Const import PROFILER_HISTORY, PROFILER_OVERLAY_INTERVAL, FPS, WHITE, GREEN, GREEN_LIGHT
+from code.Text import get_text_renderer
+
+# Fases medidas em cada frame, na ordem em que acontecem em Game.run.
+# 'other' é o tempo do frame fora do Game (eventos e troca de estados em main.py).
+PROFILER_PHASES = ('input', 'update', 'camera', 'background', 'tiles', 'water_big', 'water_medium', 'water_small',
+                   'player', 'overlay', 'present', 'capture', 'sleep', 'other')
+
+
+class FrameProfiler:
+    """
+    Mede o tempo de cada fase do frame e guarda os últimos `history` frames num buffer circular (NumPy).
+    As medições são feitas por "voltas": lap(fase) soma à fase o tempo desde a marca anterior, então
+    fases executadas várias vezes no mesmo frame (vários passos de simulação) são acumuladas.
+    Desligado, lap() retorna imediatamente.
+    """
+
+    def __init__(self, history=PROFILER_HISTORY, phases=PROFILER_PHASES):
+        self.phases = phases
+        self.phase_index = {name: index for index, name in enumerate(phases)}
+        self.history = history
+        self.enabled = False
+
+        # Buffer circular: uma linha por frame, uma coluna por fase (segundos) + a duração total do frame
+        self.samples = np.zeros((history, len(phases)), np.float64)
+        self.frame_times = np.zeros(history, np.float64)
+        self.frames = 0  # Frames registrados desde o último reset (a posição no buffer é frames % history)
+
+        self.current = np.zeros(len(phases), np.float64)
+        self.frame_start = None
+        self.last_mark = None
+
+        # Overlay (refeito a cada PROFILER_OVERLAY_INTERVAL frames para não pesar no próprio frame)
+        self.text = None
+        self.overlay = None
+
+    def toggle(self):
+        """Liga ou desliga a medição; ao ligar, o histórico anterior é descartado."""
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.reset()
+        return self.enabled
+
+    def reset(self):
+        """Descarta todas as medições."""
+        self.frames = 0
+        self.frame_start = None
+        self.last_mark = None
+        self.overlay = None
+
+    def begin_frame(self):
+        """Fecha o frame anterior (o intervalo até aqui é a sua duração total) e inicia um novo."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            frame_time = now - self.frame_start
+            self.current[self.phase_index['other']] += max(0.0, frame_time - self.current.sum())
+            row = self.frames % self.history
+            self.samples[row] = self.current
+            self.frame_times[row] = frame_time
+            self.frames += 1
+        self.current[:] = 0.0
+        self.frame_start = now
+        self.last_mark = now
+
+    def lap(self, phase):
+        """Atribui a `phase` o tempo decorrido desde a última marca."""
+        if not self.enabled or self.last_mark is None:
+            return
+        now = time.perf_counter()
+        self.current[self.phase_index[phase]] += now - self.last_mark
+        self.last_mark = now
+
+    def _recorded(self):
+        """Retorna (amostras, tempos de frame) em ordem cronológica."""
+        count = min(self.frames, self.history)
+        if self.frames <= self.history:
+            return self.samples[:count], self.frame_times[:count]
+        start = self.frames % self.history
+        order = np.r_[start:self.history, 0:start]
+        return self.samples[order], self.frame_times[order]
+
+    def stats(self):
+        """Percentis móveis (p50, p99), média e máximo de cada fase e do frame inteiro, em milissegundos."""
+        samples, frame_times = self._recorded()
+        if len(frame_times) == 0:
+            return {}
+
+        def summarize(values):
+            p50, p99 = np.percentile(values, (50, 99)) * 1000.0
+            return {'p50': float(p50), 'p99': float(p99), 'mean': float(values.mean() * 1000.0),
+                    'max': float(values.max() * 1000.0)}
+
+        result = {'frame': summarize(frame_times)}
+        for index, name in enumerate(self.phases):
+            result[name] = summarize(samples[:, index])
+        return result
+
+    def export_csv(self, path):
+        """Grava um frame por linha (tempos em ms) no formato CSV."""
+        samples, frame_times = self._recorded()
+        first_frame = self.frames - len(frame_times)
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(('frame', 'frame_ms') + tuple(f'{name}_ms' for name in self.phases))
+            for offset, (row, frame_time) in enumerate(zip(samples, frame_times)):
+                writer.writerow([first_frame + offset, f'{frame_time * 1000.0:.4f}'] +
+                                [f'{value * 1000.0:.4f}' for value in row])
+
+    def export_json(self, path):
+        """Grava o resumo (percentis) e os tempos de cada frame (ms) no formato JSON."""
+        samples, frame_times = self._recorded()
+        data = {
+            'phases': list(self.phases),
+            'frames': len(frame_times),
+            'stats': self.stats(),
+            'frame_ms': [round(value * 1000.0, 4) for value in frame_times],
+            'phase_ms': {name: [round(value * 1000.0, 4) for value in samples[:, index]]
+                         for index, name in enumerate(self.phases)},
+        }
+        with open(path, 'w') as file:
+            json.dump(data, file, indent=2)
+
+    def export(self, base_path):
+        """Grava base_path.csv e base_path.json. Retorna os caminhos gravados."""
+        csv_path, json_path = f'{base_path}.csv', f'{base_path}.json'
+        self.export_csv(csv_path)
+        self.export_json(json_path)
+        return csv_path, json_path
+
+    def _build_overlay(self):
+        """Desenha a tabela de percentis e o gráfico dos tempos de frame numa superfície semitransparente."""
+        if self.text is None:
+            self.text = get_text_renderer(14)
+        line_height = self.text.get_linesize()
+        stats = self.stats()
+
+        graph_height = 60
+        rows = [('fase', 'p50', 'p99')]
+        for name in ('frame',) + self.phases:
+            if name in stats:
+                rows.append((name, f"{stats[name]['p50']:.2f}", f"{stats[name]['p99']:.2f}"))
+
+        # Colunas alinhadas pela largura real do texto (a fonte não é necessariamente monoespaçada)
+        rendered = [[self.text.render(text, WHITE) for text in row] for row in rows]
+        column_widths = [max(row[column].get_width() for row in rendered) for column in range(3)]
+        width = max(240, sum(column_widths) + 12 * 2 + 12)
+
+        surface = pg.Surface((width, line_height * len(rows) + graph_height + 12), pg.SRCALPHA)
+        surface.fill((0, 0, 0, 170))
+        for row_index, row in enumerate(rendered):
+            y = 4 + row_index * line_height
+            surface.blit(row[0], (6, y))
+            # Valores alinhados à direita de cada coluna
+            right = 6 + column_widths[0] + 12 + column_widths[1]
+            surface.blit(row[1], (right - row[1].get_width(), y))
+            right += 12 + column_widths[2]
+            surface.blit(row[2], (right - row[2].get_width(), y))
+
+        # Gráfico: uma barra por frame (os mais recentes à direita); a linha marca o orçamento de um frame
+        # a FPS e frames 50% acima dele (picos) ficam em vermelho
+        _, frame_times = self._recorded()
+        graph_top = surface.get_height() - graph_height - 4
+        budget_ms = 1000.0 / FPS
+        spike_ms = budget_ms * 1.5
+        scale = graph_height / (budget_ms * 2)
+        recent = frame_times[-(width - 12):] * 1000.0
+        for x, value in enumerate(recent):
+            bar = min(graph_height, int(value * scale))
+            color = GREEN if value <= spike_ms else (255, 80, 80)
+            pg.draw.line(surface, color, (6 + x, graph_top + graph_height), (6 + x, graph_top + graph_height - bar))
+        budget_y = graph_top + graph_height - int(budget_ms * scale)
+        pg.draw.line(surface, GREEN_LIGHT, (6, budget_y), (width - 6, budget_y))
+        return surface
+
+    def draw_overlay(self, surface, pos=(8, 8)):
+        """Desenha o overlay (se ligado) e retorna o retângulo ocupado, ou None."""
+        if not self.enabled or self.frames == 0:
+            return None
+        if self.overlay is None or self.frames % PROFILER_OVERLAY_INTERVAL == 0:
+            self.overlay = self._build_overlay()
+        return surface.blit(self.overlay, pos)
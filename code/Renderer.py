@@ -0,0 +1,60 @@
+# Renderer.py
+
+import pygame as pg
+
+from code.Const import DIRTY_RECT_FULL_REFRESH_RATIO
+
+
+class DirtyRectRenderer:
+    """
+    Apresenta na tela apenas as regiões que mudaram desde o último frame.
+    Cada blit dinâmico (jogador, nuvens, água) é registrado com track(); um elemento é considerado
+    alterado quando a imagem ou a posição não coincidem com as do frame anterior.
+    """
+
+    def __init__(self, screen, full_refresh_ratio=DIRTY_RECT_FULL_REFRESH_RATIO):
+        self.screen_rect = screen.get_rect()
+        self.full_refresh_area = self.screen_rect.width * self.screen_rect.height * full_refresh_ratio
+
+        self.previous_items = {}
+        self.current_items = {}
+        self.extra_rects = []
+        self.needs_full_refresh = True  # O primeiro frame sempre é apresentado por completo
+
+    def track(self, image, rect):
+        """Registra um elemento desenhado neste frame."""
+        self.current_items[(id(image), rect.x, rect.y, rect.width, rect.height)] = rect
+
+    def add_dirty(self, rect):
+        """Marca explicitamente uma região como alterada."""
+        self.extra_rects.append(pg.Rect(rect))
+
+    def request_full_refresh(self):
+        """Força a atualização da tela inteira no próximo present()."""
+        self.needs_full_refresh = True
+
+    def _collect_dirty_rects(self):
+        """Retorna as regiões de elementos que apareceram, sumiram, mudaram de imagem ou posição."""
+        dirty = list(self.extra_rects)
+        for key, rect in self.current_items.items():
+            if key not in self.previous_items:
+                dirty.append(rect)
+        for key, rect in self.previous_items.items():
+            if key not in self.current_items:
+                dirty.append(rect)
+        return [rect.clip(self.screen_rect) for rect in dirty]
+
+    def present(self):
+        """Envia para o display somente as regiões alteradas (ou a tela toda, se muito estiver sujo)."""
+        dirty = [rect for rect in self._collect_dirty_rects() if rect.width and rect.height]
+        dirty_area = sum(rect.width * rect.height for rect in dirty)
+
+        if self.needs_full_refresh or dirty_area > self.full_refresh_area:
+            pg.display.update()
+        elif dirty:
+            pg.display.update(dirty)
+
+        self.previous_items = self.current_items
+        self.current_items = {}
+        self.extra_rects = []
+        self.needs_full_refresh = False
@@ -0,0 +1,180 @@
+# Replay.py
+
+import hashlib
+import struct
+import time
+
+import pygame as pg
+
+from code.Input import ScriptedKeys
+
+# Formato do arquivo (little-endian):
+#   cabeçalho: magic 'CCNR', versão (u8), SIMULATION_HZ (u16), nº de passos (u32),
+#              posição inicial e final do jogador (4 x f64), nº de sequências (u32),
+#              hash SHA-1 do mapa no início da gravação (20 bytes)
+#   corpo: sequências run-length (contagem em varint LEB128 + máscara de teclas em 1 byte)
+REPLAY_MAGIC = b'CCNR'
+REPLAY_VERSION = 3  # 3: hash do mapa no cabeçalho; 2: buffer de pulo, o que muda a física gravada
+HEADER_FORMAT = '<4sBHIddddI20s'
+MAP_HASH_HEADER = struct.Struct('<III')  # largura, altura e lado do chunk, somados aos bytes do mapa no hash
+
+# Bits da máscara de entrada de cada passo
+HELD_KEYS = (pg.K_a, pg.K_d)  # Teclas mantidas pressionadas (movimento contínuo)
+EVENT_KEYS = (pg.K_SPACE, pg.K_ESCAPE)  # Teclas de evento (KEYDOWN do passo)
+
+
+def encode_input(keys_pressed, key_event_key):
+    """Converte a entrada de um passo em uma máscara de bits."""
+    mask = 0
+    for bit, key in enumerate(HELD_KEYS):
+        if keys_pressed[key]:
+            mask |= 1 << bit
+    if key_event_key in EVENT_KEYS:
+        mask |= 1 << (len(HELD_KEYS) + EVENT_KEYS.index(key_event_key))
+    return mask
+
+
+def decode_input(mask):
+    """Reconstrói (keys_pressed, key_event_key) a partir de uma máscara de bits."""
+    keys_pressed = ScriptedKeys({key: True for bit, key in enumerate(HELD_KEYS) if mask & (1 << bit)})
+    key_event_key = None
+    for bit, key in enumerate(EVENT_KEYS):
+        if mask & (1 << (len(HELD_KEYS) + bit)):
+            key_event_key = key
+    return keys_pressed, key_event_key
+
+
+def map_hash(tile_map):
+    """SHA-1 dos tiles do mapa (com as alterações em tempo de execução): o replay só vale no mesmo mapa."""
+    digest = hashlib.sha1(MAP_HASH_HEADER.pack(tile_map.cols, tile_map.rows, tile_map.chunk_size))
+    digest.update(tile_map.snapshot())
+    return digest.digest()
+
+
+def _write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class InputRecorder:
+    """Grava a entrada de cada passo de simulação de Game.step em sequências run-length."""
+
+    def __init__(self, game):
+        self.game = game
+        self.simulation_hz = round(1.0 / game.timestep.step_time)
+        self.map_hash = map_hash(game.tile_map)
+        self.start_pos = tuple(game.player.pos)
+        self.runs = []  # [[máscara, contagem], ...]
+        self.steps = 0
+
+    def record(self, keys_pressed, key_event_key):
+        """Registra a entrada de um passo."""
+        mask = encode_input(keys_pressed, key_event_key)
+        if self.runs and self.runs[-1][0] == mask:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([mask, 1])
+        self.steps += 1
+
+    def to_bytes(self):
+        """Serializa a gravação, incluindo a posição final do jogador para verificação no replay."""
+        final_pos = self.game.player.pos
+        data = bytearray(struct.pack(HEADER_FORMAT, REPLAY_MAGIC, REPLAY_VERSION, self.simulation_hz, self.steps,
+                                     self.start_pos[0], self.start_pos[1], final_pos[0], final_pos[1],
+                                     len(self.runs), self.map_hash))
+        for mask, count in self.runs:
+            _write_varint(data, count)
+            data.append(mask)
+        return bytes(data)
+
+    def save(self, path):
+        """Grava o arquivo de replay em disco."""
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+
+
+class InputReplayer:
+    """Lê uma gravação e a reproduz em Game.step na velocidade máxima (sem limitador de FPS)."""
+
+    def __init__(self, data):
+        header_size = struct.calcsize(HEADER_FORMAT)
+        if len(data) < header_size:
+            raise ValueError("Arquivo de replay truncado.")
+        (magic, version, self.simulation_hz, self.steps, start_x, start_y, final_x, final_y,
+         run_count, self.map_hash) = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError("Arquivo de replay inválido ou de versão incompatível.")
+        self.start_pos = (start_x, start_y)
+        self.final_pos = (final_x, final_y)
+
+        self.runs = []
+        offset = header_size
+        try:
+            for _ in range(run_count):
+                count, offset = _read_varint(data, offset)
+                self.runs.append((data[offset], count))
+                offset += 1
+        except IndexError:
+            raise ValueError("Arquivo de replay truncado.") from None
+
+    @classmethod
+    def load(cls, path):
+        """Carrega um arquivo de replay do disco."""
+        with open(path, 'rb') as file:
+            return cls(file.read())
+
+    def inputs(self):
+        """Gera (keys_pressed, key_event_key) para cada passo gravado."""
+        for mask, count in self.runs:
+            decoded = decode_input(mask)
+            for _ in range(count):
+                yield decoded
+
+    def run(self, game, draw=False):
+        """
+        Reproduz a gravação no jogo o mais rápido possível e compara a posição final do jogador.
+        Retorna um resumo com 'matches' indicando se a física reproduziu exatamente a gravação.
+        As entradas são por passo (e o buffer de pulo é contado em passos): uma gravação feita com outra taxa
+        de simulação divergiria, então é recusada com ValueError, assim como uma gravação feita em outro mapa.
+        """
+        simulation_hz = round(1.0 / game.timestep.step_time)
+        if simulation_hz != self.simulation_hz:
+            raise ValueError(f"Replay gravado a {self.simulation_hz} passos/s, mas o jogo simula a "
+                             f"{simulation_hz} passos/s.")
+        if map_hash(game.tile_map) != self.map_hash:
+            raise ValueError("Replay gravado em um mapa diferente do carregado.")
+        game.player.set_position(self.start_pos)
+
+        steps = 0
+        start = time.perf_counter()
+        for keys_pressed, key_event_key in self.inputs():
+            steps += 1
+            if game.step(keys_pressed, key_event_key) == 'QUIT':
+                break
+            if draw:
+                game.draw()
+        elapsed = time.perf_counter() - start
+
+        final_pos = tuple(game.player.pos)
+        return {
+            'steps': steps,
+            'elapsed': elapsed,
+            'steps_per_second': steps / elapsed if elapsed > 0 else 0.0,
+            'expected_pos': self.final_pos,
+            'final_pos': final_pos,
+            'matches': final_pos == self.final_pos,
+        }
@@ -0,0 +1,82 @@
+# Scene.py
+
+
+class SceneManager:
+    """
+    Pilha de cenas (Menu, Game, futuras fases) com push, pop e replace.
+    Cada cena é registrada com um nome, uma função que cria a instância a partir dos assets e os grupos de
+    assets (code/Loader.py) de que precisa. Os assets são obtidos do AssetCache ao criar a cena e devolvidos
+    quando ela sai da pilha; preload() carrega os da próxima cena em segundo plano.
+
+    Apenas a cena do topo é executada. As que ficam por baixo são suspensas (suspend()) e retomadas
+    (resume()) ao voltarem ao topo, se a cena implementar esses métodos.
+    """
+
+    def __init__(self, asset_cache):
+        self.asset_cache = asset_cache
+        self.definitions = {}  # nome -> (função que cria a cena, grupos de assets)
+        self.stack = []  # [(nome, cena)], o topo é a cena atual
+
+    def register(self, name, factory, asset_groups=()):
+        """Registra uma cena; factory(assets) recebe {grupo: assets} e retorna a instância."""
+        self.definitions[name] = (factory, tuple(asset_groups))
+
+    @property
+    def current_name(self):
+        return self.stack[-1][0] if self.stack else None
+
+    @property
+    def current(self):
+        return self.stack[-1][1] if self.stack else None
+
+    def preload(self, name):
+        """Começa a carregar os assets da cena em segundo plano. Retorna o AssetLoader (ou None)."""
+        _, asset_groups = self.definitions[name]
+        return self.asset_cache.preload(asset_groups)
+
+    def is_ready(self, name):
+        """True se a cena pode ser criada sem esperar por assets."""
+        return self.asset_cache.is_ready(self.definitions[name][1])
+
+    def _create(self, name):
+        factory, asset_groups = self.definitions[name]
+        return factory(self.asset_cache.acquire(asset_groups))
+
+    def _destroy(self, name, scene):
+        exit_scene = getattr(scene, 'exit', None)
+        if exit_scene:
+            exit_scene()
+        self.asset_cache.release(self.definitions[name][1])
+
+    def push(self, name):
+        """Suspende a cena atual e coloca uma nova no topo."""
+        scene = self._create(name)
+        if self.stack:
+            suspend = getattr(self.current, 'suspend', None)
+            if suspend:
+                suspend()
+        self.stack.append((name, scene))
+        return scene
+
+    def pop(self):
+        """Remove a cena do topo (liberando os seus assets) e retoma a anterior."""
+        name, scene = self.stack.pop()
+        self._destroy(name, scene)
+        if self.stack:
+            resume = getattr(self.current, 'resume', None)
+            if resume:
+                resume()
+
+    def replace(self, name):
+        """Troca a cena do topo por uma nova, criada antes para que assets em comum não sejam recarregados."""
+        scene = self._create(name)
+        old_name, old_scene = self.stack.pop()
+        self._destroy(old_name, old_scene)
+        self.stack.append((name, scene))
+        return scene
+
+    def clear(self):
+        """Remove todas as cenas (ao sair do jogo)."""
+        while self.stack:
+            name, scene = self.stack.pop()
+            self._destroy(name, scene)
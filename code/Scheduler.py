@@ -0,0 +1,90 @@
+# Scheduler.py
+
+import time
+
+import pygame as pg
+
+from code.Const import FRAME_RATES, FRAME_RATE_UNFOCUSED, FRAME_RATE_MINIMIZED, FRAME_SPIN_TIME
+
+
+class FrameScheduler:
+    """
+    Controla o ritmo do loop principal para todos os estados.
+    - get_events(): sem nada para atualizar (idle), bloqueia em pg.event.wait em vez de redesenhar à toa.
+    - end_frame(estado): espera até o próximo frame na taxa do estado (FRAME_RATES), dormindo a maior
+      parte do tempo e girando (spin) apenas no último FRAME_SPIN_TIME, para pouca variação entre frames.
+    - Com a janela sem foco ou minimizada, a taxa cai automaticamente (FRAME_RATE_UNFOCUSED/_MINIMIZED).
+    """
+
+    def __init__(self, rates=FRAME_RATES, unfocused_rate=FRAME_RATE_UNFOCUSED, minimized_rate=FRAME_RATE_MINIMIZED,
+                 spin_time=FRAME_SPIN_TIME):
+        self.rates = dict(rates)
+        self.unfocused_rate = unfocused_rate
+        self.minimized_rate = minimized_rate
+        self.spin_time = spin_time
+
+        self.focused = True
+        self.minimized = False
+        self.next_frame_time = None
+
+    def rate(self, state):
+        """Taxa alvo (frames por segundo) do estado, considerando foco e minimização (0 = sem limite)."""
+        rate = self.rates.get(state, 0)
+        if self.minimized:
+            return min(rate, self.minimized_rate) if rate else self.minimized_rate
+        if not self.focused:
+            return min(rate, self.unfocused_rate) if rate else self.unfocused_rate
+        return rate
+
+    def _handle_window_event(self, event):
+        """Atualiza o estado de foco/minimização da janela."""
+        if event.type == pg.WINDOWFOCUSLOST:
+            self.focused = False
+        elif event.type == pg.WINDOWFOCUSGAINED:
+            self.focused = True
+        elif event.type in (pg.WINDOWMINIMIZED, pg.WINDOWHIDDEN):
+            self.minimized = True
+        elif event.type in (pg.WINDOWRESTORED, pg.WINDOWSHOWN, pg.WINDOWMAXIMIZED):
+            self.minimized = False
+
+    def get_events(self, idle=False, timeout=None):
+        """
+        Retorna os eventos pendentes. Com idle=True, bloqueia até chegar um evento (ou até `timeout`
+        segundos, se informado) e o próximo frame recomeça a contagem do ritmo.
+        """
+        events = []
+        if idle:
+            event = pg.event.wait(int(timeout * 1000) if timeout is not None else 0)
+            if event.type != pg.NOEVENT:
+                events.append(event)
+            self.next_frame_time = None  # Depois de esperar, não há atraso a compensar
+        events.extend(pg.event.get())
+
+        for event in events:
+            self._handle_window_event(event)
+        return events
+
+    def end_frame(self, state):
+        """Espera até o horário do próximo frame na taxa alvo do estado."""
+        rate = self.rate(state)
+        now = time.perf_counter()
+        if rate <= 0:
+            self.next_frame_time = None
+            return
+
+        period = 1.0 / rate
+        deadline = self.next_frame_time
+        if deadline is None or now - deadline > period:
+            # Primeiro frame (ou logo após esperar por eventos) ou atraso maior que um frame inteiro:
+            # recomeça a contagem a partir de agora, sem esperar
+            self.next_frame_time = now + period
+            return
+        self.next_frame_time = deadline + period
+
+        # Sem foco a precisão não importa: apenas dorme (não gasta CPU girando)
+        spin_time = self.spin_time if self.focused and not self.minimized else 0.0
+        remaining = deadline - now
+        if remaining > spin_time:
+            time.sleep(remaining - spin_time)
+        while time.perf_counter() < deadline:
+            pass
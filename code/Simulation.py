@@ -0,0 +1,107 @@
+# Simulation.py
+
+import argparse
+import multiprocessing
+import random
+import time
+
+import pygame as pg
+
+from code.Const import TILE_SIZE
+from code.Game import Game
+from code.Input import ScriptedKeys
+
+
+def random_policy(seed, decision_interval=15, jump_chance=0.05):
+    """
+    Bot simples e determinístico: a cada decision_interval passos escolhe andar para a esquerda,
+    direita ou ficar parado, e pula aleatoriamente. Gera (keys_pressed, key_event_key) por passo.
+    """
+    rng = random.Random(seed)
+    keys = ScriptedKeys()
+    step = 0
+    while True:
+        if step % decision_interval == 0:
+            direction = rng.choice((pg.K_a, pg.K_d, None))
+            keys = ScriptedKeys({direction: True}) if direction else ScriptedKeys()
+        key_event_key = pg.K_SPACE if rng.random() < jump_chance else None
+        yield keys, key_event_key
+        step += 1
+
+
+def run_session(seed, steps):
+    """Executa uma sessão headless completa e retorna um resumo do resultado."""
+    game = Game(None, headless=True)
+    player = game.player
+    policy = random_policy(seed)
+
+    max_x = player.pos[0]
+    min_y = player.pos[1]
+    start = time.perf_counter()
+    for _ in range(steps):
+        keys_pressed, key_event_key = next(policy)
+        game.step(keys_pressed, key_event_key)
+        max_x = max(max_x, player.pos[0])
+        min_y = min(min_y, player.pos[1])
+    elapsed = time.perf_counter() - start
+
+    return {
+        'seed': seed,
+        'steps': steps,
+        'final_pos': tuple(player.pos),
+        'max_x': max_x,
+        'min_y': min_y,
+        'fell_off_map': player.pos[1] > game.tile_map.rows * TILE_SIZE,
+        'elapsed': elapsed,
+    }
+
+
+def _run_session_args(args):
+    """Adaptador para Pool.imap_unordered (recebe uma tupla de argumentos)."""
+    return run_session(*args)
+
+
+def run_batch(sessions, steps, processes=None, first_seed=0):
+    """
+    Distribui sessões independentes entre um pool de processos.
+    Retorna (resultados, resumo) onde o resumo inclui os passos por segundo do lote inteiro.
+    """
+    jobs = [(seed, steps) for seed in range(first_seed, first_seed + sessions)]
+
+    start = time.perf_counter()
+    if processes == 1:
+        results = [run_session(*job) for job in jobs]
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            chunksize = max(1, len(jobs) // ((processes or multiprocessing.cpu_count()) * 4))
+            results = list(pool.imap_unordered(_run_session_args, jobs, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda result: result['seed'])
+    total_steps = sessions * steps
+    summary = {
+        'sessions': sessions,
+        'total_steps': total_steps,
+        'elapsed': elapsed,
+        'steps_per_second': total_steps / elapsed if elapsed > 0 else 0.0,
+        'fell_off_map': sum(result['fell_off_map'] for result in results),
+    }
+    return results, summary
+
+
+def main():
+    """Ponto de entrada: python -m code.Simulation --sessions 1000 --steps 3600"""
+    parser = argparse.ArgumentParser(description="Executa sessões de jogo sem janela (headless).")
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--steps', type=int, default=3600, help="Passos de simulação por sessão")
+    parser.add_argument('--processes', type=int, default=None, help="Processos do pool (padrão: nº de CPUs)")
+    parser.add_argument('--seed', type=int, default=0, help="Semente da primeira sessão")
+    args = parser.parse_args()
+
+    _, summary = run_batch(args.sessions, args.steps, args.processes, args.seed)
+    print(f"{summary['sessions']} sessões, {summary['total_steps']} passos em {summary['elapsed']:.2f}s "
+          f"({summary['steps_per_second']:.0f} passos/s), {summary['fell_off_map']} caíram do mapa")
+
+
+if __name__ == '__main__':
+    main()
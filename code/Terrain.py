@@ -0,0 +1,85 @@
+# Terrain.py
+
+import pygame as pg
+
+from code.Const import TILE_SIZE, TILE_STREAM_MARGIN, TERRAIN_BAKE_BUDGET
+
+
+class TerrainLayer:
+    """
+    Camada de terreno pré-renderizada.
+    Cada chunk do mapa (code/TileMap.py) é desenhado uma única vez numa superfície própria; por frame,
+    apenas os chunks visíveis são blitados. Chunks próximos da tela são pré-renderizados aos poucos
+    (TERRAIN_BAKE_BUDGET por frame) e os que ficam longe da câmera são descartados.
+    """
+
+    def __init__(self, tile_map, terrain_images, bake_budget=TERRAIN_BAKE_BUDGET, margin=TILE_STREAM_MARGIN):
+        self.tile_map = tile_map
+        self.chunk_size = tile_map.chunk_size
+        self.chunk_pixels = self.chunk_size * TILE_SIZE
+        self.bake_budget = bake_budget
+        self.margin = margin
+
+        # Imagem de cada tile indexada pelo byte armazenado no mapa (evita chr() e dict por tile)
+        self.images_by_code = [None] * 256
+        for tile_char, image in terrain_images.items():
+            self.images_by_code[ord(tile_char)] = image
+
+        # Cache dos chunks: (chunk_x, chunk_y) -> Surface (None = chunk vazio)
+        self.chunks = {}
+
+    def _bake_chunk(self, chunk_x, chunk_y):
+        """Desenha (ou redesenha) todos os tiles de um chunk na sua superfície em cache."""
+        tiles = self.tile_map.chunk(chunk_x, chunk_y)
+        size = self.chunk_size
+
+        surface = None
+        for index, code in enumerate(tiles):
+            image = self.images_by_code[code]
+            if image:
+                if surface is None:
+                    # O tamanho é sempre o de um chunk completo para manter o cálculo de posição simples
+                    surface = pg.Surface((self.chunk_pixels, self.chunk_pixels), pg.SRCALPHA)
+                surface.blit(image, ((index % size) * TILE_SIZE, (index // size) * TILE_SIZE))
+
+        # Chunks sem nenhum tile não ocupam memória nem custam blits
+        self.chunks[(chunk_x, chunk_y)] = surface
+        return surface
+
+    def set_tile(self, x, y, tile_char):
+        """Redesenha apenas o chunk afetado por uma alteração de tile (o mapa já deve estar atualizado)."""
+        key = (x // self.chunk_size, y // self.chunk_size)
+        if key in self.chunks:
+            self._bake_chunk(*key)
+
+    def draw(self, surface, viewport=None):
+        """Desenha os chunks que intersectam o viewport (em coordenadas do mundo)."""
+        if viewport is None:
+            viewport = surface.get_rect()
+
+        first_x, last_x, first_y, last_y = self.tile_map.chunk_range(viewport)
+        for chunk_y in range(first_y, last_y):
+            for chunk_x in range(first_x, last_x):
+                key = (chunk_x, chunk_y)
+                chunk = self.chunks[key] if key in self.chunks else self._bake_chunk(chunk_x, chunk_y)
+                if chunk is not None:
+                    surface.blit(chunk, (chunk_x * self.chunk_pixels - viewport.left,
+                                         chunk_y * self.chunk_pixels - viewport.top))
+
+        self._stream(viewport)
+
+    def _stream(self, viewport):
+        """Pré-renderiza alguns chunks da margem ao redor da tela e descarta os que ficaram longe."""
+        first_x, last_x, first_y, last_y = self.tile_map.chunk_range(viewport, self.margin)
+        for key in list(self.chunks):
+            if not (first_x <= key[0] < last_x and first_y <= key[1] < last_y):
+                del self.chunks[key]
+
+        budget = self.bake_budget
+        for chunk_y in range(first_y, last_y):
+            for chunk_x in range(first_x, last_x):
+                if budget <= 0:
+                    return
+                if (chunk_x, chunk_y) not in self.chunks:
+                    self._bake_chunk(chunk_x, chunk_y)
+                    budget -= 1
@@ -0,0 +1,97 @@
+# Text.py
+
+from collections import OrderedDict
+
+import pygame as pg
+
+from code.Const import FONT_NAME, TEXT_CACHE_SIZE
+
+# Renderizadores compartilhados por (fonte, tamanho, negrito): Menu, Game e o profiler usam os mesmos caches
+_renderers = {}
+
+
+class TextRenderer:
+    """
+    Texto com cache. render() guarda as superfícies das strings já renderizadas num LRU de até `cache_size`
+    entradas (textos fixos ou que se repetem, como rótulos e mensagens). draw_glyphs() monta textos que mudam
+    a cada frame (números do HUD) a partir de superfícies por caractere, renderizadas uma única vez.
+    Sem kerning entre os caracteres, o que para dígitos (de largura fixa na maioria das fontes) não muda nada.
+    """
+
+    def __init__(self, size, bold=True, font_name=FONT_NAME, cache_size=TEXT_CACHE_SIZE):
+        self.font = pg.font.SysFont(font_name, size, bold=bold)
+        self.cache_size = cache_size
+        self.strings = OrderedDict()  # (texto, cor, antialias) -> superfície, da usada há mais tempo à mais recente
+        self.glyphs = {}  # (caractere, cor) -> (superfície, avanço em pixels)
+
+        self.string_hits = 0
+        self.string_misses = 0
+        self.glyph_hits = 0
+        self.glyph_misses = 0
+
+    def get_linesize(self):
+        return self.font.get_linesize()
+
+    def render(self, text, color, antialias=True):
+        """Superfície do texto, renderizada uma única vez enquanto estiver no cache."""
+        key = (text, color, antialias)
+        surface = self.strings.get(key)
+        if surface is not None:
+            self.strings.move_to_end(key)
+            self.string_hits += 1
+            return surface
+
+        self.string_misses += 1
+        surface = self.font.render(text, antialias, color)
+        self.strings[key] = surface
+        if len(self.strings) > self.cache_size:
+            self.strings.popitem(last=False)
+        return surface
+
+    def _glyph(self, char, color):
+        glyph = self.glyphs.get((char, color))
+        if glyph is not None:
+            self.glyph_hits += 1
+            return glyph
+        self.glyph_misses += 1
+        metrics = self.font.metrics(char)[0]
+        advance = metrics[4] if metrics else self.font.size(char)[0]
+        glyph = self.glyphs[(char, color)] = (self.font.render(char, True, color), advance)
+        return glyph
+
+    def draw_glyphs(self, target, text, pos, color):
+        """
+        Desenha `text` em `target` a partir do cache de glifos, com uma única chamada a blits().
+        Retorna a largura desenhada.
+        """
+        x, y = pos
+        sequence = []
+        for char in text:
+            surface, advance = self._glyph(char, color)
+            sequence.append((surface, (x, y)))
+            x += advance
+        target.blits(sequence, False)
+        return x - pos[0]
+
+
+def get_text_renderer(size, bold=True, font_name=FONT_NAME):
+    """TextRenderer compartilhado da fonte (criado na primeira chamada; pg.font precisa estar iniciado)."""
+    key = (font_name, size, bold)
+    renderer = _renderers.get(key)
+    if renderer is None:
+        renderer = _renderers[key] = TextRenderer(size, bold, font_name)
+    return renderer
+
+
+def text_cache_stats():
+    """Taxas de acerto somadas de todos os renderizadores compartilhados."""
+    totals = {'string_hits': 0, 'string_misses': 0, 'glyph_hits': 0, 'glyph_misses': 0}
+    for renderer in _renderers.values():
+        for name in totals:
+            totals[name] += getattr(renderer, name)
+    strings = totals['string_hits'] + totals['string_misses']
+    glyphs = totals['glyph_hits'] + totals['glyph_misses']
+    return {
+        'string_hit_rate': totals['string_hits'] / strings if strings else None,
+        'glyph_hit_rate': totals['glyph_hits'] / glyphs if glyphs else None,
+    }
@@ -0,0 +1,242 @@
+# TileMap.py
+
+import argparse
+import mmap
+import random
+import struct
+
+from code.Const import GAME_MAP, TILE_SIZE, TERRAIN_CHUNK_SIZE, TILE_STREAM_MARGIN
+
+# Formato binário do mapa (little-endian):
+#   cabeçalho: magic 'CCNM', versão (u8), largura e altura em tiles (u32, u32), lado do chunk em tiles (u16)
+#   corpo: chunks em ordem (linha de chunks, coluna de chunk); cada chunk tem chunk_size * chunk_size bytes,
+#          um por tile (o caractere do tile em ASCII, ' ' = vazio). Tiles fora do mapa são preenchidos com ' '.
+MAP_MAGIC = b'CCNM'
+MAP_VERSION = 1
+MAP_HEADER = struct.Struct('<4sBIIH')
+EMPTY_TILE = ord(' ')
+
+
+class ChunkedTileMap:
+    """
+    Armazenamento do mapa dividido em chunks quadrados.
+    Os dados podem vir de um arquivo mapeado em memória (mmap) ou de uma lista de linhas (ex.: GAME_MAP).
+    Apenas os chunks próximos da câmera ficam residentes (copiados e com bitmap de colisão calculado);
+    stream() carrega os que entram na área e descarta os que saem, mantendo a memória constante.
+    """
+
+    def __init__(self, data, cols, rows, chunk_size, data_offset=0):
+        self.data = data
+        self.data_offset = data_offset
+        self.cols = cols
+        self.rows = rows
+        self.chunk_size = chunk_size
+        self.chunk_area = chunk_size * chunk_size
+        self.chunk_cols = (cols + chunk_size - 1) // chunk_size
+        self.chunk_rows = (rows + chunk_size - 1) // chunk_size
+
+        # Chunks residentes: (cx, cy) -> bytearray dos tiles; e o bitmap sólido (1 = sólido) de cada um
+        self.resident = {}
+        self.solid = {}
+        self.edited = set()  # Chunks alterados em tempo de execução nunca são descartados
+        self.version = 0  # Incrementado a cada alteração de tile
+        self.streamed_range = None  # Intervalo de chunks da última chamada a stream()
+
+    @classmethod
+    def from_rows(cls, rows, chunk_size=TERRAIN_CHUNK_SIZE):
+        """Cria o mapa a partir de uma lista de linhas de caracteres (como GAME_MAP)."""
+        return cls(encode_chunks(rows, chunk_size), len(rows[0]) if rows else 0, len(rows), chunk_size)
+
+    @classmethod
+    def open(cls, path):
+        """Abre um arquivo de mapa via mmap; os chunks são lidos sob demanda."""
+        with open(path, 'rb') as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, cols, rows, chunk_size = MAP_HEADER.unpack_from(data)
+        if magic != MAP_MAGIC or version != MAP_VERSION:
+            data.close()
+            raise ValueError(f"Arquivo de mapa inválido ou de versão incompatível: {path}")
+        return cls(data, cols, rows, chunk_size, data_offset=MAP_HEADER.size)
+
+    def _load_chunk(self, chunk_x, chunk_y):
+        """Copia um chunk do armazenamento para a memória residente e calcula o seu bitmap sólido."""
+        start = self.data_offset + (chunk_y * self.chunk_cols + chunk_x) * self.chunk_area
+        tiles = bytearray(self.data[start:start + self.chunk_area])
+        self.resident[(chunk_x, chunk_y)] = tiles
+        self.solid[(chunk_x, chunk_y)] = bytearray(tile != EMPTY_TILE for tile in tiles)
+        return tiles
+
+    def chunk(self, chunk_x, chunk_y):
+        """Retorna os tiles (bytearray) de um chunk, carregando-o se necessário."""
+        tiles = self.resident.get((chunk_x, chunk_y))
+        if tiles is None:
+            tiles = self._load_chunk(chunk_x, chunk_y)
+        return tiles
+
+    def solid_chunk(self, chunk_x, chunk_y):
+        """Retorna o bitmap sólido (bytearray, 1 byte por tile) de um chunk, carregando-o se necessário."""
+        solid = self.solid.get((chunk_x, chunk_y))
+        if solid is None:
+            self._load_chunk(chunk_x, chunk_y)
+            solid = self.solid[(chunk_x, chunk_y)]
+        return solid
+
+    def get_tile(self, x, y):
+        """Retorna o caractere do tile (coluna x, linha y). Fora do mapa retorna ' '."""
+        if not (0 <= x < self.cols and 0 <= y < self.rows):
+            return ' '
+        size = self.chunk_size
+        return chr(self.chunk(x // size, y // size)[(y % size) * size + x % size])
+
+    def set_tile(self, x, y, tile_char):
+        """Altera um tile em tempo de execução (apenas na memória; o arquivo de origem não é modificado)."""
+        size = self.chunk_size
+        key = (x // size, y // size)
+        index = (y % size) * size + x % size
+        self.chunk(*key)[index] = ord(tile_char)
+        self.solid[key][index] = 1 if tile_char != ' ' else 0
+        self.edited.add(key)
+        self.version += 1
+
+    def snapshot(self):
+        """
+        Bytes de todos os chunks no formato do arquivo (com as alterações feitas em tempo de execução),
+        sem tornar residentes os chunks que não estão carregados.
+        """
+        area = self.chunk_area
+        parts = []
+        for chunk_y in range(self.chunk_rows):
+            for chunk_x in range(self.chunk_cols):
+                tiles = self.resident.get((chunk_x, chunk_y))
+                if tiles is None:
+                    start = self.data_offset + (chunk_y * self.chunk_cols + chunk_x) * area
+                    tiles = self.data[start:start + area]
+                parts.append(bytes(tiles))
+        return b''.join(parts)
+
+    def chunk_range(self, rect, margin=0):
+        """Intervalo de chunks [início, fim) que intersectam um retângulo em pixels, com margem em chunks."""
+        chunk_pixels = self.chunk_size * TILE_SIZE
+        first_x = max(0, rect.left // chunk_pixels - margin)
+        first_y = max(0, rect.top // chunk_pixels - margin)
+        last_x = min(self.chunk_cols, (rect.right + chunk_pixels - 1) // chunk_pixels + margin)
+        last_y = min(self.chunk_rows, (rect.bottom + chunk_pixels - 1) // chunk_pixels + margin)
+        return first_x, last_x, first_y, last_y
+
+    def stream(self, rect, margin=TILE_STREAM_MARGIN):
+        """
+        Mantém residentes apenas os chunks que intersectam `rect` (em pixels do mundo) mais uma margem,
+        carregando os que entraram e descartando os que saíram.
+        """
+        chunk_range = self.chunk_range(rect, margin)
+        if chunk_range == self.streamed_range:
+            return  # A área não mudou de chunk desde a última chamada
+        self.streamed_range = chunk_range
+
+        first_x, last_x, first_y, last_y = chunk_range
+        for key in list(self.resident):
+            if key in self.edited:
+                continue
+            if not (first_x <= key[0] < last_x and first_y <= key[1] < last_y):
+                del self.resident[key]
+                del self.solid[key]
+
+        for chunk_y in range(first_y, last_y):
+            for chunk_x in range(first_x, last_x):
+                if (chunk_x, chunk_y) not in self.resident:
+                    self._load_chunk(chunk_x, chunk_y)
+
+
+def encode_chunks(rows, chunk_size):
+    """Converte uma lista de linhas de caracteres nos bytes dos chunks (ordem do formato binário)."""
+    height = len(rows)
+    width = len(rows[0]) if height else 0
+    chunk_cols = (width + chunk_size - 1) // chunk_size
+    chunk_rows = (height + chunk_size - 1) // chunk_size
+
+    data = bytearray([EMPTY_TILE]) * (chunk_cols * chunk_rows * chunk_size * chunk_size)
+    for y, row in enumerate(rows):
+        for x, tile_char in enumerate(row):
+            if tile_char != ' ':
+                chunk_index = (y // chunk_size) * chunk_cols + x // chunk_size
+                data[chunk_index * chunk_size * chunk_size + (y % chunk_size) * chunk_size + x % chunk_size] = \
+                    ord(tile_char)
+    return data
+
+
+def save_map(path, rows, chunk_size=TERRAIN_CHUNK_SIZE):
+    """Grava uma lista de linhas de caracteres no formato binário em chunks."""
+    height = len(rows)
+    width = len(rows[0]) if height else 0
+    with open(path, 'wb') as file:
+        file.write(MAP_HEADER.pack(MAP_MAGIC, MAP_VERSION, width, height, chunk_size))
+        file.write(encode_chunks(rows, chunk_size))
+
+
+def generate_map(path, width, height, chunk_size=TERRAIN_CHUNK_SIZE, seed=0):
+    """
+    Gera um mapa grande de teste diretamente no formato binário, uma linha de chunks por vez
+    (sem montar o mapa inteiro na memória): chão contínuo com buracos e plataformas flutuantes.
+    """
+    rng = random.Random(seed)
+    ground_row = height - 1
+
+    # Buracos no chão e plataformas são sorteados por coluna, antes de escrever os chunks
+    holes = bytearray(width)
+    platforms = {}  # linha -> lista de (coluna inicial, coluna final)
+    x = 8
+    while x < width:
+        if rng.random() < 0.15:
+            for hole_x in range(x, min(width, x + rng.randint(2, 3))):
+                holes[hole_x] = 1
+        if rng.random() < 0.5:
+            row = ground_row - rng.randint(3, min(8, max(3, height - 2)))
+            if row > 0:
+                platforms.setdefault(row, []).append((x, min(width, x + rng.randint(3, 6))))
+        x += rng.randint(6, 12)
+
+    chunk_cols = (width + chunk_size - 1) // chunk_size
+    chunk_rows = (height + chunk_size - 1) // chunk_size
+    with open(path, 'wb') as file:
+        file.write(MAP_HEADER.pack(MAP_MAGIC, MAP_VERSION, width, height, chunk_size))
+        for chunk_y in range(chunk_rows):
+            band = [bytearray([EMPTY_TILE]) * width for _ in range(chunk_size)]
+            for local_y in range(chunk_size):
+                y = chunk_y * chunk_size + local_y
+                if y >= height:
+                    continue
+                row = band[local_y]
+                if y == ground_row:
+                    for column in range(width):
+                        if not holes[column]:
+                            row[column] = ord('2')
+                for start, end in platforms.get(y, ()):
+                    row[start] = ord('1')
+                    row[start + 1:end - 1] = b'2' * max(0, end - start - 2)
+                    row[end - 1] = ord('3')
+
+            for chunk_x in range(chunk_cols):
+                first = chunk_x * chunk_size
+                for local_y in range(chunk_size):
+                    tiles = band[local_y][first:first + chunk_size]
+                    file.write(tiles + bytes([EMPTY_TILE]) * (chunk_size - len(tiles)))
+
+
+def main():
+    """Ponto de entrada: python -m code.TileMap (--from-const | --generate LARGURAxALTURA) ARQUIVO"""
+    parser = argparse.ArgumentParser(description="Cria arquivos de mapa no formato binário em chunks.")
+    parser.add_argument('path', help="Arquivo de saída")
+    parser.add_argument('--generate', metavar='LARGURAxALTURA', help="Gera um mapa de teste (ex.: 10000x1000)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=TERRAIN_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.generate:
+        width, height = (int(value) for value in args.generate.lower().split('x'))
+        generate_map(args.path, width, height, args.chunk_size, args.seed)
+    else:
+        save_map(args.path, GAME_MAP, args.chunk_size)  # Converte o mapa de Const.py
+
+
+if __name__ == '__main__':
+    main()
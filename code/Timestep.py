@@ -0,0 +1,56 @@
+# Timestep.py
+
+import time
+
+from code.Const import SIMULATION_HZ, MAX_FRAME_TIME
+
+
+class FixedTimestep:
+    """
+    Acumulador de tempo para simulação em passo fixo.
+    A cada frame renderizado, o tempo real decorrido é somado ao acumulador e convertido em um número
+    inteiro de passos de simulação; a sobra (alpha) é usada para interpolar o desenho entre os dois
+    últimos estados da física.
+    """
+
+    def __init__(self, hz=SIMULATION_HZ, max_frame_time=MAX_FRAME_TIME):
+        self.step_time = 1.0 / hz
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+        self.last_time = None
+        self.frame_time = self.step_time  # Duração do último frame (limitada), usada por predict()
+
+    def advance(self):
+        """Mede o tempo desde a última chamada e retorna quantos passos de simulação devem ser executados."""
+        now = time.perf_counter()
+        if self.last_time is None:
+            frame_time = self.step_time  # O primeiro frame executa exatamente um passo
+        else:
+            # Limita frames muito longos para a simulação não entrar em espiral tentando alcançar o tempo real
+            frame_time = min(now - self.last_time, self.max_frame_time)
+        self.last_time = now
+        self.frame_time = frame_time
+
+        self.accumulator += frame_time
+        steps = int(self.accumulator / self.step_time)
+        self.accumulator -= steps * self.step_time
+        return steps
+
+    def predict(self):
+        """
+        Passos e alpha do próximo frame supondo que ele dure o mesmo que o último, sem alterar o estado
+        (ex.: para começar a desenhar uma camada do próximo frame antes de ele começar).
+        """
+        accumulator = self.accumulator + self.frame_time
+        steps = int(accumulator / self.step_time)
+        return steps, (accumulator - steps * self.step_time) / self.step_time
+
+    @property
+    def alpha(self):
+        """Fração (0 a 1) do próximo passo já decorrida, usada na interpolação do desenho."""
+        return self.accumulator / self.step_time
+
+    def reset(self):
+        """Descarta o tempo acumulado (ex.: ao voltar de uma pausa)."""
+        self.accumulator = 0.0
+        self.last_time = None
@@ -1,26 +1,126 @@
 # utils.py
 
+import hashlib
+import mmap
+import os
+import struct
+
 import pygame as pg
-from code.Const import TILE_SIZE, TILE_ASSET_PATHS, SCREEN_WIDTH, SCREEN_HEIGHT
 
+from code.AssetManager import AssetManager
+from code.Const import TILE_SIZE, TILE_ASSET_PATHS, SCREEN_WIDTH, SCREEN_HEIGHT, PLAYER_SIZE, ASSET_CACHE_DIR
+
+# Cabeçalho dos arquivos do cache: magic, mtime (ns) e tamanho do arquivo de origem, largura e altura
+CACHE_MAGIC = b'CCNC'
+CACHE_HEADER = struct.Struct('<4sqqII')
+
+# Quantidade de frames de cada animação
+PLAYER_IDLE_FRAMES = 5
+PLAYER_RUN_FRAMES = 6
+WATER_FRAMES = 4
+
+# Número de imagens carregadas por cada grupo de assets (usado para mostrar o progresso do carregamento)
+ASSET_IMAGE_COUNT = {
+    'background': 5 + 3 * WATER_FRAMES,
+    'terrain': len(TILE_ASSET_PATHS),
+    'player': 2 * (PLAYER_IDLE_FRAMES + PLAYER_RUN_FRAMES),
+}
+
+
+def _cache_path(path, size, flip):
+    """Caminho do arquivo em cache para a combinação (imagem, tamanho, inversão)."""
+    key = f'{os.path.normpath(path)}|{size[0]}x{size[1]}|{int(flip)}'
+    return os.path.join(ASSET_CACHE_DIR, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.rgba')
+
+
+def _load_cached_image(cache_path, source_stat, size):
+    """
+    Lê os pixels já redimensionados do cache via mmap. Retorna None se o cache não existir
+    ou estiver desatualizado (a imagem de origem mudou desde que foi gerado).
+    """
+    try:
+        with open(cache_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, mtime_ns, file_size, width, height = CACHE_HEADER.unpack_from(mapped)
+            if (magic != CACHE_MAGIC or mtime_ns != source_stat.st_mtime_ns or file_size != source_stat.st_size
+                    or (width, height) != tuple(size)
+                    or len(mapped) != CACHE_HEADER.size + width * height * 4):
+                return None
+
+            # frombuffer não copia os pixels; convert_alpha cria a cópia final antes de fechar o mmap
+            pixels = memoryview(mapped)[CACHE_HEADER.size:]
+            try:
+                image = pg.image.frombuffer(pixels, (width, height), 'RGBA').convert_alpha()
+            finally:
+                pixels.release()
+            return image
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def _store_cached_image(cache_path, source_stat, image):
+    """Grava os pixels finais no cache (escrita atômica, para não deixar arquivos pela metade)."""
+    try:
+        os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+        width, height = image.get_size()
+        temp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(CACHE_HEADER.pack(CACHE_MAGIC, source_stat.st_mtime_ns, source_stat.st_size, width, height))
+            file.write(pg.image.tobytes(image, 'RGBA'))
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"Aviso: não foi possível gravar o cache de {cache_path}. Erro: {e}")
+
+
+def load_and_scale_image(path, size, flip=False, progress=None):
+    """
+    Carrega uma imagem, inverte (se necessário) e redimensiona.
+    O resultado é guardado em ASSET_CACHE_DIR; nas execuções seguintes os pixels são lidos direto do cache,
+    sem decodificar o PNG nem redimensionar, até que o arquivo de origem seja modificado.
+    A superfície vem do asset_manager: no formato escolhido pelos pixels (opaco, colorkey ou alfa por pixel)
+    e compartilhada entre as chamadas enquanto estiver residente (não deve ser alterada por quem a recebe).
+    Se `progress` for informado, progress.advance() é chamado ao fim do carregamento.
+    """
+    image = asset_manager.get(path, tuple(size), flip)
+    if progress is not None:
+        progress.advance()
+    return image
+
+
+def _load_and_scale_image(path, size, flip):
+    """Implementação de load_and_scale_image (cache em disco ou PNG de origem)."""
+    try:
+        source_stat = os.stat(path)
+    except OSError:
+        source_stat = None
+
+    cache_path = _cache_path(path, size, flip)
+    if source_stat is not None:
+        image = _load_cached_image(cache_path, source_stat, size)
+        if image is not None:
+            return image
 
-def load_and_scale_image(path, size, flip=False):
-    """Carrega uma imagem, inverte (se necessário) e redimensiona."""
     try:
         image = pg.image.load(path).convert_alpha()
         if flip:
             image = pg.transform.flip(image, True, False)
-        return pg.transform.scale(image, size)
-    except pg.error as e:
+        image = pg.transform.scale(image, size)
+    except (pg.error, FileNotFoundError) as e:
         print(f"Erro ao carregar imagem: {path}. Erro: {e}")
         # Retorna uma superfície vazia para evitar quebra total
         return pg.Surface(size, pg.SRCALPHA)
 
+    _store_cached_image(cache_path, source_stat, image)
+    return image
+
+
+# Superfícies decodificadas de todos os grupos, com orçamento de memória (ASSET_MEMORY_BUDGET) e descarte LRU
+asset_manager = AssetManager(_load_and_scale_image)
+
 
-def load_player_assets():
+def load_player_assets(progress=None):
     """Carrega e organiza todos os assets do jogador (idle e run, direita e esquerda)."""
     base_path = './asset/Captain Clown Nose/Captain Clown Nose/without Sword/'
-    player_size = (128, 80)
+    player_size = PLAYER_SIZE
 
     animations = {
         'idle_right': [],
@@ -30,40 +130,41 @@ def load_player_assets():
     }
 
     # IDLE
-    for i in range(1, 6):  # Idle 01 a Idle 05
+    for i in range(1, PLAYER_IDLE_FRAMES + 1):  # Idle 01 a Idle 05
         path = f'{base_path}Idle/Idle {i:02d}.png'
-        img_right = load_and_scale_image(path, player_size)
-        img_left = load_and_scale_image(path, player_size, flip=True)
+        img_right = load_and_scale_image(path, player_size, progress=progress)
+        img_left = load_and_scale_image(path, player_size, flip=True, progress=progress)
         animations['idle_right'].append(img_right)
         animations['idle_left'].append(img_left)
 
     # RUN
-    for i in range(1, 7):  # Run 01 a Run 06
+    for i in range(1, PLAYER_RUN_FRAMES + 1):  # Run 01 a Run 06
         path = f'{base_path}Run/Run {i:02d}.png'
-        img_right = load_and_scale_image(path, player_size)
-        img_left = load_and_scale_image(path, player_size, flip=True)
+        img_right = load_and_scale_image(path, player_size, progress=progress)
+        img_left = load_and_scale_image(path, player_size, flip=True, progress=progress)
         animations['run_right'].append(img_right)
         animations['run_left'].append(img_left)
 
     return animations
 
 
-def load_terrain_assets():
+def load_terrain_assets(progress=None):
     """Carrega os assets do terreno."""
     terrain_images = {}
     for key, path in TILE_ASSET_PATHS.items():
-        terrain_images[key] = load_and_scale_image(path, (TILE_SIZE, TILE_SIZE))
+        terrain_images[key] = load_and_scale_image(path, (TILE_SIZE, TILE_SIZE), progress=progress)
     return terrain_images
 
 
-def load_background_assets():
+def load_background_assets(progress=None):
     """Carrega os assets de fundo (BG, nuvens, água)."""
-    assets = {'background': load_and_scale_image('./asset/Palm Tree Island/Background/BG Image.png',
-                                                 (SCREEN_WIDTH, SCREEN_HEIGHT)),
-              'big_clouds': load_and_scale_image('./asset/Palm Tree Island/Background/Big Clouds.png', (896, 202)),
-              'small_cloud_1': load_and_scale_image('./asset/Palm Tree Island/Background/Small Cloud 1.png', (148, 48)),
-              'small_cloud_2': load_and_scale_image('./asset/Palm Tree Island/Background/Small Cloud 2.png', (266, 70)),
-              'small_cloud_3': load_and_scale_image('./asset/Palm Tree Island/Background/Small Cloud 3.png', (280, 78))}
+    bg_path = './asset/Palm Tree Island/Background/'
+    assets = {'background': load_and_scale_image(f'{bg_path}BG Image.png', (SCREEN_WIDTH, SCREEN_HEIGHT),
+                                                 progress=progress),
+              'big_clouds': load_and_scale_image(f'{bg_path}Big Clouds.png', (896, 202), progress=progress),
+              'small_cloud_1': load_and_scale_image(f'{bg_path}Small Cloud 1.png', (148, 48), progress=progress),
+              'small_cloud_2': load_and_scale_image(f'{bg_path}Small Cloud 2.png', (266, 70), progress=progress),
+              'small_cloud_3': load_and_scale_image(f'{bg_path}Small Cloud 3.png', (280, 78), progress=progress)}
 
     # Background e Nuvens
 
@@ -90,10 +191,10 @@ def load_background_assets():
         size = water_sizes[w_key]
         base_path = './asset/Palm Tree Island/Background/'
 
-        for i in range(1, 5):  # De 01 a 04
+        for i in range(1, WATER_FRAMES + 1):  # De 01 a 04
             # O nome do arquivo é AGORA construído corretamente:
             # Ex: './asset/Palm Tree Island/Background/Water Reflect Big 01.png'
             path = f'{base_path}{base_name} {i:02d}.png'
-            assets[w_key].append(load_and_scale_image(path, size))
+            assets[w_key].append(load_and_scale_image(path, size, progress=progress))
 
     return assets
\ No newline at end of file
@@ -1,63 +1,155 @@
 # main.py
 
+import argparse
+
 import pygame as pg
 
-from code.Const import SCREEN_SIZE
+from code.Capture import FrameCapture
+from code.Const import SCREEN_SIZE, SIMULATION_HZ
 from code.Game import Game
+from code.Input import InputQueue
+from code.Loader import AssetCache, ASSET_GROUPS
 from code.Menu import Menu
+from code.Replay import InputRecorder, InputReplayer
+from code.Scene import SceneManager
+from code.Scheduler import FrameScheduler
 
 # Inicialização global do Pygame
 pg.init()
 pg.font.init()
 
 
+def parse_args():
+    """Lê as opções de linha de comando (gravação e reprodução de entradas)."""
+    parser = argparse.ArgumentParser(description="Captain Clown Nose Game")
+    parser.add_argument('--record', metavar='ARQUIVO', help="Grava a entrada de cada passo do jogo no arquivo")
+    parser.add_argument('--replay', metavar='ARQUIVO', help="Reproduz uma gravação na velocidade máxima e sai")
+    parser.add_argument('--replay-draw', action='store_true', help="Desenha cada passo durante o replay")
+    parser.add_argument('--map', metavar='ARQUIVO', help="Mapa no formato binário em chunks (ver code/TileMap.py)")
+    parser.add_argument('--capture', metavar='ARQUIVO', help="Grava os frames do jogo (ou do replay) no arquivo")
+    parser.add_argument('--capture-skip', type=int, default=0, metavar='N', help="Grava um de cada N + 1 frames")
+    parser.add_argument('--capture-scale', type=float, default=1.0, help="Escala dos frames gravados (ex.: 0.5)")
+    return parser.parse_args()
+
+
+def print_capture_report(report):
+    """Resumo da captura de frames: gravados, pulados e descartados."""
+    print(f"Captura {report['path']}: {report['frames_written']} frames de {report['size'][0]}x{report['size'][1]} "
+          f"gravados ({report['bytes_written'] / 1e6:.1f} MB), {report['skipped']} pulados, "
+          f"{report['dropped']} descartados ({report['drop_rate']:.1%}), "
+          f"{report['copy_ms_per_frame']:.2f} ms/frame no loop principal")
+
+
+def replay(screen, path, draw, map_path=None, capture=None):
+    """Reproduz uma gravação de entradas e informa se as posições conferem com a gravação."""
+    game = Game(screen, map_path=map_path)
+    game.capture = capture
+    try:
+        result = InputReplayer.load(path).run(game, draw=draw or capture is not None)
+    except ValueError as e:
+        print(f"Replay inválido: {e}")
+        return False
+    status = 'OK' if result['matches'] else 'DIVERGIU'
+    print(f"Replay {status}: {result['steps']} passos em {result['elapsed']:.3f}s "
+          f"({result['steps_per_second']:.0f} passos/s), posição final {result['final_pos']} "
+          f"(esperada {result['expected_pos']})")
+    return result['matches']
+
+
 def main():
     """Função principal que gerencia o loop de estados do jogo."""
+    args = parse_args()
 
     # Configuração da tela
     screen = pg.display.set_mode(SCREEN_SIZE)
 
-    # Instâncias de Menu e Game
-    current_state = 'MENU'
-    menu = Menu(screen)
-    game = Game(screen)  # O jogo é inicializado fora do loop para manter os assets carregados
+    if args.replay:
+        # Replay convertido em frames: cada passo é desenhado e nenhum frame é descartado (espera o gravador)
+        capture = None
+        if args.capture:
+            capture = FrameCapture(args.capture, screen, fps=SIMULATION_HZ, skip=args.capture_skip,
+                                   scale=args.capture_scale, block=True)
+        matches = replay(screen, args.replay, args.replay_draw, args.map, capture)
+        if capture:
+            print_capture_report(capture.close())
+        pg.quit()
+        return 0 if matches else 1
+
+    # Captura do jogo: se o gravador atrasar, frames são descartados em vez de travar o loop
+    capture = None
+    if args.capture:
+        capture = FrameCapture(args.capture, screen, skip=args.capture_skip, scale=args.capture_scale)
+
+    # Um único agendador controla o ritmo dos frames de todas as cenas
+    scheduler = FrameScheduler()
+    recorders = []
+
+    # Fila única de eventos de teclado: nenhum KEYDOWN é perdido, mesmo com vários no mesmo frame
+    input_queue = InputQueue()
+
+    def create_game(assets):
+        game = Game(screen, assets=assets, map_path=args.map, scheduler=scheduler, input_queue=input_queue)
+        if args.record:
+            game.recorder = InputRecorder(game)
+            recorders.append(game.recorder)
+        game.capture = capture
+        return game
+
+    # Cenas: os assets são compartilhados com contagem de referências e liberados quando nenhuma cena os usa
+    scenes = SceneManager(AssetCache())
+    scenes.register('GAME', create_game, asset_groups=ASSET_GROUPS)
+
+    # Os assets do jogo são carregados em segundo plano enquanto o Menu é exibido
+    loader = scenes.preload('GAME')
+    scenes.register('MENU', lambda assets: Menu(screen, loader=loader, scheduler=scheduler,
+                                                  input_queue=input_queue))
+    scenes.push('MENU')
 
     running = True
     while running:
+        scene = scenes.current
 
-        # Variáveis de entrada resetadas a cada loop
-        key_event_key = None
-        mouse_input = pg.mouse.get_pressed()
-        keys_pressed = pg.key.get_pressed()
-
-        # 1. Tratamento de Eventos (Comum a todos os estados)
-        for event in pg.event.get():
+        # 1. Tratamento de Eventos (Comum a todas as cenas)
+        # Com uma cena parada (nada a atualizar, ex.: o menu), o loop dorme até chegar algum evento
+        is_idle = getattr(scene, 'is_idle', None)
+        for event in scheduler.get_events(bool(is_idle and is_idle())):
             if event.type == pg.QUIT:
                 running = False
             if event.type == pg.KEYDOWN:
-                key_event_key = event.key
+                # O pygame não expõe o horário do SDL: o evento é marcado no momento em que é lido
+                input_queue.push(event)
+            if event.type == pg.WINDOWEXPOSED and hasattr(scene, 'invalidate'):
+                scene.invalidate()  # A janela precisa ser redesenhada (ex.: estava coberta)
 
-        # 2. Transição de Estados
-        next_state = current_state
+        # Lidas após os eventos, que podem ter bloqueado o loop
+        mouse_input = pg.mouse.get_pressed()
+        keys_pressed = pg.key.get_pressed()
 
-        if current_state == 'MENU':
-            next_state = menu.run(key_event_key)
+        # 2. Cena atual: recebe as teclas pressionadas (movimento contínuo), consome os eventos da fila
+        # (pulo, escape) e retorna o nome da próxima cena (o próprio nome para continuar) ou 'QUIT'
+        next_scene = scene.run(keys_pressed)
 
-        elif current_state == 'GAME':
-            # O mouse_has_clicked do original foi removido/simplificado para manter o foco
-            # na estrutura e lógica central do jogo
+        if next_scene == 'QUIT':
+            running = False
+        elif next_scene != scenes.current_name:
+            # A cena anterior sai da pilha e os assets que só ela usava são liberados
+            scenes.replace(next_scene)
 
-            # Passa as teclas pressionadas (para movimento contínuo) e a tecla do evento (para ações de pulo/escape)
-            next_state = game.run(keys_pressed, key_event_key)
+    for recorder in recorders:
+        recorder.save(args.record)
+    scenes.clear()
+    if capture:
+        print_capture_report(capture.close())
 
-        if next_state == 'QUIT':
-            running = False
-        elif next_state != current_state:
-            current_state = next_state
+    latency = input_queue.latency_report()
+    if latency:
+        print(f"Latência entrada -> tela ({latency['count']} eventos): p50 {latency['p50']:.1f} ms, "
+              f"p99 {latency['p99']:.1f} ms, máx. {latency['max']:.1f} ms")
 
     # Finalização do Pygame
     pg.quit()
+    return 0
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    raise SystemExit(main())
\ No newline at end of file
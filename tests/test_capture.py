@@ -0,0 +1,41 @@
+# test_capture.py
+
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame as pg
+
+from code.Capture import CaptureReader, FrameCapture
+from code.Const import SCREEN_SIZE
+from code.Game import Game
+from code.Input import ScriptedKeys
+
+
+def test_profiler_and_capture_together(tmp_path):
+    """Frames com o profiler (F3) ligado e a captura ativa: a fase 'capture' é medida e os frames gravados."""
+    pg.init()
+    try:
+        screen = pg.display.set_mode(SCREEN_SIZE)
+        game = Game(screen)
+        path = str(tmp_path / 'capture.ccnv')
+        game.capture = FrameCapture(path, screen, scale=0.25, block=True)
+        game.profiler.toggle()
+
+        for _ in range(5):
+            assert game.run(ScriptedKeys(())) == 'GAME'
+        game.profiler.begin_frame()  # Fecha o último frame medido
+        report = game.capture.close()
+        game.exit()
+
+        assert game.profiler.frames == 5
+        assert 'capture' in game.profiler.stats()
+        assert report['frames_written'] == 5 and report['dropped'] == 0
+
+        reader = CaptureReader(path)
+        frames = list(reader.frames())
+        reader.close()
+        assert [index for index, _ in frames] == list(range(5))
+        assert all(len(pixels) == reader.size[0] * reader.size[1] * 3 for _, pixels in frames)
+    finally:
+        pg.quit()